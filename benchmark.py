@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""Benchmarks of the data pipeline on synthetic corpora of 1 to dozens of translations
+
+Each case times a real code path over the first N translations of a
+synthetic corpus (see synthetic_corpus.py):
+
+    convert_source    repair_bible_data.convert_source_to_current_format, in memory
+    convert_files     convert_translations.convert_translation (convert_bbe.py/convert_korean.py)
+    convert_parallel  convert_translations.convert_all across a process pool
+    json_load         json.load of each converted file
+    mismatch_check    check_mismatches.compare_chapter, every translation vs the first
+    count_matrix      verse_counts.CountMatrix, the same comparison as array operations
+    lookup            book by name and chapter by number, as examine_mismatches.py does
+
+Every case runs in a fresh process so its peak RSS is its own. Results (best
+and median wall time, throughput, peak RSS) are saved as JSON; with
+--baseline they are compared against an earlier run and the exit status is 1
+if any case got slower or bigger than the thresholds allow.
+
+Usage:
+    python3 benchmark.py [--scales 1,4,16,32] [--cases json_load,lookup] [--repeat 3]
+                         [--out benchmark_results.json] [--baseline old.json]
+                         [--threshold 0.10] [--rss-threshold 0.20]
+    python3 benchmark.py --compare new.json --baseline old.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing import get_context
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from check_mismatches import compare_chapter
+from convert_translations import convert_all, convert_translation
+from repair_bible_data import convert_source_to_current_format
+from synthetic_corpus import make_translation
+from verse_counts import CountMatrix
+
+DEFAULT_SCALES = [1, 4, 16, 32]
+DEFAULT_WORKDIR = '.benchmark_corpus'
+DEFAULT_OUTPUT = 'benchmark_results.json'
+RESULTS_VERSION = 1
+
+# Chapters looked up per translation in the lookup case
+LOOKUP_SAMPLE = 500
+
+
+# --- Synthetic corpus on disk ---
+
+def _has_totals(meta_path):
+    """Whether a corpus file's .meta exists and has every total (older ones lack "chapters")"""
+    try:
+        with open(meta_path, encoding='utf-8') as f:
+            return {'verses', 'chapters'} <= set(json.load(f))
+    except (OSError, ValueError):
+        return False
+
+
+def corpus_files(workdir, count, seed=0):
+    """Write (or reuse) source and converted files for `count` translations.
+
+    Returns registry-style entries with "verses" and "chapters" totals each.
+    """
+    os.makedirs(os.path.join(workdir, 'source'), exist_ok=True)
+    os.makedirs(os.path.join(workdir, 'converted'), exist_ok=True)
+
+    entries = []
+    for i in range(count):
+        language = 'korean' if i % 2 else 'english'
+        key = f'{language}{i // 2 + 1}'
+        entry = {
+            "key": key,
+            "source": os.path.join(workdir, 'source', f'{key}-{seed + i}.json'),
+            "encoding": "utf-8-sig",
+            "book_names": language,
+            "output": os.path.join(workdir, 'converted', f'{key}-{seed + i}.json'),
+        }
+        meta_path = entry['source'] + '.meta'
+
+        if not _has_totals(meta_path):
+            translation = make_translation(seed + i, language)
+            source = [{
+                "abbrev": book['abbreviation'].lower(),
+                "chapters": [[verse['text'] for verse in chapter['verses']] for chapter in book['chapters']],
+                "name": book['name']
+            } for book in translation['books']]
+            with open(entry['source'], 'w', encoding='utf-8-sig') as f:
+                json.dump(source, f, ensure_ascii=False)
+            with open(entry['output'], 'w', encoding='utf-8') as f:
+                json.dump(translation, f, ensure_ascii=False, indent=2)
+            totals = {
+                "verses": sum(len(c['verses']) for book in translation['books'] for c in book['chapters']),
+                "chapters": sum(len(book['chapters']) for book in translation['books']),
+            }
+            with open(meta_path, 'w', encoding='utf-8') as f:
+                json.dump(totals, f)
+
+        with open(meta_path, encoding='utf-8') as f:
+            entry.update(json.load(f))
+        entries.append(entry)
+
+    return entries
+
+
+def load_source(entry):
+    with open(entry['source'], encoding=entry['encoding']) as f:
+        return json.load(f)
+
+
+def load_converted(entry):
+    with open(entry['output'], encoding='utf-8') as f:
+        return json.load(f)
+
+
+# --- Cases: setup(entries, workdir) returns the state run(state) works on ---
+
+def _convert_source_setup(entries, workdir):
+    return [load_source(entry) for entry in entries]
+
+
+def _convert_source_run(sources):
+    for source in sources:
+        convert_source_to_current_format(source)
+
+
+def _converted_copies(entries, workdir):
+    """Entries writing to scratch files, so the cached corpus is left alone"""
+    scratch = os.path.join(workdir, 'scratch')
+    os.makedirs(scratch, exist_ok=True)
+    return [{**entry, "output": os.path.join(scratch, os.path.basename(entry['output']))} for entry in entries]
+
+
+def _convert_files_run(entries):
+    for entry in entries:
+        convert_translation(entry)
+
+
+def _convert_parallel_run(entries):
+    with contextlib.redirect_stdout(io.StringIO()):
+        convert_all(entries)
+
+
+def _json_load_run(entries):
+    for entry in entries:
+        load_converted(entry)
+
+
+def _loaded_data(entries, workdir):
+    return [load_converted(entry) for entry in entries]
+
+
+def _mismatch_check_run(data):
+    primary = data[0]['books']
+    for other in data[1:] or data:
+        for book_index, book in enumerate(other['books']):
+            for chapter_index in range(len(book['chapters'])):
+                compare_chapter(primary[book_index], book, chapter_index)
+
+
+def _count_matrix_run(data):
+    CountMatrix.from_data({str(i): translation for i, translation in enumerate(data)}).mismatch_counts()
+
+
+def _lookup_setup(entries, workdir):
+    data = _loaded_data(entries, workdir)
+    references = [(book['name'], chapter['number'])
+                  for book in data[0]['books'] for chapter in book['chapters']]
+    step = max(1, len(references) // LOOKUP_SAMPLE)
+    return data, references[::step][:LOOKUP_SAMPLE]
+
+
+def _lookup_run(state):
+    data, references = state
+    primary = data[0]['books']
+    for book_name, chapter_number in references:
+        book_index = next((i for i, b in enumerate(primary) if b['name'] == book_name), None)
+        for translation in data:
+            book = translation['books'][book_index]
+            next((c for c in book['chapters'] if c['number'] == chapter_number), None)
+
+
+def _verses(entries):
+    return sum(entry['verses'] for entry in entries)
+
+
+def _chapters_compared(entries):
+    """Chapters _mismatch_check_run compares: N - 1 pairs, or one self-comparison"""
+    return sum(entry['chapters'] for entry in entries[1:] or entries)
+
+
+# name: (setup, run, items processed, unit)
+CASES = {
+    'convert_source': (_convert_source_setup, _convert_source_run, _verses, 'verses'),
+    'convert_files': (_converted_copies, _convert_files_run, _verses, 'verses'),
+    'convert_parallel': (_converted_copies, _convert_parallel_run, _verses, 'verses'),
+    'json_load': (lambda entries, workdir: entries, _json_load_run, _verses, 'verses'),
+    'mismatch_check': (_loaded_data, _mismatch_check_run, _chapters_compared, 'chapters'),
+    'count_matrix': (_loaded_data, _count_matrix_run, _verses, 'verses'),
+    'lookup': (_lookup_setup, _lookup_run, lambda entries: len(entries) * LOOKUP_SAMPLE, 'lookups'),
+}
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    # Worker processes count too (convert_parallel)
+    peak = max(resource.getrusage(who).ru_maxrss for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN))
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def run_case(name, entries, workdir, repeat):
+    """Run one case in the current process (called in a fresh worker)"""
+    setup, run, items, unit = CASES[name]
+    state = setup(entries, workdir)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run(state)
+        times.append(time.perf_counter() - start)
+
+    best = min(times)
+    count = items(entries)
+    return {
+        "case": name,
+        "translations": len(entries),
+        "items": count,
+        "unit": unit,
+        "seconds": round(best, 4),
+        "medianSeconds": round(statistics.median(times), 4),
+        "throughput": round(count / best) if best else None,
+        "peakRssMb": peak_rss_mb(),
+        "repeat": repeat,
+    }
+
+
+def run_isolated(function, *args):
+    """Call function in a new process, so peak RSS is not shared between cases.
+
+    Linux carries the parent's RSS high-water mark into the child, so the
+    parent itself must stay small: even corpus generation runs here.
+    """
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn')) as pool:
+        return pool.submit(function, *args).result()
+
+
+# --- Comparison ---
+
+def compare(results, baseline, threshold, rss_threshold):
+    """Print a comparison table; returns the number of regressions"""
+    old = {(r['case'], r['translations']): r for r in baseline['results']}
+    regressions = 0
+
+    print(f"\n{'case':<18}{'N':>4}{'seconds':>11}{'baseline':>11}{'change':>9}{'RSS MB':>9}{'baseline':>10}")
+    for result in results['results']:
+        before = old.get((result['case'], result['translations']))
+        if before is None:
+            print(f"{result['case']:<18}{result['translations']:>4}{result['seconds']:>11.4f}{'-':>11}")
+            continue
+
+        change = result['seconds'] / before['seconds'] - 1 if before['seconds'] else 0.0
+        slower = change > threshold
+        bigger = (result['peakRssMb'] is not None and before['peakRssMb']
+                  and result['peakRssMb'] / before['peakRssMb'] - 1 > rss_threshold)
+        marker = '❌' if slower or bigger else '✓'
+        regressions += bool(slower or bigger)
+        print(f"{result['case']:<18}{result['translations']:>4}{result['seconds']:>11.4f}"
+              f"{before['seconds']:>11.4f}{change:>+9.1%}{result['peakRssMb'] or 0:>9.1f}"
+              f"{before['peakRssMb'] or 0:>10.1f}  {marker}")
+
+    if regressions:
+        print(f"\n❌ {regressions} regression(s) beyond +{threshold:.0%} time / +{rss_threshold:.0%} RSS")
+    else:
+        print(f"\n✓ No regressions beyond +{threshold:.0%} time / +{rss_threshold:.0%} RSS")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark conversion, loading, mismatch checks and lookups")
+    parser.add_argument('--scales', default=','.join(map(str, DEFAULT_SCALES)),
+                        help="comma-separated translation counts")
+    parser.add_argument('--cases', default=','.join(CASES), help="comma-separated cases to run")
+    parser.add_argument('--repeat', type=int, default=3, help="timed runs per case (best is reported)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workdir', default=DEFAULT_WORKDIR, help="where the synthetic corpus is cached")
+    parser.add_argument('--out', default=DEFAULT_OUTPUT, help="where to save the results")
+    parser.add_argument('--compare', metavar='RESULTS', help="compare saved results instead of running")
+    parser.add_argument('--baseline', help="earlier results to compare against")
+    parser.add_argument('--threshold', type=float, default=0.10, help="allowed slowdown (0.10 = 10%%)")
+    parser.add_argument('--rss-threshold', type=float, default=0.20, help="allowed peak RSS growth")
+    args = parser.parse_args()
+
+    if args.compare:
+        if not args.baseline:
+            parser.error("--compare needs --baseline")
+        with open(args.compare, encoding='utf-8') as f:
+            results = json.load(f)
+    else:
+        scales = sorted({int(n) for n in args.scales.split(',')})
+        cases = args.cases.split(',')
+        unknown = set(cases) - set(CASES)
+        if unknown:
+            parser.error(f"Unknown case(s): {', '.join(sorted(unknown))}")
+
+        print(f"Preparing a synthetic corpus of {max(scales)} translations in {args.workdir}...")
+        start = time.perf_counter()
+        entries = run_isolated(corpus_files, args.workdir, max(scales), args.seed)
+        print(f"✓ Ready in {time.perf_counter() - start:.1f}s\n")
+
+        print(f"{'case':<18}{'N':>4}{'seconds':>11}{'throughput':>24}{'RSS MB':>9}")
+        rows = []
+        for name in cases:
+            for n in scales:
+                result = run_isolated(run_case, name, entries[:n], args.workdir, args.repeat)
+                rows.append(result)
+                print(f"{name:<18}{n:>4}{result['seconds']:>11.4f}"
+                      f"{result['throughput'] or 0:>14,} {result['unit']}/s{result['peakRssMb'] or 0:>9.1f}")
+
+        results = {
+            "version": RESULTS_VERSION,
+            "created": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "seed": args.seed,
+            "results": rows,
+        }
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✓ Results saved to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold, args.rss_threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,388 @@
+"""Lazy access to the converted translations, with a binary parse cache
+
+    from bibledata import Library
+
+    library = Library()                          # nothing is read yet
+    english = library['english']
+    english.book_names                           # from the small cached index
+    english.find_book('Job')                     # -> 17
+    english.chapter(17, 42)                      # loads one book, ~1 ms
+    english.verse_counts()                       # [(name, [count per chapter])], no verse text
+    english.data                                 # the whole {"books": [...]}
+
+The first time a file is read it is parsed with json.load and written to
+.bibledata_cache/ as a small pickled index (book names, abbreviations,
+chapter numbers, verse counts) plus one pickle per book. The cache entry is
+keyed on the file's path, size and modification time, so it is rebuilt
+whenever the file is rewritten (chapter_patch.py, repairs) and later runs
+never parse JSON at all.
+
+Books, chapters and verses are compact records built by the JSON parser
+itself (compact_object, an object_pairs_hook) rather than a dict per
+verse: a chapter keeps its verse numbers in an array, its text as one
+string with an array of offsets, and creates Verse objects only when they
+are read. Book names are interned. The records read like the dicts they
+replace (book['chapters'], chapter['verses'][0]['text'], iteration, len,
+== against dicts); pass default=to_json to json.dump(s) to write them out
+unchanged.
+
+The cache is pickle: only point it at files you trust (it lives next to
+the data it was built from).
+"""
+import hashlib
+import json
+import os
+import pickle
+import re
+import shutil
+import sys
+from array import array
+from collections.abc import Mapping, Sequence
+
+from translations import translation_files
+
+CACHE_DIR = '.bibledata_cache'
+CACHE_FORMAT = 2
+
+
+class _Record(Mapping):
+    """A fixed set of fields, read like a dict of them"""
+
+    __slots__ = ()
+    _fields = ()
+
+    def __getitem__(self, key):
+        if key in self._fields:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.as_dict()!r})"
+
+
+class Verse(_Record):
+    __slots__ = ('number', 'text')
+    _fields = ('number', 'text')
+
+    def __init__(self, number, text):
+        self.number = number
+        self.text = text
+
+    def __reduce__(self):
+        return Verse, (self.number, self.text)
+
+    def as_dict(self):
+        return {"number": self.number, "text": self.text}
+
+
+class Verses(Sequence):
+    """A chapter's verses, made into Verse objects as they are read"""
+
+    __slots__ = ('_chapter',)
+
+    def __init__(self, chapter):
+        self._chapter = chapter
+
+    def __len__(self):
+        return len(self._chapter._numbers)
+
+    def __getitem__(self, index):
+        chapter = self._chapter
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        number = chapter._numbers[index]
+        if index < 0:
+            index += len(chapter._numbers)
+        return Verse(number, chapter._text[chapter._offsets[index]:chapter._offsets[index + 1]])
+
+    def __iter__(self):
+        chapter = self._chapter
+        text, offsets = chapter._text, chapter._offsets
+        for i, number in enumerate(chapter._numbers):
+            yield Verse(number, text[offsets[i]:offsets[i + 1]])
+
+    def __eq__(self, other):
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return f"Verses({list(self)!r})"
+
+
+class Chapter(_Record):
+    """Verse numbers in an array, the verse texts joined into one string"""
+
+    __slots__ = ('number', '_numbers', '_offsets', '_text')
+    _fields = ('number', 'verses')
+
+    def __init__(self, number, verses=()):
+        self.number = number
+        self._numbers = array('H', [verse['number'] for verse in verses])
+        texts = [verse['text'] for verse in verses]
+        self._text = ''.join(texts)
+        self._offsets = array('I', [0])
+        for text in texts:
+            self._offsets.append(self._offsets[-1] + len(text))
+
+    @property
+    def verses(self):
+        return Verses(self)
+
+    def __reduce__(self):
+        return _restore_chapter, (self.number, self._numbers, self._offsets, self._text)
+
+    def as_dict(self):
+        text, offsets = self._text, self._offsets
+        return {"number": self.number,
+                "verses": [{"number": number, "text": text[offsets[i]:offsets[i + 1]]}
+                           for i, number in enumerate(self._numbers)]}
+
+
+def _restore_chapter(number, numbers, offsets, text):
+    chapter = Chapter.__new__(Chapter)
+    chapter.number, chapter._numbers, chapter._offsets, chapter._text = number, numbers, offsets, text
+    return chapter
+
+
+class Book(_Record):
+    __slots__ = ('name', 'abbreviation', 'chapters')
+    _fields = ('name', 'abbreviation', 'chapters')
+
+    def __init__(self, name, abbreviation, chapters):
+        self.name = sys.intern(name)
+        self.abbreviation = sys.intern(abbreviation)
+        self.chapters = chapters
+
+    def __reduce__(self):
+        return Book, (self.name, self.abbreviation, self.chapters)
+
+    def as_dict(self):
+        return {"name": self.name, "abbreviation": self.abbreviation,
+                "chapters": [to_json(chapter) if isinstance(chapter, _Record) else chapter
+                             for chapter in self.chapters]}
+
+
+def _packable(verses):
+    """Whether a chapter's verses fit the compact Chapter layout"""
+    return all(isinstance(verse, Verse) and type(verse.number) is int and 0 <= verse.number <= 0xFFFF
+               and isinstance(verse.text, str) for verse in verses)
+
+
+def compact_object(pairs):
+    """object_pairs_hook for the {"books": [...]} files.
+
+    Objects with exactly the converted files' keys, in their order, become
+    Verse, Chapter and Book records; anything else (extra keys, odd verse
+    numbers) stays a plain dict, so nothing in the file is lost.
+    """
+    if len(pairs) == 2:
+        (key1, value1), (key2, value2) = pairs
+        if key1 == 'number':
+            if key2 == 'text':
+                return Verse(value1, value2)
+            if key2 == 'verses' and isinstance(value2, list) and _packable(value2):
+                return Chapter(value1, value2)
+    elif len(pairs) == 3 and tuple(key for key, _ in pairs) == Book._fields:
+        name, abbreviation, chapters = (value for _, value in pairs)
+        if isinstance(name, str) and isinstance(abbreviation, str) and isinstance(chapters, list):
+            return Book(name, abbreviation, chapters)
+    return dict(pairs)
+
+
+def to_json(value):
+    """default= hook for json.dump(s): the records as the dicts they were parsed from"""
+    if isinstance(value, _Record):
+        return value.as_dict()
+    if isinstance(value, Verses):
+        return [verse.as_dict() for verse in value]
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def load_json(path):
+    """Parse a {"books": [...]} file into compact records"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f, object_pairs_hook=compact_object)
+
+
+def _cache_entry(path, cache_dir):
+    """(entry directory, prefix shared by every entry of this path)"""
+    real = os.path.realpath(path)
+    stat = os.stat(real)
+    path_digest = hashlib.blake2b(real.encode('utf-8'), digest_size=4).hexdigest()
+    signature = f"{stat.st_size}:{stat.st_mtime_ns}:{CACHE_FORMAT}".encode('utf-8')
+    prefix = f"{re.sub(r'[^A-Za-z0-9]+', '_', os.path.basename(real))}-{path_digest}-"
+    return os.path.join(cache_dir, prefix + hashlib.blake2b(signature, digest_size=6).hexdigest()), prefix
+
+
+def _book_file(entry, book_index):
+    return os.path.join(entry, f"{book_index}.pickle")
+
+
+def build_index(data):
+    """Everything about a translation except verse text"""
+    return {
+        "books": [{
+            "name": book['name'],
+            "abbreviation": book['abbreviation'],
+            "chapters": [chapter['number'] for chapter in book['chapters']],
+            "verseCounts": [len(chapter['verses']) for chapter in book['chapters']],
+        } for book in data['books']]
+    }
+
+
+def read_index(path, cache_dir=CACHE_DIR):
+    """build_index() of a file, for tools that never need the verse text.
+
+    Read from the parse cache when it is current; otherwise the file is
+    parsed with a plain json.load (about half the cost of building compact
+    records) and the cache is left for the next full load to fill.
+    """
+    if cache_dir is not None:
+        entry, _ = _cache_entry(path, cache_dir)
+        try:
+            with open(os.path.join(entry, 'index.pickle'), 'rb') as f:
+                return pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            pass
+    with open(path, 'r', encoding='utf-8') as f:
+        return build_index(json.load(f))
+
+
+def write_cache(data, entry, prefix):
+    """Write the index and per-book pickles, then rename the directory into place"""
+    cache_dir = os.path.dirname(entry)
+    tmp = f"{entry}.tmp{os.getpid()}"
+    os.makedirs(tmp, exist_ok=True)
+    for book_index, book in enumerate(data['books']):
+        with open(_book_file(tmp, book_index), 'wb') as f:
+            pickle.dump(book, f, protocol=pickle.HIGHEST_PROTOCOL)
+    with open(os.path.join(tmp, 'index.pickle'), 'wb') as f:
+        pickle.dump(build_index(data), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    try:
+        os.rename(tmp, entry)
+    except OSError:
+        # Another process cached the same file first
+        shutil.rmtree(tmp, ignore_errors=True)
+        return
+
+    # Entries for earlier versions of the file are never read again
+    for name in os.listdir(cache_dir):
+        stale = os.path.join(cache_dir, name)
+        if name.startswith(prefix) and stale != entry and '.tmp' not in name:
+            shutil.rmtree(stale, ignore_errors=True)
+
+
+class Translation:
+    """One converted translation file, read on first use and cached.
+
+    Books are Book records in the file's {"name", "abbreviation", "chapters"}
+    shape; chapter numbers are the ones in the file, book indexes are 0-based.
+    """
+
+    def __init__(self, key, path, cache_dir=CACHE_DIR):
+        self.key = key
+        self.path = path
+        self.cache_dir = cache_dir
+        self._index = None
+        self._entry = None
+        self._books = {}
+        self._book_lookup = None
+
+    def _load_index(self):
+        if self._index is not None:
+            return self._index
+
+        if self.cache_dir is not None:
+            entry, prefix = _cache_entry(self.path, self.cache_dir)
+            try:
+                with open(os.path.join(entry, 'index.pickle'), 'rb') as f:
+                    self._index = pickle.load(f)
+                self._entry = entry
+                return self._index
+            except (OSError, EOFError, pickle.UnpicklingError):
+                pass
+
+        # Cache miss: parse once, keep every book, and cache for next time
+        data = load_json(self.path)
+        self._books = dict(enumerate(data['books']))
+        self._index = build_index(data)
+        if self.cache_dir is not None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            write_cache(data, entry, prefix)
+            self._entry = entry
+        return self._index
+
+    @property
+    def book_count(self):
+        return len(self._load_index()['books'])
+
+    @property
+    def book_names(self):
+        return [book['name'] for book in self._load_index()['books']]
+
+    @property
+    def abbreviations(self):
+        return [book['abbreviation'] for book in self._load_index()['books']]
+
+    def chapter_numbers(self, book_index):
+        return self._load_index()['books'][book_index]['chapters']
+
+    def verse_counts(self):
+        """[(book name, [verse count per chapter]), ...] without loading any text"""
+        return [(book['name'], book['verseCounts']) for book in self._load_index()['books']]
+
+    def find_book(self, name):
+        """Index of a book by name or abbreviation (case-insensitive), or None"""
+        if self._book_lookup is None:
+            self._book_lookup = {}
+            for book_index, book in enumerate(self._load_index()['books']):
+                for identifier in (book['name'], book['abbreviation']):
+                    self._book_lookup.setdefault(identifier.casefold(), book_index)
+        return self._book_lookup.get(name.casefold())
+
+    def book(self, book_index):
+        """The full Book (one book is read from the cache)"""
+        if book_index not in self._books:
+            self._load_index()
+            if book_index not in self._books:
+                with open(_book_file(self._entry, book_index), 'rb') as f:
+                    self._books[book_index] = pickle.load(f)
+        return self._books[book_index]
+
+    def chapter(self, book_index, chapter_number):
+        """The Chapter with that number, or None"""
+        if not 0 <= book_index < self.book_count:
+            return None
+        return next((c for c in self.book(book_index)['chapters'] if c['number'] == chapter_number), None)
+
+    @property
+    def data(self):
+        """The whole translation as {"books": [...]}, in the shape json.load would return"""
+        return {"books": [self.book(book_index) for book_index in range(self.book_count)]}
+
+
+class Library:
+    """The registered translations (or any (key, path) files), keyed by translation"""
+
+    def __init__(self, files=None, cache_dir=CACHE_DIR):
+        self.files = list(files or translation_files())
+        self.keys = [key for key, _ in self.files]
+        self._translations = {key: Translation(key, path, cache_dir) for key, path in self.files}
+
+    def __getitem__(self, key):
+        return self._translations[key]
+
+    def __iter__(self):
+        return iter(self._translations.values())
+
+    def load_all(self):
+        """{key: {"books": [...]}} for every translation, like translations.load_translations"""
+        return {key: translation.data for key, translation in self._translations.items()}
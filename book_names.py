@@ -0,0 +1,196 @@
+"""Book name tables, keyed by the thiagobodruk source abbreviations"""
+
+ENGLISH = {
+    "gn": "Genesis",
+    "ex": "Exodus",
+    "lv": "Leviticus",
+    "nm": "Numbers",
+    "dt": "Deuteronomy",
+    "js": "Joshua",
+    "jud": "Judges",
+    "rt": "Ruth",
+    "1sm": "1 Samuel",
+    "2sm": "2 Samuel",
+    "1kgs": "1 Kings",
+    "2kgs": "2 Kings",
+    "1ch": "1 Chronicles",
+    "2ch": "2 Chronicles",
+    "ezr": "Ezra",
+    "ne": "Nehemiah",
+    "et": "Esther",
+    "job": "Job",
+    "ps": "Psalms",
+    "prv": "Proverbs",
+    "ec": "Ecclesiastes",
+    "so": "Song of Solomon",
+    "is": "Isaiah",
+    "jr": "Jeremiah",
+    "lm": "Lamentations",
+    "ez": "Ezekiel",
+    "dn": "Daniel",
+    "ho": "Hosea",
+    "jl": "Joel",
+    "am": "Amos",
+    "ob": "Obadiah",
+    "jn": "Jonah",
+    "mi": "Micah",
+    "na": "Nahum",
+    "hk": "Habakkuk",
+    "zp": "Zephaniah",
+    "hg": "Haggai",
+    "zc": "Zechariah",
+    "ml": "Malachi",
+    "mt": "Matthew",
+    "mk": "Mark",
+    "lk": "Luke",
+    "jo": "John",
+    "act": "Acts",
+    "rm": "Romans",
+    "1co": "1 Corinthians",
+    "2co": "2 Corinthians",
+    "gl": "Galatians",
+    "eph": "Ephesians",
+    "ph": "Philippians",
+    "cl": "Colossians",
+    "1ts": "1 Thessalonians",
+    "2ts": "2 Thessalonians",
+    "1tm": "1 Timothy",
+    "2tm": "2 Timothy",
+    "tt": "Titus",
+    "phm": "Philemon",
+    "hb": "Hebrews",
+    "jm": "James",
+    "1pe": "1 Peter",
+    "2pe": "2 Peter",
+    "1jo": "1 John",
+    "2jo": "2 John",
+    "3jo": "3 John",
+    "jd": "Jude",
+    "re": "Revelation",
+}
+
+KOREAN = {
+    "gn": "창세기",
+    "ex": "출애굽기",
+    "lv": "레위기",
+    "nm": "민수기",
+    "dt": "신명기",
+    "js": "여호수아",
+    "jud": "사사기",
+    "rt": "룻기",
+    "1sm": "사무엘상",
+    "2sm": "사무엘하",
+    "1kgs": "열왕기상",
+    "2kgs": "열왕기하",
+    "1ch": "역대상",
+    "2ch": "역대하",
+    "ezr": "에스라",
+    "ne": "느헤미야",
+    "et": "에스더",
+    "job": "욥기",
+    "ps": "시편",
+    "prv": "잠언",
+    "ec": "전도서",
+    "so": "아가",
+    "is": "이사야",
+    "jr": "예레미야",
+    "lm": "예레미야애가",
+    "ez": "에스겔",
+    "dn": "다니엘",
+    "ho": "호세아",
+    "jl": "요엘",
+    "am": "아모스",
+    "ob": "오바댜",
+    "jn": "요나",
+    "mi": "미가",
+    "na": "나훔",
+    "hk": "하박국",
+    "zp": "스바냐",
+    "hg": "학개",
+    "zc": "스가랴",
+    "ml": "말라기",
+    "mt": "마태복음",
+    "mk": "마가복음",
+    "lk": "누가복음",
+    "jo": "요한복음",
+    "act": "사도행전",
+    "rm": "로마서",
+    "1co": "고린도전서",
+    "2co": "고린도후서",
+    "gl": "갈라디아서",
+    "eph": "에베소서",
+    "ph": "빌립보서",
+    "cl": "골로새서",
+    "1ts": "데살로니가전서",
+    "2ts": "데살로니가후서",
+    "1tm": "디모데전서",
+    "2tm": "디모데후서",
+    "tt": "디도서",
+    "phm": "빌레몬서",
+    "hb": "히브리서",
+    "jm": "야고보서",
+    "1pe": "베드로전서",
+    "2pe": "베드로후서",
+    "1jo": "요한1서",
+    "2jo": "요한2서",
+    "3jo": "요한3서",
+    "jd": "유다서",
+    "re": "요한계시록",
+}
+
+# Named tables a registry entry can refer to
+TABLES = {
+    "english": ENGLISH,
+    "korean": KOREAN,
+}
+
+# Standard Korean abbreviations (개역성경), for references such as "창 1:1"
+KOREAN_SHORT = {
+    "gn": "창", "ex": "출", "lv": "레", "nm": "민", "dt": "신", "js": "수", "jud": "삿", "rt": "룻",
+    "1sm": "삼상", "2sm": "삼하", "1kgs": "왕상", "2kgs": "왕하", "1ch": "대상", "2ch": "대하",
+    "ezr": "스", "ne": "느", "et": "에", "job": "욥", "ps": "시", "prv": "잠", "ec": "전", "so": "아",
+    "is": "사", "jr": "렘", "lm": "애", "ez": "겔", "dn": "단", "ho": "호", "jl": "욜", "am": "암",
+    "ob": "옵", "jn": "욘", "mi": "미", "na": "나", "hk": "합", "zp": "습", "hg": "학", "zc": "슥",
+    "ml": "말", "mt": "마", "mk": "막", "lk": "눅", "jo": "요", "act": "행", "rm": "롬",
+    "1co": "고전", "2co": "고후", "gl": "갈", "eph": "엡", "ph": "빌", "cl": "골",
+    "1ts": "살전", "2ts": "살후", "1tm": "딤전", "2tm": "딤후", "tt": "딛", "phm": "몬", "hb": "히",
+    "jm": "약", "1pe": "벧전", "2pe": "벧후", "1jo": "요일", "2jo": "요이", "3jo": "요삼", "jd": "유",
+    "re": "계",
+}
+
+# Common abbreviations that are not simply a prefix of the book's name
+# (prefixes such as "Gen" or "1 Cor" are recognised automatically)
+ALIASES = {
+    "jud": ["Jdg", "Jg", "Jdgs"],
+    "rt": ["Rth"],
+    "1kgs": ["1 Kgs"],
+    "2kgs": ["2 Kgs"],
+    "1ch": ["1 Chr"],
+    "2ch": ["2 Chr"],
+    "et": ["Esth"],
+    "job": ["Jb"],
+    "ps": ["Psalm", "Pss", "Psm"],
+    "prv": ["Prv"],
+    "ec": ["Qoh", "Qoheleth"],
+    "so": ["Song of Songs", "Canticles", "Cant", "SS", "Sg", "Song"],
+    "is": ["Isa"],
+    "ez": ["Ezk"],
+    "jn": ["Jnh"],
+    "zp": ["Zph"],
+    "mt": ["Mt", "Mat"],
+    "mk": ["Mk", "Mrk"],
+    "lk": ["Lk"],
+    "jo": ["Jn", "Jhn"],
+    "act": ["Ac"],
+    "rm": ["Rm"],
+    "ph": ["Phil", "Phi", "Php", "Pp"],
+    "phm": ["Phm", "Phlm"],
+    "jm": ["Jas", "Jms"],
+    "1pe": ["1 Pt"],
+    "2pe": ["2 Pt"],
+    "1jo": ["1 Jn", "1 Jhn", "요한일서"],
+    "2jo": ["2 Jn", "2 Jhn", "요한이서"],
+    "3jo": ["3 Jn", "3 Jhn", "요한삼서"],
+    "jd": ["Jd"],
+    "re": ["Rv", "Revelations", "Apocalypse"],
+}
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""Build the cross-translation verse alignment table
+
+Most chapters have the same verses in every translation and need no table:
+row N is verse N everywhere. For the others (see mismatch_report.json) this
+writes an explicit list of rows, each row giving the verse number(s) of every
+translation shown side by side in that row:
+
+    [[english verses], [korean verses]]      e.g. [[12], [12, 13]] or [[20], []]
+
+Rows come from alignment_overrides.json when a chapter has been aligned by
+hand (or by verse_aligner.py --merge), and otherwise pair verses by position
+(what the app used to do when rendering). build_shards.py copies the rows into the app manifest.
+
+alignment_overrides.json is a list of entries keyed by the English book name:
+
+    [{"book": "Mark", "chapter": 9, "rows": [[[1], [1]], ..., [[49, 50], [48]]]}]
+
+Usage:
+    python3 build_alignment.py
+"""
+import json
+import os
+
+from pipeline_metrics import Metrics
+from translations import load_translations, translation_files
+
+ALIGNMENT_FILE = 'data/alignment.json'
+OVERRIDES_FILE = 'alignment_overrides.json'
+
+
+def load_overrides(path=OVERRIDES_FILE):
+    """Hand-made alignments keyed by (book name, chapter number)"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        entries = json.load(f)
+    return {(e['book'], e['chapter']): e['rows'] for e in entries}
+
+
+def positional_rows(verse_numbers):
+    """Pair the Nth verse of every translation; shorter chapters get empty cells"""
+    rows = []
+    for i in range(max(len(numbers) for numbers in verse_numbers)):
+        rows.append([[numbers[i]] if i < len(numbers) else [] for numbers in verse_numbers])
+    return rows
+
+
+def validate_rows(rows, verse_numbers):
+    """Check that rows use every verse of every translation exactly once, in order"""
+    if any(len(row) != len(verse_numbers) for row in rows):
+        return False
+    for t, numbers in enumerate(verse_numbers):
+        used = [n for row in rows for n in row[t]]
+        if used != numbers:
+            return False
+    return True
+
+
+def chapter_verse_numbers(data, keys, book_index, chapter_index):
+    numbers = []
+    for key in keys:
+        books = data[key]['books']
+        chapter = None
+        if book_index < len(books) and chapter_index < len(books[book_index]['chapters']):
+            chapter = books[book_index]['chapters'][chapter_index]
+        numbers.append([v['number'] for v in chapter['verses']] if chapter else [])
+    return numbers
+
+
+def build_alignment(data, keys, overrides):
+    """Return the alignment table for every chapter that is not verse-for-verse"""
+    chapters = []
+    primary = data[keys[0]]
+
+    for book_index, book in enumerate(primary['books']):
+        for chapter_index, chapter in enumerate(book['chapters']):
+            verse_numbers = chapter_verse_numbers(data, keys, book_index, chapter_index)
+            if all(numbers == verse_numbers[0] for numbers in verse_numbers):
+                continue
+
+            rows = overrides.get((book['name'], chapter['number']))
+            source = 'override'
+            if rows is not None and not validate_rows(rows, verse_numbers):
+                print(f"⚠️  Ignoring override for {book['name']} {chapter['number']}: "
+                      f"rows do not cover the chapter's verses")
+                rows = None
+            if rows is None:
+                rows = positional_rows(verse_numbers)
+                source = 'positional'
+
+            chapters.append({
+                "bookIndex": book_index,
+                "book": book['name'],
+                "chapter": chapter['number'],
+                "source": source,
+                "rows": rows
+            })
+
+    return {"translations": keys, "chapters": chapters}
+
+
+def save_alignment(alignment, path=ALIGNMENT_FILE):
+    """Write the alignment table atomically (the server may be reading it); returns its size in bytes"""
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(alignment, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(path + '.tmp', path)
+    return os.path.getsize(path)
+
+
+def load_alignment(path=ALIGNMENT_FILE):
+    """Rows keyed by (book index, chapter number); empty if not built"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        alignment = json.load(f)
+    return {(c['bookIndex'], c['chapter']): c['rows'] for c in alignment['chapters']}
+
+
+def main():
+    files = translation_files()
+    keys = [key for key, _ in files]
+    metrics = Metrics('build_alignment')
+
+    print("Loading translations...")
+    with metrics.stage('load'):
+        data = load_translations(files)
+        overrides = load_overrides()
+        metrics.count(translations=len(data))
+
+    with metrics.stage('align'):
+        alignment = build_alignment(data, keys, overrides)
+        metrics.count(chapters=len(alignment['chapters']))
+
+    with metrics.stage('write'):
+        metrics.count(bytesWritten=save_alignment(alignment))
+
+    by_source = {}
+    for chapter in alignment['chapters']:
+        by_source[chapter['source']] = by_source.get(chapter['source'], 0) + 1
+
+    print(f"✓ {len(alignment['chapters'])} chapter(s) need an alignment table")
+    for source, count in sorted(by_source.items()):
+        print(f"  {source}: {count}")
+    if by_source.get('positional'):
+        print(f"⚠️  {by_source['positional']} chapter(s) pair verses by position - "
+              f"run verse_aligner.py --merge to align them by verse length, then build_alignment.py again")
+    print(f"✓ Alignment saved to {ALIGNMENT_FILE}")
+    print("  Run build_shards.py to include it in the app manifest")
+    metrics.finish()
+
+
+if __name__ == "__main__":
+    main()
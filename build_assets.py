@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""Build the deployable site with content-hashed, precompressed assets
+
+Every static file the app loads (stylesheet, script, chapter manifest, chapter
+shards and the full translation files) is copied to the output directory as
+name.<hash>.ext, next to a gzip -9 name.<hash>.ext.gz. Hashed names never
+change content, so serve.py (or any CDN) can send them with
+`Cache-Control: immutable`; repeat visitors only download what changed, and
+the compressed bytes are ready before the first request.
+
+    dist/index.html             references rewritten, asset map inlined
+    dist/asset-manifest.json    logical name -> hashed name, for every asset
+    dist/css/style.<hash>.css (+ .gz)
+    dist/data/chapters/manifest.<hash>.json (+ .gz)
+    dist/data/chapters/<translation>/<book>/<chapter>.<hash>.json (+ .gz)
+    dist/read/<book>/<chapter>.html (+ .gz), dist/sitemap.xml   if build_pages.py ran
+
+The chapter manifest's per-chapter "hashes" (one per translation, see
+build_shards.py) are recomputed from the copied bytes and flagged with
+"hashedUrls", so the app builds shard URLs from them without a 2,400-entry
+lookup table; only the top-level assets go into the map inlined into
+index.html.
+
+Run build_shards.py first. Files that already exist under their hashed name
+are not rewritten, so rebuilding after a one-chapter edit writes one shard
+and the manifest.
+
+Usage:
+    python3 build_assets.py [--out dist] [--prune]
+"""
+import argparse
+import gzip
+import json
+import os
+import re
+
+from build_pages import DEFAULT_OUTPUT_DIR as PAGES_DIR, SITEMAP_FILE, page_root
+from build_shards import COMPACT, DEFAULT_OUTPUT_DIR as SHARD_DIR
+from content_hash import asset_hash
+from pipeline_metrics import Metrics
+from translations import translation_files
+
+DEFAULT_OUTPUT_DIR = 'dist'
+
+STATIC_ASSETS = ['css/style.css', 'js/app.js']
+
+ASSET_MANIFEST = 'asset-manifest.json'
+
+# href="..." / src="..." attributes in index.html
+ASSET_REF_RE = re.compile(r'\b(href|src)="([^"]+)"')
+
+
+def hashed_name(logical_name, content):
+    root, ext = os.path.splitext(logical_name)
+    return f"{root}.{asset_hash(content)}{ext}"
+
+
+def write_asset(output_dir, logical_name, content, written):
+    """Write content and its .gz under the content-hashed name.
+
+    Returns the hashed name; `written` counts files and bytes actually written.
+    """
+    name = hashed_name(logical_name, content)
+    path = os.path.join(output_dir, name)
+    if os.path.exists(path) and os.path.exists(path + '.gz'):
+        written['reused'] += 1
+        return name
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    compressed = gzip.compress(content, compresslevel=9, mtime=0)
+    for target, payload in ((path, content), (path + '.gz', compressed)):
+        tmp = target + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp, target)
+
+    written['files'] += 1
+    written['bytes'] += len(content)
+    written['gzipBytes'] += len(compressed)
+    return name
+
+
+def read_bytes(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def build_chapter_assets(shard_dir, output_dir, written):
+    """Hash every chapter shard and return the manifest with per-chapter hashes"""
+    with open(os.path.join(shard_dir, 'manifest.json'), encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    assets = {}
+    for book_index, book in enumerate(manifest['books']):
+        for chapter in book['chapters']:
+            hashes = []
+            for key in manifest['translations']:
+                relative = f"{key}/{book_index + 1}/{chapter['number']}.json"
+                content = read_bytes(os.path.join(shard_dir, relative))
+                logical = f"{SHARD_DIR}/{relative}"
+                assets[logical] = write_asset(output_dir, logical, content, written)
+                hashes.append(asset_hash(content))
+            chapter['hashes'] = hashes
+    manifest['hashedUrls'] = True
+
+    payload = json.dumps(manifest, ensure_ascii=False, separators=COMPACT).encode('utf-8')
+    logical = f"{SHARD_DIR}/manifest.json"
+    assets[logical] = write_asset(output_dir, logical, payload, written)
+    return assets
+
+
+def rewrite_index(html, asset_map, root=''):
+    """Point href/src at the hashed names and inline the asset map for app.js.
+
+    root is the page's relative path to the site root ('../../' for a
+    chapter page); references are looked up without it.
+    """
+    def hashed(m):
+        reference = m.group(2)
+        if root and reference.startswith(root):
+            name = asset_map.get(reference[len(root):])
+            return f'{m.group(1)}="{root + name if name else reference}"'
+        return f'{m.group(1)}="{asset_map.get(reference, reference)}"'
+
+    html = ASSET_REF_RE.sub(hashed, html)
+    inline = json.dumps(asset_map, ensure_ascii=False, separators=COMPACT, sort_keys=True)
+    script = f'<script>window.ASSET_MANIFEST = {inline};</script>\n    '
+    return html.replace('<script src=', script + '<script src=', 1)
+
+
+def write_page(output_dir, relative, content, written):
+    """Write a page that keeps its name (and its .gz) if its content changed"""
+    path = os.path.join(output_dir, relative)
+    compressed = gzip.compress(content, compresslevel=9, mtime=0)
+    if os.path.exists(path + '.gz') and read_bytes(path + '.gz') == compressed:
+        written['reused'] += 1
+        return
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    for target, payload in ((path, content), (path + '.gz', compressed)):
+        tmp = target + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp, target)
+    written['files'] += 1
+    written['bytes'] += len(content)
+    written['gzipBytes'] += len(compressed)
+
+
+def build_page_assets(pages_dir, output_dir, asset_map, written):
+    """Copy the pre-rendered chapter pages, pointing them at the hashed assets.
+
+    Returns the relative names of the pages written (and the sitemap).
+    """
+    root = page_root(pages_dir)
+    pages = []
+    for directory, _, files in os.walk(pages_dir):
+        for name in files:
+            if not name.endswith('.html'):
+                continue
+            relative = os.path.relpath(os.path.join(directory, name)).replace(os.sep, '/')
+            with open(relative, encoding='utf-8') as f:
+                html = rewrite_index(f.read(), asset_map, root)
+            write_page(output_dir, relative, html.encode('utf-8'), written)
+            pages.append(relative)
+    if os.path.exists(SITEMAP_FILE):
+        write_page(output_dir, SITEMAP_FILE, read_bytes(SITEMAP_FILE), written)
+        pages.append(SITEMAP_FILE)
+    return pages
+
+
+def prune(output_dir, keep):
+    """Delete hashed files from earlier builds that are no longer referenced"""
+    removed = 0
+    for root, _, files in os.walk(output_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            relative = os.path.relpath(path, output_dir).replace(os.sep, '/')
+            if relative.endswith('.gz'):
+                relative = relative[:-3]
+            if relative not in keep:
+                os.remove(path)
+                removed += 1
+    return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the site with content-hashed, precompressed assets")
+    parser.add_argument('--out', default=DEFAULT_OUTPUT_DIR, help="output directory")
+    parser.add_argument('--prune', action='store_true',
+                        help="delete assets from earlier builds (pages already open may still request them)")
+    args = parser.parse_args()
+
+    if not os.path.exists(os.path.join(SHARD_DIR, 'manifest.json')):
+        print(f"❌ {SHARD_DIR}/manifest.json not found - run build_shards.py first")
+        return
+
+    metrics = Metrics('build_assets')
+    written = {'files': 0, 'reused': 0, 'bytes': 0, 'gzipBytes': 0}
+
+    # Top-level assets, referenced from index.html and looked up by app.js
+    asset_map = {}
+    with metrics.stage('static'):
+        for logical in STATIC_ASSETS + [path for _, path in translation_files()]:
+            if os.path.exists(logical):
+                asset_map[logical] = write_asset(args.out, logical, read_bytes(logical), written)
+            else:
+                print(f"⚠️  {logical} not found, skipping")
+
+    with metrics.stage('chapters'):
+        shard_assets = build_chapter_assets(SHARD_DIR, args.out, written)
+    manifest_name = f"{SHARD_DIR}/manifest.json"
+    asset_map[manifest_name] = shard_assets.pop(manifest_name)
+    print(f"✓ Hashed {len(shard_assets)} chapter shards and the chapter manifest")
+
+    with open('index.html', encoding='utf-8') as f:
+        html = rewrite_index(f.read(), asset_map)
+    with open(os.path.join(args.out, 'index.html'), 'w', encoding='utf-8') as f:
+        f.write(html)
+
+    pages = []
+    if os.path.isdir(PAGES_DIR):
+        with metrics.stage('pages'):
+            pages = build_page_assets(PAGES_DIR, args.out, asset_map, written)
+        print(f"✓ Copied {sum(page.endswith('.html') for page in pages)} pre-rendered pages and the sitemap")
+    else:
+        print(f"⚠️  No {PAGES_DIR}/ - run build_pages.py for pre-rendered chapter pages")
+
+    all_assets = {**asset_map, **shard_assets}
+    with open(os.path.join(args.out, ASSET_MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump(all_assets, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+    metrics.count(filesWritten=written['files'], filesReused=written['reused'],
+                  bytesWritten=written['bytes'], gzipBytesWritten=written['gzipBytes'])
+    print(f"✓ Wrote {written['files']} new assets ({written['bytes'] / 1024:.0f} KB, "
+          f"{written['gzipBytes'] / 1024:.0f} KB gzipped), {written['reused']} unchanged")
+
+    if args.prune:
+        removed = prune(args.out, set(all_assets.values()) | set(pages) | {'index.html', ASSET_MANIFEST})
+        print(f"✓ Pruned {removed} stale files")
+
+    print(f"\nServe with: python3 serve.py --directory {args.out}")
+    metrics.finish()
+
+
+if __name__ == "__main__":
+    main()
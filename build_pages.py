@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""Pre-render one static HTML page per chapter, plus a sitemap
+
+    read/<book>/<chapter>.html    index.html with the chapter's verse rows in place
+    sitemap.xml                   every chapter page (and the home page)
+
+The rows use the same markup as displayChapter() in js/app.js (a
+.verse div per row, .verse-number and .verse-text spans, .missing-verse
+placeholders, data-verse listing the row's verse numbers) and the same
+pairing: the alignment rows from build_alignment.py where the translations
+differ, verses by position elsewhere. Each row also gets an id="v<n>"
+anchor, so read/43/3.html#v16 opens at John 3:16.
+
+A deep link paints the chapter as soon as the page itself arrives; app.js
+sees data-book on <body>, keeps the rendered rows and only adds the
+navigation, the verse heights and synchronized scrolling once the small
+chapter manifest has loaded. Choosing another chapter opens its page.
+
+Pages whose content did not change are not rewritten, so rebuilding after
+a one-chapter edit rewrites that page (and its neighbours only if a book
+name changed). build_assets.py copies the pages into dist/ with the hashed
+asset names.
+
+Usage:
+    python3 build_pages.py [--out read] [--base-url https://example.org/]
+"""
+import argparse
+import html
+import os
+from xml.sax.saxutils import escape as xml_escape
+
+from build_alignment import load_alignment
+from build_shards import build_manifest
+from pipeline_metrics import Metrics
+from translations import load_translations, translation_files
+
+DEFAULT_OUTPUT_DIR = 'read'
+DEFAULT_BASE_URL = 'http://localhost:8000/'
+SITEMAP_FILE = 'sitemap.xml'
+TEMPLATE_FILE = 'index.html'
+
+# The two columns the app shows, and the placeholders displayChapter() uses
+COLUMNS = [
+    ('english', 'englishText', '[Verse not available in English translation]'),
+    ('korean', 'koreanText', '[한국어 번역에서 사용할 수 없는 구절]'),
+]
+
+
+def page_root(output_dir=DEFAULT_OUTPUT_DIR):
+    """Relative path from a chapter page back to the site root ('../../' for read/1/1.html)"""
+    return '../' * (len(os.path.normpath(output_dir).split(os.sep)) + 1)
+
+
+def page_path(book_index, chapter_number, output_dir=DEFAULT_OUTPUT_DIR):
+    """Path of a chapter page, relative to the site root (book numbers are 1-based)"""
+    return f"{output_dir}/{book_index + 1}/{chapter_number}.html"
+
+
+def positional_rows(chapters):
+    """[[numbers per translation], ...] pairing verses by position, as app.js does"""
+    lists = [[verse['number'] for verse in chapter['verses']] if chapter else [] for chapter in chapters]
+    return [[[numbers[i]] if i < len(numbers) else [] for numbers in lists]
+            for i in range(max(map(len, lists), default=0))]
+
+
+def render_row(numbers, verses, row_number, missing_text, anchor=None):
+    """One .verse element, as createRowElement() builds it"""
+    anchor_attr = f' id="v{anchor}"' if anchor is not None else ''
+    if not numbers:
+        return (f'<div class="verse missing-verse" data-verse="{row_number}"{anchor_attr}>'
+                f'<span class="verse-number">{row_number}</span>'
+                f'<span class="verse-text">{html.escape(missing_text)}</span></div>')
+
+    label = f"{numbers[0]}-{numbers[-1]}" if len(numbers) > 1 else f"{numbers[0]}"
+    text = ' '.join(verses[number] for number in numbers if number in verses)
+    data_verse = ' '.join(str(number) for number in numbers)
+    return (f'<div class="verse" data-verse="{data_verse}"{anchor_attr}>'
+            f'<span class="verse-number">{label}</span>'
+            f'<span class="verse-text">{html.escape(text)}</span></div>')
+
+
+def render_columns(chapters, rows):
+    """{element id: inner HTML} for the two text columns"""
+    verses = [{verse['number']: verse['text'] for verse in chapter['verses']} if chapter else {}
+              for chapter in chapters]
+    columns = {element_id: [] for _, element_id, _ in COLUMNS}
+    anchored = set()
+
+    for i, row in enumerate(rows):
+        # The anchor goes on the first column that has the verse
+        anchor_column = next((c for c, numbers in enumerate(row) if numbers), None)
+        for c, (_, element_id, missing_text) in enumerate(COLUMNS):
+            numbers = row[c] if c < len(row) else []
+            anchor = None
+            if c == anchor_column and numbers[0] not in anchored:
+                anchor = numbers[0]
+                anchored.add(anchor)
+            columns[element_id].append(render_row(numbers, verses[c], i + 1, missing_text, anchor))
+
+    return {element_id: ''.join(parts) for element_id, parts in columns.items()}
+
+
+def render_page(template, manifest, data, book_index, chapter_index, base_url, output_dir=DEFAULT_OUTPUT_DIR):
+    """The full HTML of one chapter page, built from index.html"""
+    book = manifest['books'][book_index]
+    entry = book['chapters'][chapter_index]
+    keys = [key for key, _, _ in COLUMNS]
+    chapters = []
+    for key in keys:
+        books = data[key]['books']
+        translation_chapters = books[book_index]['chapters'] if book_index < len(books) else []
+        chapters.append(translation_chapters[chapter_index] if chapter_index < len(translation_chapters) else None)
+
+    rows = entry.get('rows')
+    if rows is not None:
+        columns = [manifest['translations'].index(key) for key in keys]
+        rows = [[row[c] for c in columns] for row in rows]
+    else:
+        rows = positional_rows(chapters)
+
+    number = entry['number']
+    english_name, korean_name = book['names']['english'], book['names']['korean']
+    title = f"{english_name} {number} · {korean_name} {number}장 - English-Korean Bible"
+    canonical = base_url + page_path(book_index, number, output_dir)
+    root = page_root(output_dir)
+
+    head = [f'<link rel="canonical" href="{html.escape(canonical)}">']
+    first_text = next((v['text'] for v in chapters[0]['verses']), '') if chapters[0] else ''
+    if first_text:
+        head.append(f'<meta name="description" content="{html.escape(first_text[:155])}">')
+    neighbours = chapter_neighbours(manifest, book_index, chapter_index)
+    for rel, target in zip(('prev', 'next'), neighbours):
+        if target:
+            head.append(f'<link rel="{rel}" href="{root}{page_path(*target, output_dir)}">')
+
+    page = template.replace('<title>English-Korean Bible</title>',
+                            f'<title>{html.escape(title)}</title>\n    ' + '\n    '.join(head), 1)
+    page = page.replace('href="css/', f'href="{root}css/').replace('src="js/', f'src="{root}js/')
+    page = page.replace('<body>', f'<body data-root="{root}" data-pages="{output_dir}" '
+                                  f'data-book="{book_index}" data-chapter="{number}">', 1)
+
+    # The selects show where the reader is until app.js fills them in
+    book_option = f'{html.escape(english_name)} ({html.escape(korean_name)})'
+    page = page.replace('<option value="">Select a book...</option>',
+                        f'<option value="{book_index}" selected>{book_option}</option>', 1)
+    page = page.replace('<option value="">Select a chapter...</option>',
+                        f'<option value="{chapter_index}" selected>Chapter {number}</option>', 1)
+
+    for element_id, inner in render_columns(chapters, rows).items():
+        empty = f'<div id="{element_id}" class="text-content"></div>'
+        page = page.replace(empty, f'<div id="{element_id}" class="text-content">{inner}</div>', 1)
+    return page
+
+
+def chapter_neighbours(manifest, book_index, chapter_index):
+    """((book, chapter number) of the previous page, of the next page); None at either end"""
+    books = manifest['books']
+    if chapter_index > 0:
+        previous = (book_index, books[book_index]['chapters'][chapter_index - 1]['number'])
+    elif book_index > 0 and books[book_index - 1]['chapters']:
+        previous = (book_index - 1, books[book_index - 1]['chapters'][-1]['number'])
+    else:
+        previous = None
+    if chapter_index + 1 < len(books[book_index]['chapters']):
+        following = (book_index, books[book_index]['chapters'][chapter_index + 1]['number'])
+    elif book_index + 1 < len(books) and books[book_index + 1]['chapters']:
+        following = (book_index + 1, books[book_index + 1]['chapters'][0]['number'])
+    else:
+        following = None
+    return previous, following
+
+
+def write_if_changed(path, content):
+    """Write a text file unless it already holds exactly this; returns bytes written"""
+    payload = content.encode('utf-8')
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == payload:
+                return 0
+    except FileNotFoundError:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(payload)
+    os.replace(tmp, path)
+    return len(payload)
+
+
+def build_sitemap(urls):
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>',
+             '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
+    lines += [f"  <url><loc>{xml_escape(url)}</loc></url>" for url in urls]
+    lines.append('</urlset>')
+    return '\n'.join(lines) + '\n'
+
+
+def build_pages(data, keys, alignment, output_dir=DEFAULT_OUTPUT_DIR, base_url=DEFAULT_BASE_URL,
+                template_file=TEMPLATE_FILE, sitemap_file=SITEMAP_FILE):
+    """Render every chapter page and the sitemap; returns (pages, pages written, bytes written)"""
+    missing = [key for key, _, _ in COLUMNS if key not in keys]
+    if missing:
+        raise ValueError(f"The pages show {', '.join(k for k, _, _ in COLUMNS)}; missing: {', '.join(missing)}")
+    with open(template_file, 'r', encoding='utf-8') as f:
+        template = f.read()
+
+    manifest = build_manifest(data, keys, alignment)
+    urls = [base_url]
+    pages = written = bytes_written = 0
+    for book_index, book in enumerate(manifest['books']):
+        for chapter_index, chapter in enumerate(book['chapters']):
+            page = render_page(template, manifest, data, book_index, chapter_index, base_url, output_dir)
+            path = os.path.join(output_dir, str(book_index + 1), f"{chapter['number']}.html")
+            size = write_if_changed(path, page)
+            pages += 1
+            written += bool(size)
+            bytes_written += size
+            urls.append(base_url + page_path(book_index, chapter['number'], output_dir))
+
+    # Always rewritten: its mtime tells watch.py the pages are current
+    with open(sitemap_file, 'w', encoding='utf-8') as f:
+        f.write(build_sitemap(urls))
+    return pages, written, bytes_written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-render a static HTML page per chapter and a sitemap")
+    parser.add_argument('--out', default=DEFAULT_OUTPUT_DIR, help="output directory")
+    parser.add_argument('--base-url', default=DEFAULT_BASE_URL,
+                        help="public URL of the site root, for the sitemap and canonical links")
+    args = parser.parse_args()
+    base_url = args.base_url if args.base_url.endswith('/') else args.base_url + '/'
+
+    files = translation_files()
+    keys = [key for key, _ in files]
+    metrics = Metrics('build_pages')
+
+    print("Loading translations...")
+    with metrics.stage('load'):
+        data = load_translations(files)
+        alignment = load_alignment()
+
+    with metrics.stage('render'):
+        pages, written, bytes_written = build_pages(data, keys, alignment, args.out, base_url)
+        metrics.count(pages=pages, filesWritten=written, bytesWritten=bytes_written)
+
+    print(f"✓ Rendered {pages} chapter pages, {written} changed ({bytes_written / 1024:.0f} KB written) in {args.out}/")
+    print(f"✓ Wrote {SITEMAP_FILE} ({pages + 1} URLs)")
+    metrics.finish()
+
+
+if __name__ == "__main__":
+    main()
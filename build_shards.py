@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""Split full translation files into per-chapter shards plus a small manifest
+
+The web app only needs the book list and chapter/verse counts at startup.
+Chapter text is fetched on demand from the shards written here:
+
+    data/chapters/manifest.json
+    data/chapters/<translation>/<book number>/<chapter number>.json
+
+Every manifest chapter lists a content hash of each translation's shard
+("hashes", in translation order), and the manifest has a "version" that
+goes up whenever any hash changes. Clients holding an older manifest
+only need to refetch the chapters whose hashes differ; chapter_patch.py
+updates shards and manifest one chapter at a time.
+
+Usage:
+    python3 build_shards.py [--out data/chapters]
+"""
+import argparse
+import json
+import os
+
+from bibledata import to_json
+from build_alignment import ALIGNMENT_FILE, load_alignment
+from content_hash import asset_hash
+from pipeline_metrics import Metrics
+from translations import load_translations, translation_files
+
+# (key, converted file) in display order (the app shows them left to right)
+TRANSLATIONS = translation_files()
+
+DEFAULT_OUTPUT_DIR = 'data/chapters'
+
+# Compact separators - the shards are read by the browser, not by people
+COMPACT = (',', ':')
+
+
+def build_manifest(data, keys, alignment=None):
+    """Build the manifest of books, chapter numbers and verse counts.
+
+    Verse counts are listed in the same order as manifest['translations'].
+    The first translation defines the book and chapter order; the others are
+    matched by position. Chapters in the alignment table (see
+    build_alignment.py) also carry their aligned verse rows.
+    """
+    alignment = alignment or {}
+    primary = data[keys[0]]
+    books = []
+
+    for book_index, primary_book in enumerate(primary['books']):
+        names = {}
+        translation_books = {}
+        for key in keys:
+            book_list = data[key]['books']
+            book = book_list[book_index] if book_index < len(book_list) else None
+            translation_books[key] = book
+            names[key] = book['name'] if book else primary_book['name']
+
+        chapters = []
+        for chapter_index, primary_chapter in enumerate(primary_book['chapters']):
+            verse_counts = []
+            for key in keys:
+                book = translation_books[key]
+                chapter = None
+                if book and chapter_index < len(book['chapters']):
+                    chapter = book['chapters'][chapter_index]
+                verse_counts.append(len(chapter['verses']) if chapter else 0)
+            entry = {
+                "number": primary_chapter['number'],
+                "verseCounts": verse_counts
+            }
+            rows = alignment.get((book_index, primary_chapter['number']))
+            if rows is not None:
+                entry["rows"] = rows
+            chapters.append(entry)
+
+        books.append({
+            "names": names,
+            "abbreviation": primary_book['abbreviation'],
+            "chapters": chapters
+        })
+
+    return {"translations": keys, "books": books}
+
+
+def chapter_payload(chapter):
+    """The exact bytes of a chapter shard (its content hash is taken over these)"""
+    return json.dumps(chapter, ensure_ascii=False, separators=COMPACT, default=to_json).encode('utf-8')
+
+
+def shard_path(output_dir, key, book_index, chapter_number):
+    """Path of one chapter shard (book numbers are 1-based)"""
+    return os.path.join(output_dir, key, str(book_index + 1), f"{chapter_number}.json")
+
+
+def write_shards(data, manifest, output_dir, previous=None):
+    """Write one compact JSON file per translation/book/chapter and record
+    their hashes in the manifest.
+
+    With the previous manifest, shards whose hash has not changed are left
+    as they are. Returns (files written, bytes written).
+    """
+    files_written = 0
+    bytes_written = 0
+    unchanged = chapter_hashes(previous) if previous is not None else {}
+
+    for manifest_book in manifest['books']:
+        for manifest_chapter in manifest_book['chapters']:
+            manifest_chapter['hashes'] = []
+
+    for key in manifest['translations']:
+        book_list = data[key]['books']
+        for book_index, manifest_book in enumerate(manifest['books']):
+            book = book_list[book_index] if book_index < len(book_list) else None
+            for chapter_index, manifest_chapter in enumerate(manifest_book['chapters']):
+                chapter = None
+                if book and chapter_index < len(book['chapters']):
+                    chapter = book['chapters'][chapter_index]
+                if chapter is None:
+                    # Keep the URL scheme total so the app never sees a 404
+                    chapter = {"number": manifest_chapter['number'], "verses": []}
+
+                path = shard_path(output_dir, key, book_index, manifest_chapter['number'])
+                payload = chapter_payload(chapter)
+                digest = asset_hash(payload)
+                manifest_chapter['hashes'].append(digest)
+                if unchanged.get((key, book_index, manifest_chapter['number'])) == digest and os.path.exists(path):
+                    continue
+
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, 'wb') as f:
+                    f.write(payload)
+                files_written += 1
+                bytes_written += len(payload)
+
+    return files_written, bytes_written
+
+
+def read_manifest(output_dir):
+    """The current manifest, or None if the shards have not been built"""
+    path = os.path.join(output_dir, 'manifest.json')
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def chapter_hashes(manifest):
+    """{(key, book index, chapter number): hash} for every shard in a manifest"""
+    hashes = {}
+    for book_index, book in enumerate(manifest['books']):
+        for chapter in book['chapters']:
+            for key, value in zip(manifest['translations'], chapter.get('hashes', [])):
+                hashes[(key, book_index, chapter['number'])] = value
+    return hashes
+
+
+def set_version(manifest, previous):
+    """Carry the version over from the previous manifest, bumped if any chapter changed"""
+    if previous is None:
+        manifest['version'] = 1
+    elif chapter_hashes(previous) != chapter_hashes(manifest):
+        manifest['version'] = previous.get('version', 0) + 1
+    else:
+        manifest['version'] = previous.get('version', 1)
+
+
+def write_manifest(manifest, output_dir):
+    """Write manifest.json atomically and return its size in bytes"""
+    os.makedirs(output_dir, exist_ok=True)
+    payload = json.dumps(manifest, ensure_ascii=False, separators=COMPACT).encode('utf-8')
+    path = os.path.join(output_dir, 'manifest.json')
+    with open(path + '.tmp', 'wb') as f:
+        f.write(payload)
+    os.replace(path + '.tmp', path)
+    return len(payload)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build per-chapter data shards for the web app")
+    parser.add_argument('--out', default=DEFAULT_OUTPUT_DIR, help="output directory")
+    args = parser.parse_args()
+
+    keys = [key for key, _ in TRANSLATIONS]
+    metrics = Metrics('build_shards')
+
+    print("Loading translations...")
+    with metrics.stage('load'):
+        data = load_translations(TRANSLATIONS)
+        alignment = load_alignment()
+        metrics.count(translations=len(data))
+    if not alignment:
+        print(f"⚠️  No {ALIGNMENT_FILE} - run build_alignment.py for aligned rows in mismatched chapters")
+
+    with metrics.stage('manifest'):
+        manifest = build_manifest(data, keys, alignment)
+        chapter_count = sum(len(b['chapters']) for b in manifest['books'])
+        metrics.count(books=len(manifest['books']), chapters=chapter_count)
+    print(f"✓ {len(manifest['books'])} books, {chapter_count} chapters ({len(alignment)} with alignment rows)")
+
+    with metrics.stage('write'):
+        previous = read_manifest(args.out)
+        files_written, bytes_written = write_shards(data, manifest, args.out, previous)
+        set_version(manifest, previous)
+        manifest_bytes = write_manifest(manifest, args.out)
+        metrics.count(filesWritten=files_written + 1, bytesWritten=bytes_written + manifest_bytes)
+
+    print(f"✓ Wrote {files_written} changed chapter shard(s) ({bytes_written / 1024:.0f} KB)")
+    print(f"✓ Wrote manifest version {manifest['version']} ({manifest_bytes / 1024:.1f} KB) "
+          f"to {os.path.join(args.out, 'manifest.json')}")
+    metrics.finish()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""Aligned multi-translation chapter API, served by serve.py --api
+
+    GET /api/chapter/<book>/<chapter>?langs=en,ko
+    GET /api/stats
+
+<book> is a 1-based book number, English name, abbreviation or Korean name;
+langs are registry language codes or keys (default: every translation).
+The response pairs the verses of the requested translations row by row,
+using the alignment table for chapters whose verses differ:
+
+    {"book": {...}, "chapter": 9, "translations": ["en", "ko"],
+     "rows": [[[{"number": 1, "text": "..."}], [{"number": 1, "text": "..."}]], ...]}
+
+Serialized responses are kept in a bounded LRU cache. When a translation
+file or the alignment table changes (watch.py, repairs), the index is
+rebuilt and the cache cleared on the next request.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from urllib.parse import parse_qs, unquote
+
+from bibledata import to_json
+from build_alignment import ALIGNMENT_FILE, load_alignment
+from translations import TRANSLATIONS, load_translations
+
+DEFAULT_CACHE_SIZE = 256
+
+
+class LRUCache:
+    """Thread-safe bounded mapping that evicts the least recently used entry"""
+
+    def __init__(self, max_entries=DEFAULT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "maxEntries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+def files_signature(paths):
+    """(size, mtime) of each file, None for missing ones"""
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            signature.append((stat.st_size, stat.st_mtime_ns))
+        except FileNotFoundError:
+            signature.append(None)
+    return signature
+
+
+class ChapterIndex:
+    """Every translation's chapters in memory, keyed by (book index, chapter number)"""
+
+    def __init__(self, registry=None, root='.'):
+        entries = registry or TRANSLATIONS
+        self.registry = entries
+        self.root = root
+        self.keys = [entry['key'] for entry in entries]
+        self.langs = [entry.get('lang', entry['key']) for entry in entries]
+        # Registry paths are relative to the site directory
+        outputs = [os.path.join(root, entry['output']) for entry in entries]
+        alignment_file = os.path.join(root, ALIGNMENT_FILE)
+        self.files = outputs + [alignment_file]
+        self.signature = files_signature(self.files)
+        data = load_translations(list(zip(self.keys, outputs)))
+
+        self.chapters = {}
+        for key in self.keys:
+            self.chapters[key] = {
+                (book_index, chapter['number']): chapter
+                for book_index, book in enumerate(data[key]['books'])
+                for chapter in book['chapters']
+            }
+
+        primary = data[self.keys[0]]['books']
+        self.books = []
+        self.book_lookup = {}
+        for book_index, book in enumerate(primary):
+            names = {}
+            for key, lang in zip(self.keys, self.langs):
+                books = data[key]['books']
+                if book_index < len(books):
+                    names[lang] = books[book_index]['name']
+            self.books.append({"index": book_index, "abbreviation": book['abbreviation'], "names": names})
+            for identifier in [str(book_index + 1), book['abbreviation'], *names.values()]:
+                self.book_lookup.setdefault(identifier.casefold(), book_index)
+
+        self.alignment = load_alignment(alignment_file)
+
+    def resolve_book(self, identifier):
+        return self.book_lookup.get(identifier.casefold())
+
+    def resolve_translation(self, name):
+        """Translation key for a language code or key, or None"""
+        if name in self.keys:
+            return name
+        if name in self.langs:
+            return self.keys[self.langs.index(name)]
+        return None
+
+    def rows(self, book_index, chapter_number, keys):
+        """Aligned rows of verse objects for the given translation keys"""
+        chapters = [self.chapters[key].get((book_index, chapter_number)) for key in keys]
+        verses = [{v['number']: v for v in chapter['verses']} if chapter else {} for chapter in chapters]
+
+        aligned = self.alignment.get((book_index, chapter_number))
+        if aligned is not None:
+            columns = [self.keys.index(key) for key in keys]
+            number_rows = [[row[c] for c in columns] for row in aligned]
+        else:
+            lists = [[v['number'] for v in chapter['verses']] if chapter else [] for chapter in chapters]
+            number_rows = [[[numbers[i]] if i < len(numbers) else [] for numbers in lists]
+                           for i in range(max(map(len, lists), default=0))]
+
+        rows = []
+        for number_row in number_rows:
+            if not any(number_row):
+                continue
+            rows.append([[verses[t][n] for n in numbers if n in verses[t]]
+                         for t, numbers in enumerate(number_row)])
+        return rows
+
+
+class ChapterAPI:
+    """Routes /api/ requests and caches serialized responses"""
+
+    def __init__(self, index=None, cache_size=DEFAULT_CACHE_SIZE, root='.'):
+        self.index = index or ChapterIndex(root=root)
+        self.cache = LRUCache(cache_size)
+        self.reloads = 0
+        self._reload_lock = threading.Lock()
+
+    def refresh(self):
+        """Rebuild the index if its files changed since it was built"""
+        if files_signature(self.index.files) == self.index.signature:
+            return
+        with self._reload_lock:
+            if files_signature(self.index.files) == self.index.signature:
+                return
+            try:
+                index = ChapterIndex(self.index.registry, self.index.root)
+            except (OSError, ValueError) as e:
+                # A file is being rewritten: keep serving the old index
+                print(f"⚠️  Chapter index not reloaded: {e}")
+                return
+            self.index = index
+            self.cache.clear()
+            self.reloads += 1
+
+    def handle(self, path, query):
+        """(status, body bytes, etag or None) for an /api/ path"""
+        self.refresh()
+        index = self.index
+        parts = [unquote(part) for part in path.strip('/').split('/')]
+
+        if parts == ['api', 'stats']:
+            return 200, self._json({"cache": self.cache.stats(), "reloads": self.reloads}), None
+
+        if len(parts) != 4 or parts[:2] != ['api', 'chapter']:
+            return 404, self._json({"error": "Unknown API path"}), None
+
+        book_index = index.resolve_book(parts[2])
+        if book_index is None:
+            return 404, self._json({"error": f"Book {parts[2]} not found"}), None
+        if not parts[3].isdigit():
+            return 400, self._json({"error": "Chapter must be a number"}), None
+        chapter_number = int(parts[3])
+
+        requested = parse_qs(query).get('langs', [','.join(index.langs)])[0].split(',')
+        keys = [index.resolve_translation(name.strip()) for name in requested if name.strip()]
+        if not keys or None in keys:
+            return 400, self._json({"error": f"Unknown translation in langs={','.join(requested)}"}), None
+
+        cache_key = (book_index, chapter_number, tuple(keys))
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return 200, cached[0], cached[1]
+
+        if all((book_index, chapter_number) not in index.chapters[key] for key in keys):
+            return 404, self._json({"error": f"Chapter {chapter_number} not found"}), None
+
+        body = self._json({
+            "book": index.books[book_index],
+            "chapter": chapter_number,
+            "translations": [index.langs[index.keys.index(key)] for key in keys],
+            "rows": index.rows(book_index, chapter_number, keys)
+        })
+        etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+        if index is self.index:
+            self.cache.put(cache_key, (body, etag))
+        return 200, body, etag
+
+    @staticmethod
+    def _json(payload):
+        return json.dumps(payload, ensure_ascii=False, separators=(',', ':'), default=to_json).encode('utf-8')
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""Chapter-level patches for the converted translations and their shards
+
+A repair is recorded as a patch listing only the chapters that changed,
+each with the content hash it expects now ("before") and the one it leaves
+behind ("after"):
+
+    {"format": 1, "translation": "korean", "created": "...",
+     "chapters": [{"bookIndex": 17, "book": "욥기", "chapter": 42,
+                   "before": "0e5f...", "after": "9c1b...",
+                   "previous": {...old chapter...}, "content": {...new chapter...}}]}
+
+Hashes are the shard hashes from the chapter manifest (see build_shards.py),
+so a patch only applies on top of the data it was made from. Applying it
+writes just the changed chapter shards, the manifest (new hashes, verse
+counts, version + 1; alignment rows are dropped where a verse count
+changed, so the app pairs those verses by position until build_alignment.py
+and build_shards.py run again) and the translation file, every one staged under a
+temporary name and renamed into place once all of them are written. The
+translation file is a single JSON document, so it is still rewritten in
+full (streamed one book at a time); only the shards are written per chapter. Clients
+compare manifest hashes and refetch only the chapters that changed.
+
+Patches keep the previous content, so any patch can be reverted.
+
+Usage:
+    python3 chapter_patch.py diff <translation key> <new translation file>
+    python3 chapter_patch.py apply <patch file> [--compact]
+    python3 chapter_patch.py revert <patch file> [--compact]
+    python3 chapter_patch.py changed <old manifest> [<new manifest>]
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timezone
+from itertools import zip_longest
+
+from build_shards import (DEFAULT_OUTPUT_DIR, chapter_hashes, chapter_payload, read_manifest,
+                          shard_path, write_manifest)
+from content_hash import asset_hash
+from stream_convert import iter_json_array, write_books_json
+from translations import get_translation
+
+PATCH_DIR = 'data/patches'
+PATCH_FORMAT = 1
+
+
+def empty_chapter(number):
+    """What a shard holds for a chapter the translation does not have"""
+    return {"number": number, "verses": []}
+
+
+def chapter_hash(chapter, number):
+    return asset_hash(chapter_payload(chapter if chapter is not None else empty_chapter(number)))
+
+
+def diff_books(key, old_books, new_books):
+    """Patch for every chapter that differs between two iterables of books.
+
+    Both are consumed in step, so they can be streamed one book at a time.
+    """
+    entries = []
+    for book_index, (old_book, new_book) in enumerate(zip_longest(old_books, new_books)):
+        if old_book is None or new_book is None:
+            raise ValueError(f"{key}: the number of books changed - rebuild instead of patching")
+
+        old_chapters = {c['number']: c for c in old_book['chapters']}
+        new_chapters = {c['number']: c for c in new_book['chapters']}
+        for number in sorted(old_chapters.keys() | new_chapters.keys()):
+            old, new = old_chapters.get(number), new_chapters.get(number)
+            before, after = chapter_hash(old, number), chapter_hash(new, number)
+            if before != after:
+                entries.append({
+                    "bookIndex": book_index,
+                    "book": new_book['name'],
+                    "chapter": number,
+                    "before": before,
+                    "after": after,
+                    "previous": old,
+                    "content": new
+                })
+
+    return {
+        "format": PATCH_FORMAT,
+        "translation": key,
+        "created": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        "chapters": entries
+    }
+
+
+def diff_translation(key, old_data, new_data):
+    """Patch between two loaded {"books": [...]} translations"""
+    return diff_books(key, old_data['books'], new_data['books'])
+
+
+def invert(patch):
+    """The patch that undoes `patch`"""
+    return {
+        **patch,
+        "created": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        "chapters": [{**entry, "before": entry['after'], "after": entry['before'],
+                      "previous": entry['content'], "content": entry['previous']}
+                     for entry in patch['chapters']]
+    }
+
+
+def save_patch(patch, directory=PATCH_DIR):
+    """Write a patch as <directory>/<translation>-<timestamp>.json; returns the path"""
+    os.makedirs(directory, exist_ok=True)
+    stamp = patch['created'].replace(':', '').replace('-', '').split('+')[0]
+    path = os.path.join(directory, f"{patch['translation']}-{stamp}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(patch, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def load_patch(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        patch = json.load(f)
+    if patch.get('format') != PATCH_FORMAT:
+        raise ValueError(f"{path}: unsupported patch format {patch.get('format')}")
+    return patch
+
+
+def _patched_books(books, entries, key):
+    """Books with the patched chapters swapped in, checking each 'before' hash"""
+    remaining = dict(entries)
+    for book_index, book in enumerate(books):
+        wanted = {number: entry for (b, number), entry in remaining.items() if b == book_index}
+        if wanted:
+            chapters = {c['number']: c for c in book['chapters']}
+            for number, entry in wanted.items():
+                if chapter_hash(chapters.get(number), number) != entry['before']:
+                    raise ValueError(f"{key}: {book['name']} {number} has changed since the patch was made")
+                if entry['content'] is None:
+                    chapters.pop(number, None)
+                else:
+                    chapters[number] = entry['content']
+                del remaining[(book_index, number)]
+            book = {**book, "chapters": [chapters[n] for n in sorted(chapters)]}
+        yield book
+
+    if remaining:
+        raise ValueError(f"{key}: patch refers to {len(remaining)} chapter(s) beyond the last book")
+
+
+def _manifest_chapter(manifest, book_index, number):
+    """A chapter's entry in the manifest, or None if the manifest does not have it"""
+    if not 0 <= book_index < len(manifest['books']):
+        return None
+    return next((c for c in manifest['books'][book_index]['chapters'] if c['number'] == number), None)
+
+
+def apply_patch(patch, translation_file=None, shard_dir=DEFAULT_OUTPUT_DIR, indent=2):
+    """Apply a patch to the translation file and, if built, the chapter shards.
+
+    Nothing is replaced unless every 'before' hash matches. Returns a summary
+    with the chapters whose verse counts changed (their alignment may need
+    rebuilding).
+    """
+    key = patch['translation']
+    entries = {(entry['bookIndex'], entry['chapter']): entry for entry in patch['chapters']}
+    path = translation_file or get_translation(key)['output']
+    summary = {"chapters": len(entries), "bytesWritten": 0, "countsChanged": [], "manifestVersion": None}
+    if not entries:
+        return summary
+
+    # Check the shards first: they must agree with what the patch was made from
+    manifest = read_manifest(shard_dir)
+    if manifest is not None and key not in manifest['translations']:
+        manifest = None
+    manifest_chapters = {}
+    if manifest is not None:
+        current = chapter_hashes(manifest)
+        for (book_index, number), entry in entries.items():
+            manifest_chapter = _manifest_chapter(manifest, book_index, number)
+            if manifest_chapter is None:
+                raise ValueError(f"{key}: {entry['book']} {number} is not in the chapter manifest "
+                                 f"- run build_shards.py, then apply it again")
+            manifest_chapters[(book_index, number)] = manifest_chapter
+            if current.get((key, book_index, number)) != entry['before']:
+                raise ValueError(f"{key}: shard for {entry['book']} {number} does not match the patch "
+                                 f"- run build_shards.py, then apply it again")
+
+    staged = []
+    try:
+        # The translation file, streamed book by book (hashes checked on the way)
+        books = iter_json_array(path)
+        write_books_json(path + '.patched', _patched_books(books, entries, key), indent)
+        staged.append((path + '.patched', path))
+        summary['bytesWritten'] += os.path.getsize(path + '.patched')
+
+        if manifest is not None:
+            column = manifest['translations'].index(key)
+            for (book_index, number), entry in entries.items():
+                chapter = entry['content'] if entry['content'] is not None else empty_chapter(number)
+                payload = chapter_payload(chapter)
+                target = shard_path(shard_dir, key, book_index, number)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                with open(target + '.patched', 'wb') as f:
+                    f.write(payload)
+                staged.append((target + '.patched', target))
+                summary['bytesWritten'] += len(payload)
+
+                manifest_chapter = manifest_chapters[(book_index, number)]
+                manifest_chapter['hashes'][column] = entry['after']
+                if manifest_chapter['verseCounts'][column] != len(chapter['verses']):
+                    manifest_chapter['verseCounts'][column] = len(chapter['verses'])
+                    # The rows were aligned for the old counts and may name verses that are gone
+                    manifest_chapter.pop('rows', None)
+                    summary['countsChanged'].append((entry['book'], number))
+            manifest['version'] = manifest.get('version', 1) + 1
+    except BaseException:
+        for tmp, _ in staged:
+            os.remove(tmp)
+        raise
+
+    for tmp, target in staged:
+        os.replace(tmp, target)
+    # The manifest goes last: clients see the new hashes only once the shards are in place
+    if manifest is not None:
+        summary['bytesWritten'] += write_manifest(manifest, shard_dir)
+        summary['manifestVersion'] = manifest['version']
+
+    return summary
+
+
+def changed_chapters(old_manifest, new_manifest):
+    """[(key, book index, chapter number)] whose shards differ between two manifests"""
+    old, new = chapter_hashes(old_manifest), chapter_hashes(new_manifest)
+    return sorted(ref for ref, value in new.items() if old.get(ref) != value)
+
+
+def print_summary(patch, summary):
+    print(f"✓ {summary['chapters']} chapter(s) of {patch['translation']} patched, "
+          f"{summary['bytesWritten'] / 1024:.0f} KB written")
+    if summary['manifestVersion'] is not None:
+        print(f"✓ Chapter manifest is now version {summary['manifestVersion']}")
+    else:
+        print("⚠️  No chapter shards for this translation - run build_shards.py to build them")
+    if summary['countsChanged']:
+        chapters = ', '.join(f"{book} {number}" for book, number in summary['countsChanged'])
+        print(f"⚠️  Verse counts changed in {chapters} - run build_alignment.py and build_shards.py")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Make, apply and revert chapter-level patches")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    diff = commands.add_parser('diff', help="make a patch from a repaired translation file")
+    diff.add_argument('key', help="translation key in the registry")
+    diff.add_argument('new_file', help="repaired {\"books\": [...]} file")
+    diff.add_argument('--out', default=PATCH_DIR, help="directory for the patch file")
+
+    for name, help_text in (('apply', "apply a patch"), ('revert', "undo a patch")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument('patch')
+        command.add_argument('--compact', action='store_true', help="write the translation file without indentation")
+
+    changed = commands.add_parser('changed', help="chapters whose shards differ between two manifests")
+    changed.add_argument('old_manifest')
+    changed.add_argument('new_manifest', nargs='?', default=os.path.join(DEFAULT_OUTPUT_DIR, 'manifest.json'))
+
+    args = parser.parse_args()
+    try:
+        run_command(args)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+
+def run_command(args):
+    if args.command == 'diff':
+        current = get_translation(args.key)['output']
+        patch = diff_books(args.key, iter_json_array(current), iter_json_array(args.new_file))
+        if not patch['chapters']:
+            print(f"✓ {args.new_file} matches {current} - nothing to patch")
+            return
+        path = save_patch(patch, args.out)
+        for entry in patch['chapters']:
+            print(f"  {entry['book']} {entry['chapter']}: {entry['before']} -> {entry['after']}")
+        print(f"✓ {len(patch['chapters'])} changed chapter(s) saved to {path}")
+
+    elif args.command in ('apply', 'revert'):
+        patch = load_patch(args.patch)
+        if args.command == 'revert':
+            patch = invert(patch)
+        summary = apply_patch(patch, indent=None if args.compact else 2)
+        print_summary(patch, summary)
+
+    else:
+        with open(args.old_manifest, 'r', encoding='utf-8') as f:
+            old_manifest = json.load(f)
+        with open(args.new_manifest, 'r', encoding='utf-8') as f:
+            new_manifest = json.load(f)
+        changes = changed_chapters(old_manifest, new_manifest)
+        print(f"Version {old_manifest.get('version')} -> {new_manifest.get('version')}: "
+              f"{len(changes)} changed chapter(s)")
+        for key, book_index, number in changes:
+            print(f"  {key}/{book_index + 1}/{number}")
+
+
+if __name__ == "__main__":
+    main()
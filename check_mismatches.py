@@ -1,63 +1,152 @@
 #!/usr/bin/env python3
-"""Script to check for verse count mismatches between English and Korean Bible data"""
+"""Script to check for verse count mismatches between English and Korean Bible data
+
+Usage:
+    python3 check_mismatches.py [--incremental]
+
+With --incremental, the results are kept in .mismatch_cache.json together
+with the size and mtime of both data files. A later run that finds neither
+file changed reuses the results without loading either translation. After
+an edit every chapter is compared again: the check only compares verse
+counts (bibledata.read_index, which only parses a file the parse cache
+does not hold), so that is cheaper than hashing chapters to find the
+changed ones. The report is the same as a full scan.
+
+The counts are compared as one array operation (verse_counts.CountMatrix),
+which requires NumPy.
+"""
 import json
+import os
+import sys
+
+from bibledata import read_index
+from content_hash import file_signature
+from pipeline_metrics import Metrics
+from verse_counts import CountMatrix
+
+ENGLISH_FILE = 'data/english.json'
+KOREAN_FILE = 'data/korean.json'
+REPORT_FILE = 'mismatch_report.json'
+CACHE_FILE = '.mismatch_cache.json'
+CACHE_VERSION = 3
+
+
+def compare_chapter(english_book, korean_book, chapter_index):
+    """Mismatch entry for one chapter, or None if the verse counts agree"""
+    english_chapter = english_book['chapters'][chapter_index]
+    korean_chapter = korean_book['chapters'][chapter_index]
+    return compare_counts(english_book['name'], korean_book['name'], english_chapter['number'],
+                          len(english_chapter['verses']), len(korean_chapter['verses']))
+
+
+def compare_counts(english_name, korean_name, chapter_number, english_verse_count, korean_verse_count):
+    """compare_chapter on verse counts alone"""
+    if english_verse_count == korean_verse_count:
+        return None
+
+    return {
+        'book': english_name,
+        'koreanBook': korean_name,
+        'chapter': chapter_number,
+        'englishVerses': english_verse_count,
+        'koreanVerses': korean_verse_count,
+        'difference': english_verse_count - korean_verse_count
+    }
+
+
+def load_cache():
+    if not os.path.exists(CACHE_FILE):
+        return None
+    with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+        cache = json.load(f)
+    return cache if cache.get('version') == CACHE_VERSION else None
+
+
+def save_cache(signatures, mismatches, total):
+    with open(CACHE_FILE, 'w', encoding='utf-8') as f:
+        json.dump({
+            'version': CACHE_VERSION,
+            'files': signatures,
+            'chapters': total,
+            'mismatches': mismatches
+        }, f, ensure_ascii=False, separators=(',', ':'))
+
+
+def find_mismatches(incremental=False):
+    """Return (mismatches, chapters checked, chapters total)"""
+    if incremental:
+        signatures = {'english': file_signature(ENGLISH_FILE), 'korean': file_signature(KOREAN_FILE)}
+        cache = load_cache()
+        # Neither file changed: the cached results are the report
+        if cache and cache['files'] == signatures:
+            return cache['mismatches'], 0, cache['chapters']
+
+    # Verse counts only (bibledata.read_index): no verse text is kept, and a
+    # file the parse cache already holds is not parsed at all
+    english_books = read_index(ENGLISH_FILE)['books']
+    korean_books = read_index(KOREAN_FILE)['books']
+    matrix = CountMatrix.from_counts({
+        'english': [(book['name'], book['verseCounts']) for book in english_books],
+        'korean': [(book['name'], book['verseCounts']) for book in korean_books],
+    })
+
+    # Chapters both translations have, in book and chapter order
+    mismatches = [
+        compare_counts(english_books[book_index]['name'], korean_books[book_index]['name'],
+                       english_books[book_index]['chapters'][chapter_index], english_count, korean_count)
+        for book_index, chapter_index, english_count, korean_count
+        in matrix.mismatches('english', 'korean', require_both=True)
+    ]
+    total = int((matrix.present[..., matrix.index('english')] & matrix.present[..., matrix.index('korean')]).sum())
+
+    if incremental:
+        save_cache(signatures, mismatches, total)
+    return mismatches, total, total
+
+
+def save_report(mismatches, path=REPORT_FILE):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(mismatches, f, indent=2, ensure_ascii=False)
+
+
+def main():
+    incremental = '--incremental' in sys.argv
+    metrics = Metrics('check_mismatches')
+    with metrics.stage('check'):
+        mismatches, checked, total = find_mismatches(incremental)
+        metrics.count(chapters=total, chaptersChecked=checked, mismatches=len(mismatches))
+    total_mismatches = len(mismatches)
+
+    # Output results
+    print('\n=== VERSE COUNT MISMATCH REPORT ===\n')
+    if incremental and not checked:
+        print(f'Neither data file changed since the last run; reusing the results for {total} chapter(s)\n')
+
+    if not mismatches:
+        print('✓ No mismatches found! All chapters have matching verse counts.')
+    else:
+        print(f'Found {total_mismatches} chapter(s) with mismatched verse counts:\n')
+
+        for m in mismatches:
+            print(f"{m['book']} ({m['koreanBook']}) - Chapter {m['chapter']}")
+            print(f"  English: {m['englishVerses']} verses")
+            print(f"  Korean: {m['koreanVerses']} verses")
+            diff_sign = '+' if m['difference'] > 0 else ''
+            print(f"  Difference: {diff_sign}{m['difference']}")
+            print()
+
+        # Summary
+        print('=== SUMMARY ===')
+        print(f"Total mismatched chapters: {total_mismatches}")
+        unique_books = len(set(m['book'] for m in mismatches))
+        print(f"Books affected: {unique_books}")
+
+    # Save detailed report to file
+    save_report(mismatches)
+
+    print(f'\nDetailed report saved to: {REPORT_FILE}')
+    metrics.finish()
+
 
-# Load both JSON files
-with open('data/english.json', 'r', encoding='utf-8') as f:
-    english_data = json.load(f)
-
-with open('data/korean.json', 'r', encoding='utf-8') as f:
-    korean_data = json.load(f)
-
-mismatches = []
-total_mismatches = 0
-
-# Compare each book and chapter
-for book_index, english_book in enumerate(english_data['books']):
-    korean_book = korean_data['books'][book_index]
-
-    for chapter_index, english_chapter in enumerate(english_book['chapters']):
-        korean_chapter = korean_book['chapters'][chapter_index]
-
-        english_verse_count = len(english_chapter['verses'])
-        korean_verse_count = len(korean_chapter['verses'])
-
-        if english_verse_count != korean_verse_count:
-            mismatch = {
-                'book': english_book['name'],
-                'koreanBook': korean_book['name'],
-                'chapter': english_chapter['number'],
-                'englishVerses': english_verse_count,
-                'koreanVerses': korean_verse_count,
-                'difference': english_verse_count - korean_verse_count
-            }
-            mismatches.append(mismatch)
-            total_mismatches += 1
-
-# Output results
-print('\n=== VERSE COUNT MISMATCH REPORT ===\n')
-
-if not mismatches:
-    print('✓ No mismatches found! All chapters have matching verse counts.')
-else:
-    print(f'Found {total_mismatches} chapter(s) with mismatched verse counts:\n')
-
-    for m in mismatches:
-        print(f"{m['book']} ({m['koreanBook']}) - Chapter {m['chapter']}")
-        print(f"  English: {m['englishVerses']} verses")
-        print(f"  Korean: {m['koreanVerses']} verses")
-        diff_sign = '+' if m['difference'] > 0 else ''
-        print(f"  Difference: {diff_sign}{m['difference']}")
-        print()
-
-    # Summary
-    print('=== SUMMARY ===')
-    print(f"Total mismatched chapters: {total_mismatches}")
-    unique_books = len(set(m['book'] for m in mismatches))
-    print(f"Books affected: {unique_books}")
-
-# Save detailed report to file
-with open('mismatch_report.json', 'w', encoding='utf-8') as f:
-    json.dump(mismatches, f, indent=2, ensure_ascii=False)
-
-print('\nDetailed report saved to: mismatch_report.json')
+if __name__ == "__main__":
+    main()
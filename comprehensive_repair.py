@@ -1,16 +1,32 @@
 #!/usr/bin/env python3
 """Comprehensive Bible data repair using GetBible API"""
 import json
+import os
+import sys
+
+from chapter_patch import apply_patch, diff_books, print_summary, save_patch
+from fetch_sources import GETBIBLE_KOREAN
+from pipeline_metrics import Metrics
+from stream_convert import iter_json_array
+from verse_counts import CountMatrix
+
+metrics = Metrics('comprehensive_repair')
+
+if not os.path.exists(GETBIBLE_KOREAN):
+    print(f"❌ {GETBIBLE_KOREAN} not found; download it with: python3 fetch_sources.py --only korean_getbible")
+    sys.exit(1)
 
 print("Loading all data sources...")
 
-# Load English data (current - already in correct format)
-with open('data/english.json', 'r', encoding='utf-8') as f:
-    english_data = json.load(f)
+with metrics.stage('load'):
+    # Load English data (current - already in correct format)
+    with open('data/english.json', 'r', encoding='utf-8') as f:
+        english_data = json.load(f)
 
-# Load GetBible Korean data
-with open('/tmp/korean_getbible.json', 'r', encoding='utf-8') as f:
-    getbible_korean = json.load(f)
+    # Load GetBible Korean data
+    with open(GETBIBLE_KOREAN, 'r', encoding='utf-8') as f:
+        getbible_korean = json.load(f)
+    metrics.count(books=len(english_data['books']) + len(getbible_korean['books']))
 
 print(f"✓ English books: {len(english_data['books'])}")
 print(f"✓ GetBible Korean books: {len(getbible_korean['books'])}")
@@ -59,35 +75,29 @@ def convert_getbible_to_current_format(getbible_data, english_data_for_names):
 
 
 print("\n--- Converting GetBible data to current format ---")
-korean_converted = convert_getbible_to_current_format(getbible_korean, english_data)
+with metrics.stage('convert'):
+    korean_converted = convert_getbible_to_current_format(getbible_korean, english_data)
+    metrics.count(chapters=sum(len(b['chapters']) for b in korean_converted['books']),
+                  verses=sum(len(c['verses']) for b in korean_converted['books'] for c in b['chapters']))
 
 print(f"✓ Converted Korean books: {len(korean_converted['books'])}")
 
 # Compare verse counts
 print("\n--- Checking for mismatches ---")
-mismatches_found = 0
-mismatched_chapters = []
-
-for book_idx in range(min(len(english_data['books']), len(korean_converted['books']))):
-    eng_book = english_data['books'][book_idx]
-    kor_book = korean_converted['books'][book_idx]
-
-    for ch_idx in range(min(len(eng_book['chapters']), len(kor_book['chapters']))):
-        eng_ch = eng_book['chapters'][ch_idx]
-        kor_ch = kor_book['chapters'][ch_idx]
-
-        eng_count = len(eng_ch['verses'])
-        kor_count = len(kor_ch['verses'])
-
-        if eng_count != kor_count:
-            mismatches_found += 1
-            mismatched_chapters.append({
-                'book': eng_book['name'],
-                'korean_book': kor_book['name'],
-                'chapter': eng_ch['number'],
-                'eng_count': eng_count,
-                'kor_count': kor_count
-            })
+with metrics.stage('compare'):
+    matrix = CountMatrix.from_data({'english': english_data, 'korean': korean_converted})
+    mismatched_chapters = []
+
+    for book_idx, ch_idx, eng_count, kor_count in matrix.mismatches('english', 'korean', require_both=True):
+        mismatched_chapters.append({
+            'book': english_data['books'][book_idx]['name'],
+            'korean_book': korean_converted['books'][book_idx]['name'],
+            'chapter': english_data['books'][book_idx]['chapters'][ch_idx]['number'],
+            'eng_count': eng_count,
+            'kor_count': kor_count
+        })
+    mismatches_found = len(mismatched_chapters)
+    metrics.count(mismatches=mismatches_found)
 
 if mismatches_found == 0:
     print("✓ No mismatches found! All chapters aligned perfectly!")
@@ -107,18 +117,19 @@ test_cases = [
     ('Colossians', 4, 18)
 ]
 
-for book_name, chapter_num, expected_verses in test_cases:
-    book = next((b for b in korean_converted['books'] if book_name.lower() in b['name'].lower()), None)
-    if book:
-        chapter = next((c for c in book['chapters'] if c['number'] == chapter_num), None)
-        if chapter:
-            actual_verses = len(chapter['verses'])
-            status = "✓" if actual_verses == expected_verses else f"⚠️  (expected {expected_verses})"
-            print(f"  {book_name} Ch{chapter_num}: {actual_verses} verses {status}")
+with metrics.stage('verify'):
+    for book_name, chapter_num, expected_verses in test_cases:
+        book = next((b for b in korean_converted['books'] if book_name.lower() in b['name'].lower()), None)
+        if book:
+            chapter = next((c for c in book['chapters'] if c['number'] == chapter_num), None)
+            if chapter:
+                actual_verses = len(chapter['verses'])
+                status = "✓" if actual_verses == expected_verses else f"⚠️  (expected {expected_verses})"
+                print(f"  {book_name} Ch{chapter_num}: {actual_verses} verses {status}")
+            else:
+                print(f"  {book_name} Ch{chapter_num}: Chapter not found ❌")
         else:
-            print(f"  {book_name} Ch{chapter_num}: Chapter not found ❌")
-    else:
-        print(f"  {book_name}: Book not found ❌")
+            print(f"  {book_name}: Book not found ❌")
 
 # Save the repaired data
 print("\n--- Saving repaired data ---")
@@ -126,18 +137,28 @@ print("\n--- Saving repaired data ---")
 # English data doesn't need changes
 print("✓ English data already correct (no changes needed)")
 
-# Save backup of original Korean data first
-try:
-    with open('data/korean.json', 'r', encoding='utf-8') as orig:
-        with open('data/korean.json.backup', 'w', encoding='utf-8') as backup:
-            backup.write(orig.read())
-    print("✓ Backup saved to data/korean.json.backup")
-except:
-    print("ℹ️  No previous Korean data to backup")
-
-# Save new Korean data
-with open('data/korean.json', 'w', encoding='utf-8') as f:
-    json.dump(korean_converted, f, ensure_ascii=False, indent=2)
+with metrics.stage('write'):
+    if os.path.exists('data/korean.json'):
+        # Only the chapters that changed are written; the patch keeps their
+        # previous content, so `chapter_patch.py revert` undoes the repair
+        patch = diff_books('korean', iter_json_array('data/korean.json'), korean_converted['books'])
+        if patch['chapters']:
+            patch_file = save_patch(patch)
+            print(f"✓ Patch of {len(patch['chapters'])} chapter(s) saved to {patch_file}")
+            try:
+                summary = apply_patch(patch, 'data/korean.json')
+            except ValueError as e:
+                print(f"❌ {e}")
+                print(f"   The patch is kept: python3 chapter_patch.py apply {patch_file}")
+                sys.exit(1)
+            print_summary(patch, summary)
+            metrics.count(chaptersPatched=len(patch['chapters']), bytesWritten=summary['bytesWritten'])
+        else:
+            print("✓ Korean data already up to date (no changes needed)")
+    else:
+        with open('data/korean.json', 'w', encoding='utf-8') as f:
+            json.dump(korean_converted, f, ensure_ascii=False, indent=2)
+        metrics.count(bytesWritten=os.path.getsize('data/korean.json'))
 
 print("✓ Korean data saved to data/korean.json")
 
@@ -146,6 +167,8 @@ print(f"Total mismatches remaining: {mismatches_found}")
 if mismatches_found > 0:
     print("\nNote: Remaining mismatches are due to legitimate differences in verse")
     print("numbering systems between English (BBE) and Korean (개역성경) translations.")
-    print("The app handles these gracefully with placeholder verses.")
+    print("Run build_alignment.py and build_shards.py to align them for the app.")
 else:
     print("\n✓ All chapters now have matching verse counts!")
+
+metrics.finish()
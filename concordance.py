@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""Concordance and word-frequency tables for every translation
+
+Every translation is tokenized once (the words search_index.py sees, before
+it splits Hangul into bigrams) and counted per chapter, per book and in
+total. The tables are written to one memory-mapped file per translation,
+so questions like "where does 사랑 occur in 개역, and how often per book?"
+or "what are the commonest words in John 3?" are answered from the tables
+instead of by walking data/*.json:
+
+    data/concordance/<translation>.bcc   (all integers little-endian u32)
+        magic b'BCON', version u32, header_len u32, terms_len u32
+        header              UTF-8 JSON: {"books": [name, ...], "sections": {name: length}}
+        terms               the vocabulary, sorted, '\\n'-separated UTF-8
+        (each padded to a multiple of 4 bytes), then the sections in order:
+        termTotals          occurrences of each term
+        byFrequency         term ids, commonest first
+        occurrenceStart     [term count + 1] offsets into occurrences
+        occurrences         verse id of every occurrence of each term, in Bible order
+        verseChapter        chapter id of each verse
+        verseNumber         verse number of each verse
+        chapterBook         book index of each chapter
+        chapterNumber       chapter number of each chapter
+        chapterTableStart   [chapter count + 1] offsets into chapterTable
+        chapterTable        (term id, count) pairs per chapter, commonest first
+        bookTableStart      [book count + 1] offsets into bookTable
+        bookTable           (term id, count) pairs per book, commonest first
+
+Term ids are positions in the sorted vocabulary, so a word (or a prefix)
+is found by binary search. Because 개역 attaches particles to words
+(사랑을, 사랑하는, 사랑이), a Hangul query matches every word starting
+with it; an English query matches the exact word, or a prefix with a
+trailing * ("lov*").
+
+Usage:
+    python3 concordance.py build [--out data/concordance]
+    python3 concordance.py top <translation> [--book John] [--chapter 3] [--limit 20] [--min-length 3]
+    python3 concordance.py word <translation> <word> [--book John] [--by book|chapter] [--limit 20]
+"""
+import argparse
+import bisect
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections import Counter, defaultdict
+from itertools import groupby
+
+from pipeline_metrics import Metrics
+from references import build_book_index, normalize
+from search_index import words
+from translations import load_translations, translation_files
+
+DEFAULT_CONCORDANCE_DIR = 'data/concordance'
+
+MAGIC = b'BCON'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sIII')
+
+SECTIONS = [
+    'termTotals', 'byFrequency', 'occurrenceStart', 'occurrences',
+    'verseChapter', 'verseNumber', 'chapterBook', 'chapterNumber',
+    'chapterTableStart', 'chapterTable', 'bookTableStart', 'bookTable',
+]
+
+# Sorts after every character a term can contain, for prefix ranges
+_MAX_CHAR = chr(0x10FFFF)
+
+
+def _padded(data):
+    return data + b' ' * (-len(data) % 4)
+
+
+def _u32(values):
+    table = values if isinstance(values, array) and values.typecode == 'I' else array('I', values)
+    if sys.byteorder != 'little':
+        table = array('I', table)
+        table.byteswap()
+    return table.tobytes()
+
+
+def _write_atomic(path, chunks):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        for chunk in chunks:
+            f.write(chunk)
+    os.replace(tmp_path, path)
+
+
+def _frequency_table(counts, term_ids):
+    """(term id, count) pairs, commonest first (ties in vocabulary order), flattened"""
+    table = array('I')
+    for term, count in sorted(counts.items(), key=lambda item: (-item[1], item[0])):
+        table.append(term_ids[term])
+        table.append(count)
+    return table
+
+
+def build_concordance(translation, path):
+    """Count every word of a translation and write its tables; returns (words, terms)"""
+    occurrences = defaultdict(lambda: array('I'))
+    verse_chapter = array('I')
+    verse_number = array('I')
+    chapter_book = array('I')
+    chapter_number = array('I')
+    chapter_counts = []
+    book_counts = []
+
+    for book_index, book in enumerate(translation['books']):
+        book_counter = Counter()
+        for chapter in book['chapters']:
+            chapter_id = len(chapter_book)
+            chapter_book.append(book_index)
+            chapter_number.append(chapter['number'])
+            counter = Counter()
+            for verse in chapter['verses']:
+                verse_id = len(verse_chapter)
+                verse_chapter.append(chapter_id)
+                verse_number.append(verse['number'])
+                verse_words = words(verse['text'])
+                counter.update(verse_words)
+                for word in verse_words:
+                    occurrences[word].append(verse_id)
+            chapter_counts.append(counter)
+            book_counter.update(counter)
+        book_counts.append(book_counter)
+
+    vocabulary = sorted(occurrences)
+    term_ids = {term: term_id for term_id, term in enumerate(vocabulary)}
+    totals = array('I', (len(occurrences[term]) for term in vocabulary))
+    by_frequency = array('I', sorted(range(len(vocabulary)), key=lambda term_id: -totals[term_id]))
+
+    occurrence_start = array('I', [0])
+    all_occurrences = array('I')
+    for term in vocabulary:
+        all_occurrences.extend(occurrences[term])
+        occurrence_start.append(len(all_occurrences))
+
+    tables = {}
+    for name, counters in (('chapter', chapter_counts), ('book', book_counts)):
+        starts = array('I', [0])
+        table = array('I')
+        for counter in counters:
+            table.extend(_frequency_table(counter, term_ids))
+            starts.append(len(table) // 2)
+        tables[name] = (starts, table)
+
+    sections = {
+        'termTotals': totals,
+        'byFrequency': by_frequency,
+        'occurrenceStart': occurrence_start,
+        'occurrences': all_occurrences,
+        'verseChapter': verse_chapter,
+        'verseNumber': verse_number,
+        'chapterBook': chapter_book,
+        'chapterNumber': chapter_number,
+        'chapterTableStart': tables['chapter'][0],
+        'chapterTable': tables['chapter'][1],
+        'bookTableStart': tables['book'][0],
+        'bookTable': tables['book'][1],
+    }
+    header = _padded(json.dumps({
+        "books": [book['name'] for book in translation['books']],
+        "sections": {name: len(sections[name]) for name in SECTIONS},
+    }, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+    terms = _padded('\n'.join(vocabulary).encode('utf-8'))
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    _write_atomic(path, [HEADER.pack(MAGIC, FORMAT_VERSION, len(header), len(terms)), header, terms]
+                  + [_u32(sections[name]) for name in SECTIONS])
+    return len(all_occurrences), len(vocabulary)
+
+
+def build_all(output_dir=DEFAULT_CONCORDANCE_DIR, files=None):
+    """Build a concordance per (key, path) translation; returns {key: (words, terms)}"""
+    files = files or translation_files()
+    metrics = Metrics('concordance')
+    with metrics.stage('load'):
+        data = load_translations(files)
+    results = {}
+    for key, _ in files:
+        with metrics.stage(key):
+            results[key] = build_concordance(data[key], os.path.join(output_dir, f'{key}.bcc'))
+            metrics.count(words=results[key][0], terms=results[key][1])
+    metrics.finish()
+    return results
+
+
+class Concordance:
+    """Query API over one translation's tables, memory-mapped; the vocabulary is decoded on open"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, header_len, terms_len = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} concordance")
+
+        offset = HEADER.size
+        header = json.loads(self._mmap[offset:offset + header_len])
+        offset += header_len
+        self.books = header['books']
+        self.terms = self._mmap[offset:offset + terms_len].decode('utf-8').rstrip(' ').split('\n')
+        offset += terms_len
+
+        self._view = memoryview(self._mmap)
+        for name in SECTIONS:
+            length = header['sections'][name]
+            setattr(self, name, self._section(offset, length))
+            offset += 4 * length
+
+    def _section(self, offset, length):
+        raw = self._view[offset:offset + 4 * length]
+        if sys.byteorder == 'little':
+            return raw.cast('I')
+        table = array('I', raw.tobytes())
+        table.byteswap()
+        return table
+
+    def close(self):
+        for name in SECTIONS:
+            section = getattr(self, name)
+            if isinstance(section, memoryview):
+                section.release()
+        self._view.release()
+        self._mmap.close()
+
+    def match(self, query):
+        """Term ids a query word stands for (see the module docstring)"""
+        query_words = words(query)
+        if len(query_words) != 1:
+            raise ValueError(f"Look up one word at a time, not {query!r}")
+        word = query_words[0]
+        if query.rstrip().endswith('*') or '가' <= word[0] <= '힣':
+            return range(bisect.bisect_left(self.terms, word), bisect.bisect_left(self.terms, word + _MAX_CHAR))
+        term_id = bisect.bisect_left(self.terms, word)
+        if term_id < len(self.terms) and self.terms[term_id] == word:
+            return range(term_id, term_id + 1)
+        return range(0)
+
+    def verse_ids(self, query):
+        """Verse id of every occurrence, in Bible order (repeated for repeated words)"""
+        matched = self.match(query)
+        if len(matched) == 1:
+            start = self.occurrenceStart[matched[0]]
+            return self.occurrences[start:self.occurrenceStart[matched[0] + 1]]
+        verse_ids = []
+        for term_id in matched:
+            verse_ids.extend(self.occurrences[self.occurrenceStart[term_id]:self.occurrenceStart[term_id + 1]])
+        verse_ids.sort()
+        return verse_ids
+
+    def reference(self, verse_id):
+        """(book index, chapter, verse) of a verse id"""
+        chapter_id = self.verseChapter[verse_id]
+        return self.chapterBook[chapter_id], self.chapterNumber[chapter_id], self.verseNumber[verse_id]
+
+    def chapter_id(self, book_index, chapter):
+        """Chapter id of a book's chapter, or None"""
+        low = bisect.bisect_left(self.chapterBook, book_index)
+        high = bisect.bisect_right(self.chapterBook, book_index)
+        for chapter_id in range(low, high):
+            if self.chapterNumber[chapter_id] == chapter:
+                return chapter_id
+        return None
+
+    def terms_matching(self, query):
+        """[{"term", "count"}] for the words a query matches, commonest first"""
+        matched = sorted(self.match(query), key=lambda term_id: -self.termTotals[term_id])
+        return [{"term": self.terms[term_id], "count": self.termTotals[term_id]} for term_id in matched]
+
+    def frequency(self, query, book_index=None):
+        """Occurrences of a word in the translation, or in one book"""
+        if book_index is None:
+            return sum(self.termTotals[term_id] for term_id in self.match(query))
+        return sum(1 for verse_id in self.verse_ids(query)
+                   if self.chapterBook[self.verseChapter[verse_id]] == book_index)
+
+    def occurrences_of(self, query, book_index=None, limit=None):
+        """[{"bookIndex", "book", "chapter", "verse", "count"}] in Bible order"""
+        found = []
+        for verse_id, repeats in groupby(self.verse_ids(query)):
+            book, chapter, verse = self.reference(verse_id)
+            if book_index is not None and book != book_index:
+                continue
+            found.append({"bookIndex": book, "book": self.books[book], "chapter": chapter,
+                          "verse": verse, "count": sum(1 for _ in repeats)})
+            if limit is not None and len(found) >= limit:
+                break
+        return found
+
+    def distribution(self, query, by='book'):
+        """Occurrences per book ([{"bookIndex", "book", "count"}]) or per chapter (+ "chapter"), commonest first"""
+        counts = Counter(self.verseChapter[verse_id] for verse_id in self.verse_ids(query))
+        if by == 'book':
+            per_book = Counter()
+            for chapter_id, count in counts.items():
+                per_book[self.chapterBook[chapter_id]] += count
+            return [{"bookIndex": book, "book": self.books[book], "count": count}
+                    for book, count in sorted(per_book.items(), key=lambda item: (-item[1], item[0]))]
+        return [{"bookIndex": self.chapterBook[chapter_id], "book": self.books[self.chapterBook[chapter_id]],
+                 "chapter": self.chapterNumber[chapter_id], "count": count}
+                for chapter_id, count in sorted(counts.items(), key=lambda item: (-item[1], item[0]))]
+
+    def top(self, limit=20, book_index=None, chapter=None, min_length=1):
+        """[{"term", "count"}] of the commonest words overall, in a book, or in a book's chapter"""
+        if book_index is None:
+            ranked = ((term_id, self.termTotals[term_id]) for term_id in self.byFrequency)
+        else:
+            if chapter is None:
+                starts, table, row = self.bookTableStart, self.bookTable, book_index
+            else:
+                starts, table, row = self.chapterTableStart, self.chapterTable, self.chapter_id(book_index, chapter)
+                if row is None:
+                    return []
+            if not 0 <= row < len(starts) - 1:
+                return []
+            ranked = ((table[2 * i], table[2 * i + 1]) for i in range(starts[row], starts[row + 1]))
+
+        result = []
+        for term_id, count in ranked:
+            term = self.terms[term_id]
+            if len(term) >= min_length:
+                result.append({"term": term, "count": count})
+                if len(result) >= limit:
+                    break
+        return result
+
+
+def resolve_book(concordance, name):
+    """Book index for a 1-based number or any name references.py knows, or None"""
+    if name.isdigit():
+        return int(name) - 1
+    lookup = build_book_index([[book] for book in concordance.books])
+    return lookup.get(normalize(name))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query the concordance and word-frequency tables")
+    parser.add_argument('--dir', default=DEFAULT_CONCORDANCE_DIR, help="concordance directory")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help="count every registered translation")
+    build.add_argument('--out', help="output directory (default: --dir)")
+
+    top = commands.add_parser('top', help="commonest words overall, in a book or in a chapter")
+    top.add_argument('translation')
+    top.add_argument('--book', help="book name, abbreviation or 1-based number")
+    top.add_argument('--chapter', type=int)
+    top.add_argument('--limit', type=int, default=20)
+    top.add_argument('--min-length', type=int, default=1, help="skip shorter words (the, of, ...)")
+
+    word = commands.add_parser('word', help="where and how often a word occurs")
+    word.add_argument('translation')
+    word.add_argument('word', help="a word; Hangul words and words ending in * match as prefixes")
+    word.add_argument('--book', help="only this book")
+    word.add_argument('--by', choices=['book', 'chapter'], default='book', help="distribution to print")
+    word.add_argument('--limit', type=int, default=20)
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        output_dir = args.out or args.dir
+        for key, (word_count, term_count) in build_all(output_dir).items():
+            size = os.path.getsize(os.path.join(output_dir, f'{key}.bcc'))
+            print(f"✓ {key}: {word_count} words, {term_count} distinct, {size / 1024:.0f} KB")
+        print(f"✓ Concordance written to {output_dir}")
+        return
+
+    path = os.path.join(args.dir, f'{args.translation}.bcc')
+    if not os.path.exists(path):
+        print(f"❌ {path} not found - run: python3 concordance.py build")
+        raise SystemExit(1)
+    concordance = Concordance(path)
+
+    book_index = None
+    if args.book:
+        book_index = resolve_book(concordance, args.book)
+        if book_index is None or not 0 <= book_index < len(concordance.books):
+            parser.error(f"Book {args.book} not found")
+    if args.command == 'top' and args.chapter is not None and book_index is None:
+        parser.error("--chapter needs --book")
+
+    if args.command == 'top':
+        rows = concordance.top(args.limit, book_index, args.chapter, args.min_length)
+        where = concordance.books[book_index] if book_index is not None else args.translation
+        if args.chapter is not None:
+            where += f" {args.chapter}"
+        if not rows:
+            print(f"⚠️  No words found for {where}")
+        for rank, row in enumerate(rows, 1):
+            print(f"{rank:>4}. {row['term']:<20} {row['count']:>8,}")
+        return
+
+    try:
+        matched = concordance.terms_matching(args.word)
+    except ValueError as e:
+        parser.error(str(e))
+    total = concordance.frequency(args.word, book_index)
+    where = f" in {concordance.books[book_index]}" if book_index is not None else ''
+    if not total:
+        print(f"⚠️  {args.word!r} does not occur{where}")
+        return
+    forms = ', '.join(f"{row['term']} {row['count']:,}" for row in matched[:10])
+    more = f" and {len(matched) - 10} more" if len(matched) > 10 else ''
+    print(f"✓ {args.word!r}: {total:,} occurrence(s){where} ({forms}{more})\n")
+
+    if book_index is None:
+        for row in concordance.distribution(args.word, args.by)[:args.limit]:
+            chapter = f" {row['chapter']}" if 'chapter' in row else ''
+            print(f"  {row['book'] + chapter:<24} {row['count']:>6,}")
+    else:
+        for row in concordance.occurrences_of(args.word, book_index, args.limit):
+            repeats = f"  ×{row['count']}" if row['count'] > 1 else ''
+            print(f"  {row['book']} {row['chapter']}:{row['verse']}{repeats}")
+    concordance.close()
+
+
+if __name__ == "__main__":
+    main()
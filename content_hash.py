@@ -0,0 +1,14 @@
+"""Content hashes shared by the incremental build tools"""
+import hashlib
+import os
+
+
+def file_signature(path):
+    """Cheap change detector for a whole file: size and modification time"""
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtimeNs": stat.st_mtime_ns}
+
+
+def asset_hash(content, length=10):
+    """Short hex digest of a file's bytes, for content-addressed file names"""
+    return hashlib.blake2b(content, digest_size=(length + 1) // 2).hexdigest()[:length]
@@ -16,12 +16,17 @@ Input format:
 
 Output:
     JSON array of verse objects with "number" and "text" fields
+
+For a whole Bible (book and chapter headings included), use
+text_import.py instead.
 """
 
 import json
 import re
 import sys
 
+from text_import import split_inline_verses
+
 def parse_chapter(text):
     """
     Parse a chapter of Bible text into JSON format.
@@ -62,21 +67,16 @@ def parse_multi_verse_line(text):
     """
     Parse text where multiple verses are on the same line.
     Format: "1 First verse. 2 Second verse. 3 Third verse."
+
+    A number only starts a verse when it is the next verse number, so
+    numbers inside the text ("the 12 tribes") are kept.
     """
-    verses = []
-    # Match verse numbers followed by text until next verse number
-    pattern = r'(\d+)\s+([^0-9]+?)(?=\d+\s+|$)'
-    matches = re.finditer(pattern, text, re.DOTALL)
-
-    for match in matches:
-        verse_num = int(match.group(1))
-        verse_text = match.group(2).strip()
-        verses.append({
-            "number": verse_num,
-            "text": verse_text
-        })
+    match = re.match(r'\s*(\d+)\s+', text)
+    if not match:
+        return []
 
-    return verses
+    verses = split_inline_verses(' '.join(text[match.end():].split()), int(match.group(1)))
+    return [{"number": number, "text": verse_text} for number, verse_text in verses]
 
 def create_chapter_object(chapter_number, verses):
     """Create a complete chapter object."""
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""Convert every registered translation in parallel, one worker per translation
+
+Usage:
+    python3 convert_translations.py [--registry registry.json] [--only english,korean]
+                                    [--jobs N] [--compact] [--timing conversion_timing.json]
+
+Each worker streams its source file book by book (see stream_convert.py, or
+text_import.py for entries with "format": "text"), so memory per worker
+stays around one book. A timing summary is printed and
+saved as JSON. A translation that fails to convert is reported (and the
+exit status is 1) without stopping the others.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from pipeline_metrics import Metrics
+from stream_convert import convert_source_book, iter_json_array, write_books_json
+from text_import import TextImporter
+from translations import load_registry, resolve_book_names
+
+DEFAULT_TIMING_FILE = 'conversion_timing.json'
+
+
+def convert_translation(entry, compact=False):
+    """Convert one registry entry; returns its timing and size stats"""
+    start = time.perf_counter()
+    book_names = resolve_book_names(entry)
+    stats = {"chapters": 0, "verses": 0}
+
+    def converted_books(books):
+        for book in books:
+            stats['chapters'] += len(book['chapters'])
+            stats['verses'] += sum(len(c['verses']) for c in book['chapters'])
+            yield book
+
+    encoding = entry.get('encoding', 'utf-8')
+    if entry.get('format') == 'text':
+        with open(entry['source'], 'r', encoding=encoding) as f:
+            books = TextImporter(book_names, entry['source']).books(f)
+            book_count = write_books_json(entry['output'], converted_books(books), indent=None if compact else 2)
+    else:
+        books = (convert_source_book(b, book_names) for b in iter_json_array(entry['source'], encoding))
+        book_count = write_books_json(entry['output'], converted_books(books), indent=None if compact else 2)
+
+    return {
+        "key": entry['key'],
+        "source": entry['source'],
+        "output": entry['output'],
+        "books": book_count,
+        "chapters": stats['chapters'],
+        "verses": stats['verses'],
+        "bytesWritten": os.path.getsize(entry['output']),
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+def convert_all(entries, jobs=None, compact=False):
+    """Convert entries across a process pool; results are in registry order.
+
+    A translation that fails gives {"key", "source", "output", "error"} in
+    place of its stats, so one bad source does not stop the rest.
+    """
+    if not entries:
+        return []
+    results = {}
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(convert_translation, entry, compact): entry for entry in entries}
+        for future in as_completed(futures):
+            entry = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {"key": entry['key'], "source": entry['source'], "output": entry['output'],
+                          "error": f"{type(e).__name__}: {e}"}
+                print(f"❌ {entry['key']}: {result['error']}")
+            else:
+                print(f"✓ {result['key']}: {result['books']} books, {result['verses']} verses "
+                      f"in {result['seconds']:.2f}s")
+            results[entry['key']] = result
+    return [results[entry['key']] for entry in entries]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert all registered translations in parallel")
+    parser.add_argument('--registry', help="JSON registry file (defaults to translations.py)")
+    parser.add_argument('--only', help="comma-separated translation keys to convert")
+    parser.add_argument('--jobs', type=int, help="worker processes (defaults to CPU count)")
+    parser.add_argument('--compact', action='store_true', help="write without indentation")
+    parser.add_argument('--timing', default=DEFAULT_TIMING_FILE, help="where to save the timing summary")
+    args = parser.parse_args()
+
+    entries = load_registry(args.registry)
+    if args.only:
+        wanted = args.only.split(',')
+        unknown = set(wanted) - {entry['key'] for entry in entries}
+        if unknown:
+            parser.error(f"Unknown translation(s): {', '.join(sorted(unknown))}")
+        entries = [entry for entry in entries if entry['key'] in wanted]
+    if args.jobs is not None and args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if not entries:
+        print("⚠️  No translations registered - nothing to convert")
+        return
+
+    jobs = args.jobs or min(len(entries), os.cpu_count() or 1)
+    print(f"Converting {len(entries)} translation(s) with {jobs} worker(s)...")
+
+    # Memory is traced in this process only; the workers' use is not included
+    metrics = Metrics('convert_translations')
+    start = time.perf_counter()
+    with metrics.stage('convert'):
+        results = convert_all(entries, jobs, args.compact)
+        converted = [r for r in results if 'error' not in r]
+        failed = [r for r in results if 'error' in r]
+        metrics.count(translations=len(converted),
+                      books=sum(r['books'] for r in converted),
+                      chapters=sum(r['chapters'] for r in converted),
+                      verses=sum(r['verses'] for r in converted),
+                      bytesWritten=sum(r['bytesWritten'] for r in converted))
+    total_seconds = time.perf_counter() - start
+
+    print('\n=== TIMING SUMMARY ===')
+    print(f"{'Translation':<16} {'Books':>6} {'Verses':>8} {'MB':>8} {'Seconds':>8}")
+    for r in results:
+        if 'error' in r:
+            print(f"{r['key']:<16} {'failed':>6}")
+            continue
+        print(f"{r['key']:<16} {r['books']:>6} {r['verses']:>8} {r['bytesWritten'] / 1e6:>8.2f} {r['seconds']:>8.2f}")
+    print(f"Wall time: {total_seconds:.2f}s "
+          f"(sum of workers: {sum(r['seconds'] for r in converted):.2f}s)")
+
+    with open(args.timing, 'w', encoding='utf-8') as f:
+        json.dump({
+            "jobs": jobs,
+            "compact": args.compact,
+            "wallSeconds": round(total_seconds, 3),
+            "translations": results
+        }, f, indent=2, ensure_ascii=False)
+
+    print(f"\nTiming summary saved to: {args.timing}")
+    metrics.finish()
+    if failed:
+        print(f"❌ {len(failed)} of {len(results)} translation(s) failed: {', '.join(r['key'] for r in failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
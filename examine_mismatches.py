@@ -2,12 +2,12 @@
 """Examine specific mismatched chapters to understand patterns"""
 import json
 
-# Load both JSON files
-with open('data/english.json', 'r', encoding='utf-8') as f:
-    english_data = json.load(f)
+from bibledata import Library
 
-with open('data/korean.json', 'r', encoding='utf-8') as f:
-    korean_data = json.load(f)
+# Translations are read lazily: only the books examined below are loaded
+library = Library()
+english = library['english']
+korean = library['korean']
 
 # Load mismatch report
 with open('mismatch_report.json', 'r', encoding='utf-8') as f:
@@ -19,18 +19,17 @@ def examine_mismatch(mismatch):
     chapter_num = mismatch['chapter']
 
     # Find the book by name
-    eng_book_idx = next((i for i, b in enumerate(english_data['books']) if b['name'] == book_name), None)
+    eng_book_idx = english.find_book(book_name)
 
     if eng_book_idx is None:
         print(f"Book {book_name} not found")
         return
 
-    eng_book = english_data['books'][eng_book_idx]
-    kor_book = korean_data['books'][eng_book_idx]
+    kor_book = korean.book(eng_book_idx)
 
     # Find the chapter
-    eng_chapter = next((c for c in eng_book['chapters'] if c['number'] == chapter_num), None)
-    kor_chapter = next((c for c in kor_book['chapters'] if c['number'] == chapter_num), None)
+    eng_chapter = english.chapter(eng_book_idx, chapter_num)
+    kor_chapter = korean.chapter(eng_book_idx, chapter_num)
 
     if not eng_chapter or not kor_chapter:
         print(f"Chapter {chapter_num} not found")
@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""Export every translation into one SQLite database for server-side queries
+
+    translations (id, key, lang, name)
+    books        (translation_id, book, name, abbreviation)            key (translation_id, book)
+    chapters     (translation_id, book, chapter, verse_count)          key (translation_id, book, chapter)
+    verses       (translation_id, book, chapter, verse, text)          key (translation_id, book, chapter, verse)
+    verse_fts    optional FTS5 index of verses.text (--fts)
+    meta         (key, value): format version, build time, import timings
+
+Book numbers are 1-based, as in the shard paths and the chapter API. The
+books, chapters and verses tables are WITHOUT ROWID tables clustered on
+their key, so the primary key b-tree is itself the covering index: a
+chapter, or a range of verses, is one contiguous range scan that never
+visits a second index, and the text is not stored twice.
+
+The {"books": [...]} files are streamed a book at a time
+(stream_convert.iter_json_array), so memory stays at about one book. Rows
+go in with batched executemany calls inside a single transaction, in key
+order (every insert appends to the b-tree), with the journal and fsyncs
+off. The database is built next to the target and renamed over it when
+complete, so a server never sees a half-written file.
+
+verse_fts is a contentless FTS5 table (the text stays in verses only); its
+rowid encodes the verse key, see fts_rowid(). It is skipped with a warning
+if the local SQLite has no FTS5.
+
+Readers open the file read-only and immutable (no locking) and map it into
+memory, so any number of server worker processes share one copy of the
+pages through the OS page cache. See BibleDatabase.
+
+Usage:
+    python3 export_sqlite.py [--db data/bible.sqlite] build [--fts] [--batch-size 5000]
+    python3 export_sqlite.py [--db data/bible.sqlite] show <translation> <book> <chapter> [verse[-verse]]
+    python3 export_sqlite.py [--db data/bible.sqlite] search <words> [--translation korean] [--limit 10]
+"""
+import argparse
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime, timezone
+from itertools import islice
+
+from pipeline_metrics import Metrics
+from references import build_book_index, normalize
+from stream_convert import iter_json_array
+from translations import TRANSLATIONS
+
+DEFAULT_DATABASE = 'data/bible.sqlite'
+DEFAULT_BATCH_SIZE = 5000
+FORMAT_VERSION = 1
+
+# Readers map up to this much of the file; the pages are shared between processes
+MMAP_SIZE = 256 * 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE translations (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    lang TEXT,
+    name TEXT
+);
+CREATE TABLE books (
+    translation_id INTEGER NOT NULL REFERENCES translations(id),
+    book INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    abbreviation TEXT,
+    PRIMARY KEY (translation_id, book)
+) WITHOUT ROWID;
+CREATE TABLE chapters (
+    translation_id INTEGER NOT NULL,
+    book INTEGER NOT NULL,
+    chapter INTEGER NOT NULL,
+    verse_count INTEGER NOT NULL,
+    PRIMARY KEY (translation_id, book, chapter)
+) WITHOUT ROWID;
+CREATE TABLE verses (
+    translation_id INTEGER NOT NULL,
+    book INTEGER NOT NULL,
+    chapter INTEGER NOT NULL,
+    verse INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    PRIMARY KEY (translation_id, book, chapter, verse)
+) WITHOUT ROWID;
+"""
+
+# Only for the import: the file is renamed into place once it is complete
+IMPORT_PRAGMAS = [
+    'PRAGMA journal_mode = OFF',
+    'PRAGMA synchronous = OFF',
+    'PRAGMA locking_mode = EXCLUSIVE',
+    'PRAGMA temp_store = MEMORY',
+    'PRAGMA cache_size = -65536',
+]
+
+FTS_SCHEMA = "CREATE VIRTUAL TABLE verse_fts USING fts5(text, content='', prefix='2 3')"
+
+# verse_fts rowid: translation id << 32 | book << 20 | chapter << 10 | verse
+FTS_ROWID_SQL = '(translation_id << 32) | (book << 20) | (chapter << 10) | verse'
+FTS_JOIN_SQL = """
+    JOIN verses v ON v.translation_id = f.rowid >> 32 AND v.book = (f.rowid >> 20) & 4095
+                 AND v.chapter = (f.rowid >> 10) & 1023 AND v.verse = f.rowid & 1023
+"""
+
+
+def fts_rowid(translation_id, book, chapter, verse):
+    return (translation_id << 32) | (book << 20) | (chapter << 10) | verse
+
+
+def has_fts5():
+    connection = sqlite3.connect(':memory:')
+    try:
+        connection.execute("CREATE VIRTUAL TABLE probe USING fts5(text)")
+        return True
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        connection.close()
+
+
+def built_with_fts(path):
+    """Whether an existing database has verse_fts (so a rebuild keeps it)"""
+    try:
+        database = BibleDatabase(path)
+    except (OSError, ValueError, sqlite3.Error):
+        return False
+    try:
+        return database.has_fts
+    finally:
+        database.close()
+
+
+def stream_translation(path, translation_id, books, chapters):
+    """Verse rows of one translation in key order, read a book at a time.
+
+    The (much smaller) book and chapter rows are appended to `books` and `chapters`.
+    """
+    for book_index, book in enumerate(iter_json_array(path)):
+        book_number = book_index + 1
+        books.append((translation_id, book_number, book['name'], book.get('abbreviation')))
+        for chapter in sorted(book['chapters'], key=lambda c: c['number']):
+            verses = sorted(chapter['verses'], key=lambda v: v['number'])
+            chapters.append((translation_id, book_number, chapter['number'], len(verses)))
+            for verse in verses:
+                yield translation_id, book_number, chapter['number'], verse['number'], verse['text']
+
+
+def insert_batches(connection, sql, rows, batch_size):
+    """executemany in batches of batch_size; returns the number of rows inserted"""
+    count = 0
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return count
+        connection.executemany(sql, batch)
+        count += len(batch)
+
+
+def build_database(path=DEFAULT_DATABASE, registry=None, fts=False, batch_size=DEFAULT_BATCH_SIZE, metrics=None):
+    """Build the database; returns {"translations": {key: {"verses", "seconds"}}, "fts", "seconds"}"""
+    registry = registry or TRANSLATIONS
+    own_metrics = metrics is None
+    if own_metrics:
+        metrics = Metrics('export_sqlite')
+    if fts and not has_fts5():
+        print("⚠️  This SQLite has no FTS5 - building without verse_fts")
+        fts = False
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    start = time.perf_counter()
+    summary = {"translations": {}, "fts": fts}
+    connection = sqlite3.connect(tmp_path, isolation_level=None)
+    try:
+        for pragma in IMPORT_PRAGMAS:
+            connection.execute(pragma)
+        connection.executescript(SCHEMA)
+
+        connection.execute('BEGIN')
+        for translation_id, entry in enumerate(registry, 1):
+            with metrics.stage(entry['key']):
+                translation_start = time.perf_counter()
+                connection.execute("INSERT INTO translations (id, key, lang, name) VALUES (?, ?, ?, ?)",
+                                   (translation_id, entry['key'], entry.get('lang'), entry.get('name')))
+                books = []
+                chapters = []
+                rows = stream_translation(entry['output'], translation_id, books, chapters)
+                verse_count = insert_batches(connection, "INSERT INTO verses VALUES (?, ?, ?, ?, ?)",
+                                             rows, batch_size)
+                connection.executemany("INSERT INTO books VALUES (?, ?, ?, ?)", books)
+                connection.executemany("INSERT INTO chapters VALUES (?, ?, ?, ?)", chapters)
+                seconds = time.perf_counter() - translation_start
+                metrics.count(verses=verse_count, chapters=len(chapters))
+            summary["translations"][entry['key']] = {"verses": verse_count, "chapters": len(chapters),
+                                                     "seconds": round(seconds, 3)}
+            print(f"  ✓ {entry['key']}: {verse_count:,} verses in {seconds:.2f}s "
+                  f"({verse_count / seconds if seconds else 0:,.0f} rows/s)")
+
+        if fts:
+            with metrics.stage('fts'):
+                fts_start = time.perf_counter()
+                connection.execute(FTS_SCHEMA)
+                connection.execute(f"INSERT INTO verse_fts (rowid, text) SELECT {FTS_ROWID_SQL}, text FROM verses")
+                connection.execute("INSERT INTO verse_fts (verse_fts) VALUES ('optimize')")
+            summary["ftsSeconds"] = round(time.perf_counter() - fts_start, 3)
+            print(f"  ✓ verse_fts: indexed in {summary['ftsSeconds']:.2f}s")
+        connection.execute('COMMIT')
+
+        with metrics.stage('analyze'):
+            connection.execute('ANALYZE')
+        summary["seconds"] = round(time.perf_counter() - start, 3)
+
+        meta = {
+            "formatVersion": FORMAT_VERSION,
+            "created": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            "sqliteVersion": sqlite3.sqlite_version,
+            "import": summary,
+        }
+        connection.executemany("INSERT INTO meta VALUES (?, ?)",
+                               [(key, json.dumps(value, ensure_ascii=False)) for key, value in meta.items()])
+        # Readers expect an ordinary rollback-journal database
+        connection.execute('PRAGMA journal_mode = DELETE')
+    finally:
+        connection.close()
+
+    os.replace(tmp_path, path)
+    if own_metrics:
+        metrics.finish()
+    return summary
+
+
+class BibleDatabase:
+    """Read-only queries against an exported database.
+
+    Open one per process (or per thread); the file is opened immutable, so
+    it must be replaced by rename, as build_database does, never edited in
+    place. Readers that are already open keep reading the old file.
+    """
+
+    def __init__(self, path=DEFAULT_DATABASE):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"{path} not found - run: python3 export_sqlite.py build")
+        uri = f"file:{os.path.abspath(path)}?mode=ro&immutable=1"
+        self.connection = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        self.connection.execute(f'PRAGMA mmap_size = {MMAP_SIZE}')
+        version = self.meta('formatVersion')
+        if version != FORMAT_VERSION:
+            self.connection.close()
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} database")
+        self.translation_ids = dict(self.connection.execute("SELECT key, id FROM translations"))
+        self.has_fts = self.connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'verse_fts'").fetchone() is not None
+
+    def close(self):
+        self.connection.close()
+
+    def meta(self, key):
+        row = self.connection.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _translation_id(self, key):
+        if key not in self.translation_ids:
+            raise KeyError(f"Unknown translation: {key}")
+        return self.translation_ids[key]
+
+    def books(self, key):
+        """[{"book", "name", "abbreviation", "chapters"}] in order"""
+        rows = self.connection.execute(
+            "SELECT b.book, b.name, b.abbreviation, "
+            "(SELECT count(*) FROM chapters c WHERE c.translation_id = b.translation_id AND c.book = b.book) "
+            "FROM books b WHERE b.translation_id = ? ORDER BY b.book", (self._translation_id(key),))
+        return [{"book": book, "name": name, "abbreviation": abbreviation, "chapters": chapters}
+                for book, name, abbreviation, chapters in rows]
+
+    def chapter(self, key, book, chapter):
+        """[{"number", "text"}] of one chapter (book is 1-based)"""
+        rows = self.connection.execute(
+            "SELECT verse, text FROM verses WHERE translation_id = ? AND book = ? AND chapter = ? ORDER BY verse",
+            (self._translation_id(key), book, chapter))
+        return [{"number": number, "text": text} for number, text in rows]
+
+    def verses(self, key, book, chapter, first, last=None):
+        """[{"number", "text"}] of verses first..last of a chapter"""
+        rows = self.connection.execute(
+            "SELECT verse, text FROM verses WHERE translation_id = ? AND book = ? AND chapter = ? "
+            "AND verse BETWEEN ? AND ? ORDER BY verse",
+            (self._translation_id(key), book, chapter, first, last if last is not None else first))
+        return [{"number": number, "text": text} for number, text in rows]
+
+    def search(self, query, key=None, limit=10):
+        """FTS5 matches, best first: [{"translation", "book", "chapter", "verse", "text"}]"""
+        if not self.has_fts:
+            raise ValueError("This database has no verse_fts table - rebuild with --fts")
+        sql = (f"SELECT t.key, v.book, v.chapter, v.verse, v.text FROM verse_fts f {FTS_JOIN_SQL} "
+               "JOIN translations t ON t.id = v.translation_id WHERE verse_fts MATCH ?")
+        parameters = [query]
+        if key is not None:
+            sql += " AND f.rowid BETWEEN ? AND ?"
+            translation_id = self._translation_id(key)
+            parameters += [translation_id << 32, ((translation_id + 1) << 32) - 1]
+        sql += " ORDER BY rank LIMIT ?"
+        parameters.append(limit)
+        return [{"translation": translation, "book": book, "chapter": chapter, "verse": verse, "text": text}
+                for translation, book, chapter, verse, text in self.connection.execute(sql, parameters)]
+
+
+def resolve_book(database, key, name):
+    """1-based book number for a number or any name references.py knows, or None"""
+    if name.isdigit():
+        return int(name)
+    lookup = build_book_index([[book['name']] for book in database.books(key)])
+    book_index = lookup.get(normalize(name))
+    return book_index + 1 if book_index is not None else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the translations to SQLite, or query the export")
+    parser.add_argument('--db', default=DEFAULT_DATABASE, help="database file")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help="export every registered translation")
+    build.add_argument('--fts', action='store_true', help="add an FTS5 full-text index (if SQLite supports it)")
+    build.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help="rows per executemany")
+
+    show = commands.add_parser('show', help="print a chapter or a verse range")
+    show.add_argument('translation')
+    show.add_argument('book', help="book name, abbreviation or 1-based number")
+    show.add_argument('chapter', type=int)
+    show.add_argument('verses', nargs='?', help="a verse or a range such as 16-18")
+
+    search = commands.add_parser('search', help="full-text search (needs a build with --fts)")
+    search.add_argument('words', help="FTS5 query; Korean words need a * to match with particles (사랑*)")
+    search.add_argument('--translation')
+    search.add_argument('--limit', type=int, default=10)
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        missing = [entry['output'] for entry in TRANSLATIONS if not os.path.exists(entry['output'])]
+        if missing:
+            print(f"❌ Not found: {', '.join(missing)} - run convert_translations.py first")
+            raise SystemExit(1)
+        metrics = Metrics('export_sqlite')
+        print(f"Exporting {len(TRANSLATIONS)} translation(s) to {args.db}...")
+        summary = build_database(args.db, fts=args.fts, batch_size=args.batch_size, metrics=metrics)
+        verses = sum(result['verses'] for result in summary['translations'].values())
+        size = os.path.getsize(args.db)
+        metrics.count(verses=verses, bytesWritten=size)
+        print(f"✓ Imported {verses:,} verses in {summary['seconds']:.2f}s "
+              f"({verses / summary['seconds']:,.0f} rows/s), {size / 1024 / 1024:.1f} MB")
+        metrics.finish()
+        return
+
+    try:
+        database = BibleDatabase(args.db)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"❌ {e}")
+        raise SystemExit(1)
+
+    if args.command == 'search':
+        start = time.perf_counter()
+        try:
+            hits = database.search(args.words, args.translation, args.limit)
+        except (ValueError, KeyError, sqlite3.OperationalError) as e:
+            parser.error(str(e))
+        elapsed = (time.perf_counter() - start) * 1000
+        for hit in hits:
+            print(f"{hit['translation']} {hit['book']} {hit['chapter']}:{hit['verse']}  {hit['text']}")
+        print(f"\n{len(hits)} result(s) in {elapsed:.1f} ms")
+        return
+
+    if args.translation not in database.translation_ids:
+        parser.error(f"Unknown translation: {args.translation}")
+    book = resolve_book(database, args.translation, args.book)
+    if book is None:
+        parser.error(f"Book {args.book} not found")
+
+    start = time.perf_counter()
+    if args.verses:
+        first, _, last = args.verses.partition('-')
+        verses = database.verses(args.translation, book, args.chapter, int(first), int(last or first))
+    else:
+        verses = database.chapter(args.translation, book, args.chapter)
+    elapsed = (time.perf_counter() - start) * 1000
+    if not verses:
+        print(f"⚠️  No verses found for {args.book} {args.chapter}")
+    for verse in verses:
+        print(f"{verse['number']:>3}  {verse['text']}")
+    print(f"\n{len(verses)} verse(s) in {elapsed:.2f} ms")
+    database.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""Download the translation sources, in parallel and resumably
+
+Every registry entry (translations.py) is fetched to its "source" path, so
+convert_translations.py and the repair scripts can run straight after:
+
+    python3 fetch_sources.py                                  # everything
+    python3 fetch_sources.py --only korean --base-url http://localhost:9000/json/
+
+Where an entry has a "book_url" template the source is fetched one book
+per request ({number} is 1-66, {abbrev} the source abbreviation, "gn",
+"ex", ...) and the books are joined into the source file; otherwise the
+file comes from "url" (default: the source's file name), relative to
+--base-url. An optional "sha256" is checked before the source is
+installed. REFERENCE_SOURCES lists the extra files the repair scripts
+compare against (the GetBible Korean text).
+
+Downloads run on a thread pool sharing a bounded pool of keep-alive
+connections, one per worker, so dozens of translations cost a handful of
+TCP/TLS handshakes. Failed requests (connection errors, 429 and 5xx) are
+retried with exponential backoff and jitter, honouring Retry-After.
+
+Every response is kept in .source_cache/ with its SHA-256 and ETag in
+.source_cache/index.json, written after each completed file. A rerun only
+requests what is missing, resumes a half-downloaded file with a Range
+request, and does not rewrite a source file whose content is unchanged (so
+watch.py does not reconvert it). --refresh revalidates cached files with
+If-None-Match instead of trusting them.
+
+Usage:
+    python3 fetch_sources.py [--base-url URL] [--only korean,korean_getbible] [--registry registry.json]
+                             [--connections 8] [--refresh] [--cache-dir .source_cache]
+"""
+import argparse
+import hashlib
+import http.client
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import urljoin, urlsplit
+
+import book_names
+from pipeline_metrics import Metrics
+from translations import load_registry
+
+DEFAULT_BASE_URL = 'https://raw.githubusercontent.com/thiagobodruk/bible/master/json/'
+CACHE_DIR = '.source_cache'
+DEFAULT_CONNECTIONS = 8
+TIMEOUT = 30
+MAX_ATTEMPTS = 5
+BACKOFF = 0.5
+MAX_BACKOFF = 30
+RETRY_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+CHUNK_SIZE = 1 << 16
+
+GETBIBLE_KOREAN = 'data/ko_getbible.json'
+
+# Not translations the site shows: reference texts the repair scripts compare against
+REFERENCE_SOURCES = [
+    {
+        "key": "korean_getbible",
+        "book_url": "https://api.getbible.net/v2/korean/{number}.json",
+        "container": "books",
+        "encoding": "utf-8",
+        "source": GETBIBLE_KOREAN,
+    },
+]
+
+# Source abbreviations in canonical order, for {abbrev} in book_url
+BOOK_ORDER = list(book_names.ENGLISH)
+
+
+class FetchError(Exception):
+    """A download that failed for good (after retries, or with a non-retryable status)"""
+
+
+class RetryableError(Exception):
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ConnectionPool:
+    """At most `size` open HTTP(S) connections at a time, kept alive and reused per host"""
+
+    def __init__(self, size=DEFAULT_CONNECTIONS, timeout=TIMEOUT):
+        self.size = size
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = {}
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.requests = 0
+
+    def _checkout(self, origin):
+        with self._lock:
+            idle = self._idle.get(origin)
+            if idle:
+                return idle.pop()
+            self.opened += 1
+        scheme, host, port = origin
+        connection_class = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+        return connection_class(host, port, timeout=self.timeout)
+
+    def _checkin(self, origin, connection):
+        with self._lock:
+            self._idle.setdefault(origin, []).append(connection)
+
+    @contextmanager
+    def get(self, url, headers=None):
+        """GET url and yield the response; read it to the end to keep the connection"""
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https'):
+            raise FetchError(f"Unsupported URL: {url}")
+        origin = (parts.scheme, parts.hostname, parts.port)
+        path = (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+
+        with self._slots:
+            connection = self._checkout(origin)
+            response = None
+            try:
+                try:
+                    response = self._send(connection, path, headers)
+                except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                    # An idle keep-alive connection the server had already closed
+                    connection.close()
+                    response = self._send(connection, path, headers)
+                yield response
+            finally:
+                # Only a response read to the end leaves the connection reusable
+                if response is not None and response.isclosed() and not response.will_close:
+                    self._checkin(origin, connection)
+                else:
+                    connection.close()
+
+    def _send(self, connection, path, headers):
+        with self._lock:
+            self.requests += 1
+        connection.request('GET', path, headers=headers or {})
+        return connection.getresponse()
+
+    def close(self):
+        with self._lock:
+            for connections in self._idle.values():
+                for connection in connections:
+                    connection.close()
+            self._idle.clear()
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _retry_after(response):
+    value = response.getheader('Retry-After')
+    try:
+        return min(float(value), MAX_BACKOFF) if value else None
+    except ValueError:
+        return None
+
+
+def download(pool, url, path, etag=None, attempts=MAX_ATTEMPTS, backoff=BACKOFF):
+    """Download url to path, resuming path + '.part' if an earlier run left one.
+
+    Returns the response's ETag, or False when etag was given and the server
+    answered 304 Not Modified. Raises FetchError once the attempts run out.
+    """
+    part = path + '.part'
+    for attempt in range(1, attempts + 1):
+        headers = {'Accept-Encoding': 'identity'}
+        offset = os.path.getsize(part) if os.path.exists(part) else 0
+        if offset:
+            headers['Range'] = f"bytes={offset}-"
+        elif etag:
+            headers['If-None-Match'] = etag
+
+        try:
+            with pool.get(url, headers) as response:
+                status = response.status
+                if status == 206 and not (response.getheader('Content-Range') or '').startswith(f"bytes {offset}-"):
+                    response.read()
+                    if offset:
+                        os.remove(part)
+                    raise RetryableError("unexpected Content-Range", retry_after=0)
+                if status in (200, 206):
+                    # 200 to a Range request: the server sent the whole file again
+                    received = 0
+                    with open(part, 'ab' if status == 206 else 'wb') as f:
+                        for chunk in iter(lambda: response.read(CHUNK_SIZE), b''):
+                            f.write(chunk)
+                            received += len(chunk)
+                    # http.client returns a body cut short as if it were complete
+                    length = response.getheader('Content-Length')
+                    if length is not None and received < int(length):
+                        raise RetryableError(f"connection closed after {received} of {length} bytes")
+                    new_etag = response.getheader('ETag')
+                else:
+                    response.read()
+                    if status == 304:
+                        return False
+                    if status == 416:
+                        # The partial file is no prefix of the current one: start over
+                        os.remove(part)
+                        raise RetryableError("HTTP 416", retry_after=0)
+                    if status in RETRY_STATUSES:
+                        raise RetryableError(f"HTTP {status}", _retry_after(response))
+                    raise FetchError(f"{url}: HTTP {status} {response.reason}")
+            os.replace(part, path)
+            return new_etag
+        except (OSError, http.client.HTTPException, RetryableError) as e:
+            if attempt == attempts:
+                raise FetchError(f"{url}: {str(e) or type(e).__name__} (gave up after {attempts} attempts)")
+            delay = getattr(e, 'retry_after', None)
+            if delay is None:
+                delay = min(backoff * 2 ** (attempt - 1), MAX_BACKOFF) * (0.5 + random.random())
+            time.sleep(delay)
+
+
+class SourceCache:
+    """Downloaded files, keyed by URL, with their checksums in index.json"""
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.index_path = os.path.join(cache_dir, 'index.json')
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                self.index = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self.index = {}
+
+    def path(self, url):
+        return os.path.join(self.cache_dir, hashlib.blake2b(url.encode('utf-8'), digest_size=12).hexdigest())
+
+    def valid(self, url):
+        """The cache entry for url if its file is present and matches its checksum"""
+        entry = self.index.get(url)
+        path = self.path(url)
+        if entry is None or not os.path.exists(path) or os.path.getsize(path) != entry['size']:
+            return None
+        return entry if file_sha256(path) == entry['sha256'] else None
+
+    def record(self, url, etag):
+        path = self.path(url)
+        entry = {"sha256": file_sha256(path), "size": os.path.getsize(path), "etag": etag,
+                 "fetchedAt": time.strftime('%Y-%m-%dT%H:%M:%S')}
+        with self._lock:
+            self.index[url] = entry
+            self._save()
+        return entry
+
+    def forget(self, urls):
+        with self._lock:
+            for url in urls:
+                self.index.pop(url, None)
+            self._save()
+
+    def _save(self):
+        tmp = f"{self.index_path}.tmp{threading.get_ident()}"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.index, f, indent=2)
+        os.replace(tmp, self.index_path)
+
+
+def fetch_url(pool, cache, url, refresh=False):
+    """Make sure url is in the cache; returns "cached", "unchanged" or "downloaded" """
+    entry = cache.valid(url)
+    if entry is not None and not refresh:
+        return "cached"
+    etag = download(pool, url, cache.path(url), etag=entry and entry.get('etag'))
+    if etag is False:
+        return "unchanged"
+    cache.record(url, etag)
+    return "downloaded"
+
+
+def source_urls(entry, base_url=DEFAULT_BASE_URL):
+    """The URLs a registry entry is fetched from: one file, or one per book"""
+    if entry.get('book_url'):
+        return [urljoin(base_url, entry['book_url'].format(number=number, abbrev=abbrev))
+                for number, abbrev in enumerate(BOOK_ORDER, 1)]
+    return [urljoin(base_url, entry.get('url') or os.path.basename(entry['source']))]
+
+
+def assemble(entry, urls, cache):
+    """The source file's bytes: the downloaded file, or the books joined"""
+    if not entry.get('book_url'):
+        with open(cache.path(urls[0]), 'rb') as f:
+            return f.read()
+
+    books = []
+    for url in urls:
+        with open(cache.path(url), 'r', encoding='utf-8-sig') as f:
+            books.append(json.load(f))
+    content = {"books": books} if entry.get('container') == 'books' else books
+    return json.dumps(content, ensure_ascii=False).encode(entry.get('encoding', 'utf-8'))
+
+
+def install(entry, content):
+    """Write a source file unless it already has this content; returns whether it was written"""
+    path = entry['source']
+    sha256 = hashlib.sha256(content).hexdigest()
+    if entry.get('sha256') and entry['sha256'] != sha256:
+        raise FetchError(f"{entry['key']}: checksum mismatch (expected {entry['sha256']}, got {sha256})")
+    if os.path.exists(path) and file_sha256(path) == sha256:
+        return False
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, 'wb') as f:
+        f.write(content)
+    os.replace(tmp, path)
+    return True
+
+
+def fetch_all(entries, base_url=DEFAULT_BASE_URL, connections=DEFAULT_CONNECTIONS, cache_dir=CACHE_DIR,
+              refresh=False, metrics=None):
+    """Fetch and install every entry's source; returns one result dict per entry, in order"""
+    cache = SourceCache(cache_dir)
+    pool = ConnectionPool(connections)
+    urls = {entry['key']: source_urls(entry, base_url) for entry in entries}
+    outcomes = {}
+
+    def fetch(url):
+        try:
+            outcomes[url] = fetch_url(pool, cache, url, refresh)
+        except FetchError as e:
+            outcomes[url] = e
+
+    unique_urls = list(dict.fromkeys(url for key_urls in urls.values() for url in key_urls))
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=connections) as workers:
+            list(workers.map(fetch, unique_urls))
+    finally:
+        pool.close()
+    seconds = time.perf_counter() - start
+
+    results = []
+    for entry in entries:
+        key_urls = urls[entry['key']]
+        errors = [str(outcomes[url]) for url in key_urls if isinstance(outcomes[url], FetchError)]
+        result = {
+            "key": entry['key'],
+            "source": entry['source'],
+            "files": len(key_urls),
+            "downloaded": sum(outcomes[url] == "downloaded" for url in key_urls),
+            "cached": sum(outcomes[url] in ("cached", "unchanged") for url in key_urls),
+        }
+        if not errors:
+            try:
+                content = assemble(entry, key_urls, cache)
+                result['written'] = install(entry, content)
+                result['bytes'] = len(content)
+            except (FetchError, OSError, ValueError) as e:
+                errors.append(str(e))
+                if isinstance(e, (FetchError, ValueError)):
+                    # Do not trust these cache entries on the next run
+                    cache.forget(key_urls)
+        if errors:
+            result['errors'] = errors
+        results.append(result)
+
+    if metrics is not None:
+        metrics.count(translations=len(entries), files=len(unique_urls), requests=pool.requests,
+                      connections=pool.opened, failed=sum('errors' in r for r in results),
+                      bytesWritten=sum(r.get('bytes', 0) for r in results if r.get('written')))
+    print(f"  {len(unique_urls)} file(s), {pool.requests} request(s) over {pool.opened} connection(s) "
+          f"in {seconds:.2f}s")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Download the translation sources (parallel, resumable)")
+    parser.add_argument('--base-url', default=DEFAULT_BASE_URL, help="where relative source URLs are resolved")
+    parser.add_argument('--registry', help="JSON registry file (defaults to translations.py)")
+    parser.add_argument('--only', help="comma-separated keys to fetch (translations or reference sources)")
+    parser.add_argument('--connections', type=int, default=DEFAULT_CONNECTIONS,
+                        help="parallel downloads / open connections")
+    parser.add_argument('--refresh', action='store_true', help="revalidate cached files with the server")
+    parser.add_argument('--cache-dir', default=CACHE_DIR, help="download cache directory")
+    args = parser.parse_args()
+
+    entries = list(load_registry(args.registry)) + REFERENCE_SOURCES
+    if args.only:
+        wanted = args.only.split(',')
+        unknown = set(wanted) - {entry['key'] for entry in entries}
+        if unknown:
+            parser.error(f"Unknown source(s): {', '.join(sorted(unknown))}")
+        entries = [entry for entry in entries if entry['key'] in wanted]
+
+    print(f"Fetching {len(entries)} source(s) with {args.connections} connection(s)...")
+    metrics = Metrics('fetch_sources')
+    with metrics.stage('fetch'):
+        results = fetch_all(entries, args.base_url, args.connections, args.cache_dir, args.refresh, metrics)
+
+    for result in results:
+        if 'errors' in result:
+            print(f"❌ {result['key']}: {result['errors'][0]}"
+                  + (f" (+{len(result['errors']) - 1} more)" if len(result['errors']) > 1 else ''))
+            continue
+        state = "updated" if result['written'] else "unchanged"
+        print(f"✓ {result['key']}: {result['source']} {state} "
+              f"({result['downloaded']} downloaded, {result['cached']} cached, {result['bytes'] / 1e6:.2f} MB)")
+    metrics.finish()
+
+    failed = sum('errors' in result for result in results)
+    if failed:
+        print(f"\n❌ {failed} source(s) failed; run again to resume")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
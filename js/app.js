@@ -1,8 +1,8 @@
 // Bible App - Main JavaScript
 class BibleApp {
     constructor() {
-        this.englishData = null;
-        this.koreanData = null;
+        this.manifest = null;
+        this.chapterCache = new Map();
         this.currentBookIndex = null;
         this.currentChapterIndex = null;
         this.isSyncing = false;
@@ -18,41 +18,106 @@ class BibleApp {
         this.prevChapterBtn = document.getElementById('prevChapter');
         this.nextChapterBtn = document.getElementById('nextChapter');
 
+        // Chapter pages pre-rendered by build_pages.py say where the site root is
+        // and which chapter they show
+        const page = document.body.dataset;
+        this.root = page.root || '';
+        this.pagesDir = page.pages || 'read';
+        this.prerendered = page.book === undefined ? null :
+            { bookIndex: parseInt(page.book), chapterNumber: parseInt(page.chapter) };
+
         this.init();
     }
 
     async init() {
+        if (this.prerendered) {
+            // The verses are already on the page: line the rows up before anything loads
+            this.syncVerseHeights();
+        }
+
         try {
-            await this.loadBibleData();
+            await this.loadManifest();
             this.setupEventListeners();
             this.populateBookSelect();
-            this.showWelcomeMessage();
+            if (this.prerendered) {
+                this.showPrerenderedChapter();
+            } else {
+                this.showWelcomeMessage();
+            }
         } catch (error) {
             console.error('Error initializing app:', error);
-            this.showError('Failed to load Bible data. Please refresh the page.');
+            // A pre-rendered chapter is still worth reading without navigation
+            if (!this.prerendered) {
+                this.showError('Failed to load Bible data. Please refresh the page.');
+            }
         }
     }
 
-    async loadBibleData() {
+    async loadManifest() {
         try {
-            // Load English Bible data
-            const englishResponse = await fetch('data/english.json');
-            if (!englishResponse.ok) {
-                throw new Error('Failed to load English Bible data');
-            }
-            this.englishData = await englishResponse.json();
-
-            // Load Korean Bible data
-            const koreanResponse = await fetch('data/korean.json');
-            if (!koreanResponse.ok) {
-                throw new Error('Failed to load Korean Bible data');
+            // Only the book/chapter index is needed at startup;
+            // chapter text is fetched on demand (see build_shards.py)
+            const response = await fetch(this.assetUrl('data/chapters/manifest.json'));
+            if (!response.ok) {
+                throw new Error('Failed to load Bible manifest');
             }
-            this.koreanData = await koreanResponse.json();
+            this.manifest = await response.json();
         } catch (error) {
             throw new Error('Error loading Bible data: ' + error.message);
         }
     }
 
+    assetUrl(path) {
+        // build_assets.py inlines a map of content-hashed names into index.html
+        const assets = window.ASSET_MANIFEST;
+        return this.root + ((assets && assets[path]) || path);
+    }
+
+    pageUrl(bookIndex, chapterIndex) {
+        const chapterNumber = this.manifest.books[bookIndex].chapters[chapterIndex].number;
+        return `${this.root}${this.pagesDir}/${bookIndex + 1}/${chapterNumber}.html`;
+    }
+
+    chapterUrl(translation, bookIndex, chapterNumber) {
+        const base = `${this.root}data/chapters/${translation}/${bookIndex + 1}/${chapterNumber}`;
+        const chapter = this.manifest.books[bookIndex].chapters.find(c => c.number === chapterNumber);
+        const hash = chapter && chapter.hashes && chapter.hashes[this.manifest.translations.indexOf(translation)];
+        if (!hash) {
+            return `${base}.json`;
+        }
+        // Hashed file names in a build_assets.py build; elsewhere the hash
+        // still gives every version of a chapter its own URL
+        return this.manifest.hashedUrls ? `${base}.${hash}.json` : `${base}.json?v=${hash}`;
+    }
+
+    async fetchChapter(translation, bookIndex, chapterNumber) {
+        const key = `${translation}/${bookIndex + 1}/${chapterNumber}`;
+
+        // Cache the promise so concurrent requests share one fetch
+        if (!this.chapterCache.has(key)) {
+            const url = this.chapterUrl(translation, bookIndex, chapterNumber);
+            const request = fetch(url).then(response => {
+                if (!response.ok) {
+                    throw new Error(`Failed to load ${translation} chapter`);
+                }
+                return response.json();
+            });
+            request.catch(() => this.chapterCache.delete(key));
+            this.chapterCache.set(key, request);
+        }
+
+        return this.chapterCache.get(key);
+    }
+
+    async loadChapter(bookIndex, chapterIndex) {
+        const chapterNumber = this.manifest.books[bookIndex].chapters[chapterIndex].number;
+        const [englishChapter, koreanChapter] = await Promise.all([
+            this.fetchChapter('english', bookIndex, chapterNumber),
+            this.fetchChapter('korean', bookIndex, chapterNumber)
+        ]);
+        return { englishChapter, koreanChapter };
+    }
+
     setupEventListeners() {
         // Book selection
         this.bookSelect.addEventListener('change', (e) => {
@@ -118,11 +183,10 @@ class BibleApp {
         // Clear existing options except the first one
         this.bookSelect.innerHTML = '<option value="">Select a book...</option>';
 
-        this.englishData.books.forEach((englishBook, index) => {
-            const koreanBook = this.koreanData.books[index];
+        this.manifest.books.forEach((book, index) => {
             const option = document.createElement('option');
             option.value = index;
-            option.textContent = `${englishBook.name} (${koreanBook.name})`;
+            option.textContent = `${book.names.english} (${book.names.korean})`;
             this.bookSelect.appendChild(option);
         });
     }
@@ -149,12 +213,12 @@ class BibleApp {
         this.updateNavigationButtons();
     }
 
-    populateChapterSelect() {
+    populateChapterSelect(autoSelect = true) {
         this.chapterSelect.innerHTML = '<option value="">Select a chapter...</option>';
 
-        const englishBook = this.englishData.books[this.currentBookIndex];
+        const book = this.manifest.books[this.currentBookIndex];
 
-        englishBook.chapters.forEach((chapter, index) => {
+        book.chapters.forEach((chapter, index) => {
             const option = document.createElement('option');
             option.value = index;
             option.textContent = `Chapter ${chapter.number}`;
@@ -164,8 +228,10 @@ class BibleApp {
         this.chapterSelect.disabled = false;
 
         // Auto-select first chapter
-        this.chapterSelect.value = 0;
-        this.onChapterChange(0);
+        if (autoSelect) {
+            this.chapterSelect.value = 0;
+            this.onChapterChange(0);
+        }
     }
 
     onChapterChange(chapterIndex) {
@@ -176,60 +242,56 @@ class BibleApp {
         }
 
         this.currentChapterIndex = parseInt(chapterIndex);
+        if (this.prerendered) {
+            // Every chapter has its own pre-rendered page
+            window.location.href = this.pageUrl(this.currentBookIndex, this.currentChapterIndex);
+            return;
+        }
         this.displayChapter();
         this.updateNavigationButtons();
     }
 
-    displayChapter() {
-        const englishBook = this.englishData.books[this.currentBookIndex];
-        const koreanBook = this.koreanData.books[this.currentBookIndex];
-        const englishChapter = englishBook.chapters[this.currentChapterIndex];
-        const koreanChapter = koreanBook.chapters[this.currentChapterIndex];
-
-        // Clear previous content
-        this.englishText.innerHTML = '';
-        this.koreanText.innerHTML = '';
-
-        // Get verse counts for both languages
-        const englishVerseCount = englishChapter.verses.length;
-        const koreanVerseCount = koreanChapter.verses.length;
-        const maxVerseCount = Math.max(englishVerseCount, koreanVerseCount);
+    async displayChapter() {
+        const bookIndex = this.currentBookIndex;
+        const chapterIndex = this.currentChapterIndex;
+        const book = this.manifest.books[bookIndex];
 
-        // Populate verse selector with the maximum verse count
-        this.populateVerseSelect(maxVerseCount);
-
-        // Check for mismatch and display warning if present
-        if (englishVerseCount !== koreanVerseCount) {
-            console.warn(`Verse count mismatch in ${englishBook.name} Chapter ${englishChapter.number}: English=${englishVerseCount}, Korean=${koreanVerseCount}`);
+        let englishChapter, koreanChapter;
+        try {
+            ({ englishChapter, koreanChapter } = await this.loadChapter(bookIndex, chapterIndex));
+        } catch (error) {
+            console.error('Error loading chapter:', error);
+            this.showError('Failed to load chapter. Please try again.');
+            return;
         }
 
-        // Display verses - iterate through all verses from both languages
-        for (let i = 0; i < maxVerseCount; i++) {
-            const englishVerse = englishChapter.verses[i];
-            const koreanVerse = koreanChapter.verses[i];
+        // Ignore responses for a chapter the reader has already navigated away from
+        if (bookIndex !== this.currentBookIndex || chapterIndex !== this.currentChapterIndex) {
+            return;
+        }
 
-            // English verse (or placeholder if missing)
-            if (englishVerse) {
-                const englishVerseElement = this.createVerseElement(englishVerse.number, englishVerse.text);
-                this.englishText.appendChild(englishVerseElement);
-            } else {
-                // Create placeholder for missing English verse
-                const verseNumber = i + 1;
-                const englishVerseElement = this.createVerseElement(verseNumber, '[Verse not available in English translation]', true);
-                this.englishText.appendChild(englishVerseElement);
-            }
+        // Clear previous content
+        this.englishText.innerHTML = '';
+        this.koreanText.innerHTML = '';
 
-            // Korean verse (or placeholder if missing)
-            if (koreanVerse) {
-                const koreanVerseElement = this.createVerseElement(koreanVerse.number, koreanVerse.text);
-                this.koreanText.appendChild(koreanVerseElement);
-            } else {
-                // Create placeholder for missing Korean verse
-                const verseNumber = i + 1;
-                const koreanVerseElement = this.createVerseElement(verseNumber, '[한국어 번역에서 사용할 수 없는 구절]', true);
-                this.koreanText.appendChild(koreanVerseElement);
-            }
-        }
+        // Chapters whose verses differ between translations come with
+        // precomputed rows (see build_alignment.py); the rest pair verses by position
+        const chapterEntry = book.chapters[chapterIndex];
+        const rows = chapterEntry.rows || this.positionalRows(englishChapter, koreanChapter);
+        const englishVerses = new Map(englishChapter.verses.map(verse => [verse.number, verse]));
+        const koreanVerses = new Map(koreanChapter.verses.map(verse => [verse.number, verse]));
+
+        // Populate verse selector with the larger verse count of the two languages
+        const [englishVerseCount, koreanVerseCount] = chapterEntry.verseCounts;
+        this.populateVerseSelect(Math.max(englishVerseCount, koreanVerseCount));
+
+        // Display one element per row in each column so the rows line up
+        rows.forEach(([englishNumbers, koreanNumbers], i) => {
+            this.englishText.appendChild(this.createRowElement(
+                englishNumbers, englishVerses, i + 1, '[Verse not available in English translation]'));
+            this.koreanText.appendChild(this.createRowElement(
+                koreanNumbers, koreanVerses, i + 1, '[한국어 번역에서 사용할 수 없는 구절]'));
+        });
 
         // Reset scroll position
         document.querySelector('.english-column').scrollTop = 0;
@@ -239,6 +301,32 @@ class BibleApp {
         this.syncVerseHeights();
     }
 
+    showPrerenderedChapter() {
+        // Keep the rows build_pages.py rendered; only fill in the navigation
+        const { bookIndex, chapterNumber } = this.prerendered;
+        const book = this.manifest.books[bookIndex];
+        const chapterIndex = book ? book.chapters.findIndex(c => c.number === chapterNumber) : -1;
+        if (chapterIndex < 0) {
+            return;
+        }
+
+        this.currentBookIndex = bookIndex;
+        this.currentChapterIndex = chapterIndex;
+        this.bookSelect.value = bookIndex;
+        this.populateChapterSelect(false);
+        this.chapterSelect.value = chapterIndex;
+
+        const [englishVerseCount, koreanVerseCount] = book.chapters[chapterIndex].verseCounts;
+        this.populateVerseSelect(Math.max(englishVerseCount, koreanVerseCount));
+        this.updateNavigationButtons();
+
+        // Deep links such as read/43/3.html#v16 scroll both columns
+        const match = window.location.hash.match(/^#v(\d+)$/);
+        if (match) {
+            this.onVerseChange(match[1]);
+        }
+    }
+
     syncVerseHeights() {
         // Get all verses from both columns
         const englishVerses = this.englishText.querySelectorAll('.verse');
@@ -266,6 +354,27 @@ class BibleApp {
         });
     }
 
+    positionalRows(englishChapter, koreanChapter) {
+        const rowCount = Math.max(englishChapter.verses.length, koreanChapter.verses.length);
+        const cell = (verse) => verse ? [verse.number] : [];
+        return Array.from({ length: rowCount }, (_, i) =>
+            [cell(englishChapter.verses[i]), cell(koreanChapter.verses[i])]);
+    }
+
+    createRowElement(numbers, versesByNumber, rowNumber, missingText) {
+        // Placeholder for a row this translation has no verse for
+        if (numbers.length === 0) {
+            return this.createVerseElement(rowNumber, missingText, true);
+        }
+
+        // One or more verses merged into a single row (e.g. "12-13")
+        const label = numbers.length > 1 ? `${numbers[0]}-${numbers[numbers.length - 1]}` : numbers[0];
+        const text = numbers.map(number => versesByNumber.get(number).text).join(' ');
+        const verseDiv = this.createVerseElement(label, text);
+        verseDiv.setAttribute('data-verse', numbers.join(' '));
+        return verseDiv;
+    }
+
     createVerseElement(number, text, isMissing = false) {
         const verseDiv = document.createElement('div');
         verseDiv.className = 'verse';
@@ -312,8 +421,9 @@ class BibleApp {
         // Find the verse elements in both columns
         const englishColumn = document.querySelector('.english-column');
         const koreanColumn = document.querySelector('.korean-column');
-        const englishVerse = this.englishText.querySelector(`[data-verse="${verseNumber}"]`);
-        const koreanVerse = this.koreanText.querySelector(`[data-verse="${verseNumber}"]`);
+        // data-verse lists every verse number in a row, so merged rows match too
+        const englishVerse = this.englishText.querySelector(`[data-verse~="${verseNumber}"]`);
+        const koreanVerse = this.koreanText.querySelector(`[data-verse~="${verseNumber}"]`);
 
         if (englishVerse && koreanVerse) {
             // Scroll both columns to the verse
@@ -346,7 +456,7 @@ class BibleApp {
         }
 
         const newIndex = this.currentBookIndex + direction;
-        if (newIndex >= 0 && newIndex < this.englishData.books.length) {
+        if (newIndex >= 0 && newIndex < this.manifest.books.length) {
             this.bookSelect.value = newIndex;
             this.onBookChange(newIndex);
         }
@@ -355,10 +465,10 @@ class BibleApp {
     navigateChapter(direction) {
         if (this.currentBookIndex === null || this.currentChapterIndex === null) return;
 
-        const englishBook = this.englishData.books[this.currentBookIndex];
+        const book = this.manifest.books[this.currentBookIndex];
         const newChapterIndex = this.currentChapterIndex + direction;
 
-        if (newChapterIndex >= 0 && newChapterIndex < englishBook.chapters.length) {
+        if (newChapterIndex >= 0 && newChapterIndex < book.chapters.length) {
             this.chapterSelect.value = newChapterIndex;
             this.onChapterChange(newChapterIndex);
         }
@@ -371,7 +481,7 @@ class BibleApp {
             this.nextBookBtn.disabled = false; // Enable next button to navigate to Genesis
         } else {
             this.prevBookBtn.disabled = this.currentBookIndex === 0;
-            this.nextBookBtn.disabled = this.currentBookIndex === this.englishData.books.length - 1;
+            this.nextBookBtn.disabled = this.currentBookIndex === this.manifest.books.length - 1;
         }
 
         // Update chapter navigation buttons
@@ -379,9 +489,9 @@ class BibleApp {
             this.prevChapterBtn.disabled = true;
             this.nextChapterBtn.disabled = true;
         } else {
-            const englishBook = this.englishData.books[this.currentBookIndex];
+            const book = this.manifest.books[this.currentBookIndex];
             this.prevChapterBtn.disabled = this.currentChapterIndex === 0;
-            this.nextChapterBtn.disabled = this.currentChapterIndex === englishBook.chapters.length - 1;
+            this.nextChapterBtn.disabled = this.currentChapterIndex === book.chapters.length - 1;
         }
     }
 
@@ -0,0 +1,679 @@
+#!/usr/bin/env python3
+"""Load-test a running server with simulated reader traffic
+
+Each simulated visitor behaves like a browser tab: its own keep-alive
+connections (up to six, as browsers open per host), its own HTTP cache
+(content-hashed names with `immutable` are not requested again, anything
+else is revalidated with If-None-Match) and, like app.js, each chapter is
+fetched at most once per visit. Visitors follow one of three patterns:
+
+    sequential  opens the site and reads on chapter by chapter from a random
+                starting point (the next book when a book ends), as the
+                Next button does
+    hotspot     follows a link to one of a few popular chapters (John 3,
+                Psalm 23, ...), weighted so the top ones dominate, and
+                maybe to another after that
+    deeplink    a first-time visitor landing on a random chapter: cold
+                browser cache, and a cold server cache for the chapter
+
+How a chapter view turns into requests depends on --mode:
+
+    app     index.html, its stylesheet and script and the chapter manifest on
+            arrival, then the two chapter shards per view, in parallel
+    pages   the pre-rendered read/<book>/<chapter>.html per view (plus its
+            assets and the manifest, from the cache when they allow it)
+    api     as app, but one /api/chapter/<book>/<chapter>?langs=en,ko
+            request per view (serve.py --api)
+
+Start the server first (python3 serve.py, or --directory dist for the
+content-hashed build), then run the same traffic against each setup:
+
+    python3 load_test.py --out root.json
+    python3 load_test.py --url http://localhost:8001/ --baseline root.json
+
+The report gives throughput, p50/p95/p99 latency, errors and bytes
+received (headers and body, as sent) for every scenario and request kind,
+and the time a reader waits for a whole chapter view. --out saves it as
+JSON; --baseline compares against an earlier report. Run the load
+generator on another machine (or at least another core) than the server
+when the numbers matter: both sides share the CPU here.
+
+Usage:
+    python3 load_test.py [--url http://localhost:8000/] [--mode app|pages|api]
+                         [--concurrency 20] [--duration 30] [--requests N]
+                         [--mix sequential=60,hotspot=25,deeplink=15]
+                         [--think 0] [--no-gzip] [--seed 0]
+                         [--out load_report.json] [--baseline old.json]
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import math
+import random
+import re
+import time
+from datetime import datetime, timezone
+from urllib.parse import urljoin, urlsplit
+
+from build_assets import ASSET_REF_RE
+
+DEFAULT_URL = 'http://localhost:8000/'
+DEFAULT_CONCURRENCY = 20
+DEFAULT_DURATION = 30
+DEFAULT_MIX = 'sequential=60,hotspot=25,deeplink=15'
+MODES = ['app', 'pages', 'api']
+SCENARIOS = ['sequential', 'hotspot', 'deeplink']
+REPORT_VERSION = 1
+
+REQUEST_TIMEOUT = 10
+# Browsers open at most six connections per host
+CONNECTIONS_PER_VISITOR = 6
+# Chapters a sequential reader gets through in one visit
+SEQUENTIAL_CHAPTERS = (3, 20)
+MANIFEST_PATH = 'data/chapters/manifest.json'
+PAGES_DIR = 'read'
+API_LANGS = 'en,ko'
+
+# Most-visited chapters as (book index, chapter number), most popular first
+POPULAR_CHAPTERS = [
+    (42, 3),    # John 3
+    (18, 23),   # Psalm 23
+    (0, 1),     # Genesis 1
+    (45, 13),   # 1 Corinthians 13
+    (44, 8),    # Romans 8
+    (49, 4),    # Philippians 4
+    (39, 5),    # Matthew 5
+    (23, 29),   # Jeremiah 29
+    (22, 53),   # Isaiah 53
+    (18, 91),   # Psalm 91
+    (19, 3),    # Proverbs 3
+    (42, 1),    # John 1
+]
+
+ASSET_MANIFEST_RE = re.compile(r'window\.ASSET_MANIFEST = (\{.*?\});')
+
+
+class RunOver(Exception):
+    """The duration or request budget is used up"""
+
+
+# --- HTTP ---
+
+class Connection:
+    """One keep-alive HTTP/1.1 connection"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def open(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+    async def get(self, path, headers):
+        """(status, headers, body, bytes received); the connection is closed if it can't be reused"""
+        reused = self.writer is not None
+        if not reused:
+            await self.open()
+        request = [f"GET {path} HTTP/1.1", f"Host: {self.host}:{self.port}"]
+        request += [f"{name}: {value}" for name, value in headers.items()]
+        try:
+            self.writer.write(('\r\n'.join(request) + '\r\n\r\n').encode('latin-1'))
+            status_line = await self.reader.readline()
+            if not status_line:
+                raise ConnectionResetError("Server closed the connection")
+        except (ConnectionError, OSError):
+            self.close()
+            if not reused:
+                raise
+            # The server dropped an idle keep-alive connection; a browser retries once
+            return await self.get(path, headers)
+
+        try:
+            return await self._read_response(status_line)
+        except BaseException:
+            self.close()
+            raise
+
+    async def _read_response(self, status_line):
+        size = len(status_line)
+        status = int(status_line.split()[1])
+        response_headers = {}
+        while True:
+            line = await self.reader.readline()
+            size += len(line)
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            response_headers[name.strip().lower()] = value.strip()
+
+        if status in (204, 304) or 100 <= status < 200:
+            body = b''
+        elif response_headers.get('transfer-encoding', '').lower() == 'chunked':
+            body = await self._read_chunked()
+            size += len(body)
+        elif 'content-length' in response_headers:
+            body = await self.reader.readexactly(int(response_headers['content-length']))
+            size += len(body)
+        else:
+            body = await self.reader.read()
+            size += len(body)
+            self.close()
+
+        if response_headers.get('connection', '').lower() == 'close':
+            self.close()
+        return status, response_headers, body, size
+
+    async def _read_chunked(self):
+        parts = []
+        while True:
+            length = int((await self.reader.readline()).split(b';')[0], 16)
+            if length == 0:
+                while (await self.reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                return b''.join(parts)
+            parts.append(await self.reader.readexactly(length))
+            await self.reader.readexactly(2)
+
+
+def decode_body(headers, body):
+    if headers.get('content-encoding') == 'gzip':
+        return gzip.decompress(body)
+    return body
+
+
+def cacheable_forever(headers):
+    return 'immutable' in headers.get('cache-control', '')
+
+
+# --- The site ---
+
+async def load_site(base_url, mode, accept_gzip=True):
+    """What the visitors need to know up front: the book/chapter layout and URL scheme"""
+    parts = urlsplit(base_url)
+    connection = Connection(parts.hostname, parts.port or 80)
+    headers = {'Accept-Encoding': 'gzip'} if accept_gzip else {}
+    try:
+        status, response_headers, body, _ = await connection.get(parts.path or '/', headers)
+        if status != 200:
+            raise ValueError(f"{base_url} returned {status}")
+        index_html = decode_body(response_headers, body).decode('utf-8')
+        match = ASSET_MANIFEST_RE.search(index_html)
+        asset_map = json.loads(match.group(1)) if match else {}
+
+        manifest_url = urljoin(base_url, asset_map.get(MANIFEST_PATH, MANIFEST_PATH))
+        status, response_headers, body, _ = await connection.get(urlsplit(manifest_url).path, headers)
+        if status != 200:
+            raise ValueError(f"{manifest_url} returned {status} - run build_shards.py first")
+        manifest = json.loads(decode_body(response_headers, body))
+
+        if mode == 'pages':
+            book_index, chapter = POPULAR_CHAPTERS[0]
+            page = urljoin(base_url, f"{PAGES_DIR}/{book_index + 1}/{chapter}.html")
+            status, _, _, _ = await connection.get(urlsplit(page).path, headers)
+            if status != 200:
+                raise ValueError(f"{page} returned {status} - run build_pages.py first")
+        if mode == 'api':
+            status, _, _, _ = await connection.get(urlsplit(urljoin(base_url, 'api/stats')).path, headers)
+            if status != 200:
+                raise ValueError(f"{base_url}api/stats returned {status} - start serve.py with --api")
+    finally:
+        connection.close()
+
+    chapters = [(book_index, chapter['number'])
+                for book_index, book in enumerate(manifest['books']) for chapter in book['chapters']]
+    popular = [target for target in POPULAR_CHAPTERS if target in set(chapters)]
+    # The two columns app.js shows
+    translations = [key for key in ('english', 'korean') if key in manifest['translations']]
+    return {"baseUrl": base_url, "host": parts.hostname, "port": parts.port or 80, "mode": mode,
+            "manifest": manifest, "manifestUrl": manifest_url, "translations": translations,
+            "chapters": chapters, "popular": popular or chapters[:1]}
+
+
+def chapter_path(site, translation, book_index, chapter_number):
+    """The shard URL path app.js builds (chapterUrl)"""
+    manifest = site['manifest']
+    base = urlsplit(urljoin(site['baseUrl'], f"data/chapters/{translation}/{book_index + 1}/{chapter_number}")).path
+    chapter = next((c for c in manifest['books'][book_index]['chapters'] if c['number'] == chapter_number), None)
+    hashes = chapter and chapter.get('hashes')
+    if not hashes:
+        return f"{base}.json"
+    hash_value = hashes[manifest['translations'].index(translation)]
+    return f"{base}.{hash_value}.json" if manifest.get('hashedUrls') else f"{base}.json?v={hash_value}"
+
+
+def page_path(site, book_index, chapter_number):
+    return urlsplit(urljoin(site['baseUrl'], f"{PAGES_DIR}/{book_index + 1}/{chapter_number}.html")).path
+
+
+def next_chapter(site, book_index, chapter_number):
+    """Where the Next button (or, at the end of a book, the next book) leads; None at the end"""
+    books = site['manifest']['books']
+    numbers = [chapter['number'] for chapter in books[book_index]['chapters']]
+    position = numbers.index(chapter_number)
+    if position + 1 < len(numbers):
+        return book_index, numbers[position + 1]
+    for following in range(book_index + 1, len(books)):
+        if books[following]['chapters']:
+            return following, books[following]['chapters'][0]['number']
+    return None
+
+
+# --- Measurements ---
+
+class Stats:
+    """Every request and chapter view of a run, and when to stop"""
+
+    def __init__(self, duration=None, max_requests=None):
+        self.duration = duration
+        self.max_requests = max_requests
+        self.issued = 0
+        self.requests = []   # (scenario, kind, seconds, status or None, bytes, error or None)
+        self.views = []      # (scenario, seconds, ok)
+        self.started = None
+        self.elapsed = None
+
+    def start(self):
+        self.started = time.perf_counter()
+
+    def stop(self):
+        self.elapsed = time.perf_counter() - self.started
+
+    def check(self):
+        """Count a request about to start, or raise RunOver once the run is over"""
+        if self.duration is not None and time.perf_counter() - self.started >= self.duration:
+            raise RunOver()
+        if self.max_requests is not None and self.issued >= self.max_requests:
+            raise RunOver()
+        self.issued += 1
+
+    def record(self, scenario, kind, seconds, status, size, error=None):
+        self.requests.append((scenario, kind, seconds, status, size, error))
+
+    def view(self, scenario, seconds, ok):
+        self.views.append((scenario, seconds, ok))
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    return sorted_values[max(0, math.ceil(p / 100 * len(sorted_values)) - 1)]
+
+
+def latency_summary(seconds):
+    values = sorted(seconds)
+    summary = {}
+    for name, p in (('p50', 50), ('p95', 95), ('p99', 99), ('max', 100)):
+        value = percentile(values, p)
+        summary[f"{name}Ms"] = round(value * 1000, 2) if value is not None else None
+    return summary
+
+
+def summarize(rows, elapsed):
+    errors = {}
+    for _, _, _, status, _, error in rows:
+        if error is not None:
+            errors[error] = errors.get(error, 0) + 1
+    failed = sum(errors.values())
+    total_bytes = sum(row[4] for row in rows)
+    return {
+        "requests": len(rows),
+        "requestsPerSecond": round(len(rows) / elapsed, 1) if elapsed else None,
+        "errors": failed,
+        "errorRate": round(failed / len(rows), 4) if rows else 0.0,
+        "errorsByType": errors,
+        "notModified": sum(1 for row in rows if row[3] == 304),
+        "bytes": total_bytes,
+        "bytesPerSecond": round(total_bytes / elapsed) if elapsed else None,
+        **latency_summary([row[2] for row in rows]),
+    }
+
+
+def build_report(stats, site, settings):
+    rows = stats.requests
+    groups = {}
+    for dimension, column in (('scenarios', 0), ('kinds', 1)):
+        names = sorted({row[column] for row in rows})
+        groups[dimension] = {name: summarize([row for row in rows if row[column] == name], stats.elapsed)
+                             for name in names}
+
+    views = {}
+    for scenario in sorted({view[0] for view in stats.views}):
+        matching = [view for view in stats.views if view[0] == scenario]
+        views[scenario] = {"views": len(matching), "failed": sum(1 for view in matching if not view[2]),
+                           **latency_summary([view[1] for view in matching if view[2]])}
+
+    return {
+        "version": REPORT_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        "url": site['baseUrl'],
+        "mode": site['mode'],
+        "hashedUrls": bool(site['manifest'].get('hashedUrls')),
+        "settings": settings,
+        "seconds": round(stats.elapsed, 2),
+        "total": summarize(rows, stats.elapsed),
+        "scenarios": groups['scenarios'],
+        "kinds": groups['kinds'],
+        "chapterViews": views,
+    }
+
+
+# --- Visitors ---
+
+class Visitor:
+    """One browser tab: its own connections, HTTP cache and chapter cache"""
+
+    def __init__(self, site, stats, scenario, accept_gzip=True):
+        self.site = site
+        self.stats = stats
+        self.scenario = scenario
+        self.accept_gzip = accept_gzip
+        self.idle = []
+        self.slots = asyncio.Semaphore(CONNECTIONS_PER_VISITOR)
+        self.http_cache = {}     # path -> (etag or None, immutable)
+        self.assets = {}         # page path -> stylesheet and script paths it references
+        self.chapters = set()    # chapters already fetched, as app.js caches them
+
+    def close(self):
+        for connection in self.idle:
+            connection.close()
+        self.idle = []
+
+
+    async def fetch(self, path, kind, decode=False):
+        """GET through the browser cache; returns the body (b'' if cached, None on an error)"""
+        cached = self.http_cache.get(path)
+        if cached is not None and cached[1]:
+            return b''
+        self.stats.check()
+
+        headers = {'Accept-Encoding': 'gzip'} if self.accept_gzip else {}
+        if cached is not None and cached[0]:
+            headers['If-None-Match'] = cached[0]
+
+        async with self.slots:
+            connection = self.idle.pop() if self.idle else Connection(self.site['host'], self.site['port'])
+            start = time.perf_counter()
+            try:
+                status, response_headers, body, size = await asyncio.wait_for(
+                    connection.get(path, headers), REQUEST_TIMEOUT)
+            except asyncio.TimeoutError:
+                connection.close()
+                self.stats.record(self.scenario, kind, time.perf_counter() - start, None, 0, 'timeout')
+                return None
+            except (OSError, EOFError, ValueError, IndexError, asyncio.IncompleteReadError) as e:
+                connection.close()
+                self.stats.record(self.scenario, kind, time.perf_counter() - start, None, 0, type(e).__name__)
+                return None
+            seconds = time.perf_counter() - start
+            if connection.writer is not None:
+                self.idle.append(connection)
+
+        if status >= 400:
+            self.stats.record(self.scenario, kind, seconds, status, size, str(status))
+            return None
+        self.stats.record(self.scenario, kind, seconds, status, size)
+        if status == 200:
+            self.http_cache[path] = (response_headers.get('etag'), cacheable_forever(response_headers))
+        return decode_body(response_headers, body) if decode else body
+
+    async def open_page(self, path):
+        """An HTML page, the stylesheet and scripts it references, and the chapter manifest app.js loads"""
+        body = await self.fetch(path, 'page', decode=True)
+        if body is None:
+            return False
+        if body:
+            page_html = body.decode('utf-8', 'replace')
+            self.assets[path] = [urlsplit(urljoin(path, reference)).path
+                                 for attribute, reference in ASSET_REF_RE.findall(page_html)
+                                 if (attribute == 'src' and reference.endswith('.js'))
+                                 or (attribute == 'href' and reference.endswith('.css'))]
+        # After a 304 the page references what it did the first time
+        results = await gather_all(self.fetch(asset, 'asset') for asset in self.assets.get(path, []))
+        manifest = await self.fetch(urlsplit(self.site['manifestUrl']).path, 'manifest')
+        return None not in results and manifest is not None
+
+    async def view_chapter(self, book_index, chapter_number, arriving=False):
+        """Everything one chapter view requests; returns whether the chapter could be shown"""
+        start = time.perf_counter()
+        mode = self.site['mode']
+        if mode == 'pages':
+            ok = await self.open_page(page_path(self.site, book_index, chapter_number))
+        else:
+            ok = await self.open_page(urlsplit(self.site['baseUrl']).path or '/') if arriving else True
+            if ok and (book_index, chapter_number) not in self.chapters:
+                if mode == 'api':
+                    path = urlsplit(urljoin(self.site['baseUrl'],
+                                            f"api/chapter/{book_index + 1}/{chapter_number}")).path
+                    results = [await self.fetch(f"{path}?langs={API_LANGS}", 'api')]
+                else:
+                    results = await gather_all(
+                        self.fetch(chapter_path(self.site, key, book_index, chapter_number), 'chapter')
+                        for key in self.site['translations'])
+                ok = None not in results
+                if ok:
+                    self.chapters.add((book_index, chapter_number))
+        self.stats.view(self.scenario, time.perf_counter() - start, ok)
+        return ok
+
+
+async def gather_all(awaitables):
+    """asyncio.gather that lets every request finish before raising (RunOver, say)"""
+    results = await asyncio.gather(*awaitables, return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return results
+
+
+async def pause(rng, think):
+    """Reading time between chapter views: exponential with mean `think` seconds"""
+    if think:
+        await asyncio.sleep(rng.expovariate(1 / think))
+
+
+# --- Scenarios ---
+
+async def sequential(visitor, rng, think):
+    target = rng.choice(visitor.site['chapters'])
+    for i in range(rng.randint(*SEQUENTIAL_CHAPTERS)):
+        if not await visitor.view_chapter(*target, arriving=i == 0):
+            return
+        target = next_chapter(visitor.site, *target)
+        if target is None:
+            return
+        await pause(rng, think)
+
+
+async def hotspot(visitor, rng, think):
+    popular = visitor.site['popular']
+    weights = [1 / (rank + 1) for rank in range(len(popular))]
+    for i in range(rng.randint(1, 3)):
+        if not await visitor.view_chapter(*rng.choices(popular, weights)[0], arriving=i == 0):
+            return
+        await pause(rng, think)
+
+
+async def deeplink(visitor, rng, think):
+    await visitor.view_chapter(*rng.choice(visitor.site['chapters']), arriving=True)
+
+
+SCENARIO_RUNNERS = {"sequential": sequential, "hotspot": hotspot, "deeplink": deeplink}
+
+
+def parse_mix(text):
+    """'sequential=60,hotspot=25' -> {"sequential": 60.0, "hotspot": 25.0}"""
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in SCENARIO_RUNNERS:
+            raise ValueError(f"Unknown scenario {name!r} (choose from {', '.join(SCENARIOS)})")
+        mix[name] = float(weight) if weight else 1.0
+    if not any(weight > 0 for weight in mix.values()):
+        raise ValueError("The mix needs at least one scenario with a positive weight")
+    return mix
+
+
+async def visitor_loop(site, stats, mix, rng, think, accept_gzip):
+    """One slot of --concurrency: a new visitor as soon as the last one leaves"""
+    scenarios, weights = zip(*mix.items())
+    while True:
+        scenario = rng.choices(scenarios, weights)[0]
+        visitor = Visitor(site, stats, scenario, accept_gzip)
+        try:
+            await SCENARIO_RUNNERS[scenario](visitor, rng, think)
+        except RunOver:
+            return
+        finally:
+            visitor.close()
+
+
+async def run(site, stats, mix, concurrency, think=0.0, accept_gzip=True, seed=0):
+    stats.start()
+    tasks = [asyncio.ensure_future(visitor_loop(site, stats, mix, random.Random(f"{seed}/{i}"),
+                                                think, accept_gzip))
+             for i in range(concurrency)]
+    # Readers may be thinking when the time is up; don't wait for them
+    _, pending = await asyncio.wait(tasks, timeout=stats.duration)
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    stats.stop()
+
+
+# --- Output ---
+
+def format_bytes(size):
+    if size >= 1024 * 1024:
+        return f"{size / 1024 / 1024:.1f} MB"
+    return f"{size / 1024:.0f} KB"
+
+
+def format_ms(value):
+    return f"{value:.1f}" if value is not None else '-'
+
+
+def print_report(report):
+    hashed = ', content-hashed names' if report['hashedUrls'] else ''
+    settings = report['settings']
+    print(f"\n{report['mode']} mode at {report['url']}{hashed}: {settings['concurrency']} concurrent visitors "
+          f"for {report['seconds']:.1f}s\n")
+
+    print(f"{'':<12}{'requests':>9}{'req/s':>9}{'errors':>8}{'p50':>8}{'p95':>8}{'p99':>8}{'max':>8}"
+          f"{'received':>11}   (ms)")
+    groups = [report['scenarios'].items(), report['kinds'].items(), [('total', report['total'])]]
+    for i, group in enumerate(groups):
+        if i:
+            print()
+        for name, summary in group:
+            print(f"{name:<12}{summary['requests']:>9,}{summary['requestsPerSecond']:>9.1f}{summary['errors']:>8,}"
+                  f"{format_ms(summary['p50Ms']):>8}{format_ms(summary['p95Ms']):>8}"
+                  f"{format_ms(summary['p99Ms']):>8}{format_ms(summary['maxMs']):>8}"
+                  f"{format_bytes(summary['bytes']):>11}")
+
+    print(f"\n{'Chapter view':<12}{'views':>9}{'failed':>9}{'p50':>8}{'p95':>8}{'p99':>8}{'max':>8}   (ms)")
+    for name, summary in report['chapterViews'].items():
+        print(f"{name:<12}{summary['views']:>9,}{summary['failed']:>9,}{format_ms(summary['p50Ms']):>8}"
+              f"{format_ms(summary['p95Ms']):>8}{format_ms(summary['p99Ms']):>8}{format_ms(summary['maxMs']):>8}")
+
+    total = report['total']
+    print()
+    if total['errors']:
+        errors = ', '.join(f"{count} × {name}" for name, count in sorted(total['errorsByType'].items()))
+        print(f"❌ {total['errors']:,} of {total['requests']:,} requests failed ({total['errorRate']:.2%}): {errors}")
+    print(f"✓ {total['requestsPerSecond']:,.1f} requests/s, {format_bytes(total['bytesPerSecond'])}/s received, "
+          f"{total['notModified']:,} revalidated (304)")
+
+
+def compare(report, baseline):
+    """Print throughput and tail latency against an earlier report"""
+    def change(new, old):
+        return f"{new / old - 1:>+9.1%}" if new is not None and old else f"{'-':>9}"
+
+    print(f"\nAgainst {baseline['mode']} mode at {baseline['url']} ({baseline['created']}):\n")
+    print(f"{'':<12}{'req/s':>9}{'baseline':>10}{'change':>9}{'p95 ms':>9}{'baseline':>10}{'change':>9}")
+    rows = [(name, summary, baseline['scenarios'].get(name)) for name, summary in report['scenarios'].items()]
+    rows.append(('total', report['total'], baseline['total']))
+    for name, summary, before in rows:
+        if before is None:
+            print(f"{name:<12}{summary['requestsPerSecond']:>9.1f}{'-':>10}")
+            continue
+        print(f"{name:<12}{summary['requestsPerSecond']:>9.1f}{before['requestsPerSecond']:>10.1f}"
+              f"{change(summary['requestsPerSecond'], before['requestsPerSecond'])}"
+              f"{format_ms(summary['p95Ms']):>9}{format_ms(before['p95Ms']):>10}"
+              f"{change(summary['p95Ms'], before['p95Ms'])}")
+
+    print(f"\n{'View p95':<12}{'ms':>9}{'baseline':>10}{'change':>9}")
+    for name, summary in report['chapterViews'].items():
+        before = baseline['chapterViews'].get(name)
+        old = before['p95Ms'] if before else None
+        print(f"{name:<12}{format_ms(summary['p95Ms']):>9}{format_ms(old):>10}{change(summary['p95Ms'], old)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test a running server with simulated reader traffic")
+    parser.add_argument('--url', default=DEFAULT_URL, help="site root of the running server")
+    parser.add_argument('--mode', choices=MODES, default='app',
+                        help="how chapters are loaded: shards (app), pre-rendered pages or the API")
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help="visitors at any moment")
+    parser.add_argument('--duration', type=float, help=f"seconds to run (default {DEFAULT_DURATION})")
+    parser.add_argument('--requests', type=int, help="stop after this many requests")
+    parser.add_argument('--mix', default=DEFAULT_MIX, help="scenario weights")
+    parser.add_argument('--think', type=float, default=0.0,
+                        help="mean seconds of reading between chapter views (0: as fast as possible)")
+    parser.add_argument('--no-gzip', action='store_true', help="do not send Accept-Encoding: gzip")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', help="save the report as JSON")
+    parser.add_argument('--baseline', help="an earlier report to compare against")
+    args = parser.parse_args()
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    duration = args.duration if args.duration is not None or args.requests else DEFAULT_DURATION
+    base_url = args.url if args.url.endswith('/') else args.url + '/'
+    accept_gzip = not args.no_gzip
+
+    try:
+        site = asyncio.run(load_site(base_url, args.mode, accept_gzip))
+    except (OSError, ValueError) as e:
+        print(f"❌ Could not load {base_url}: {e}")
+        raise SystemExit(1)
+    print(f"✓ {len(site['chapters']):,} chapters in the manifest; "
+          f"{', '.join(f'{name} {weight:g}' for name, weight in mix.items())}")
+
+    limits = [f"{duration:g}s" if duration else None, f"{args.requests:,} requests" if args.requests else None]
+    print(f"Running {args.concurrency} visitors for {' or '.join(limit for limit in limits if limit)}...")
+    stats = Stats(duration, args.requests)
+    asyncio.run(run(site, stats, mix, args.concurrency, args.think, accept_gzip, args.seed))
+
+    settings = {"concurrency": args.concurrency, "duration": duration, "requests": args.requests,
+                "mix": mix, "think": args.think, "gzip": accept_gzip, "seed": args.seed}
+    report = build_report(stats, site, settings)
+    print_report(report)
+
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"✓ Report saved to {args.out}")
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            compare(report, json.load(f))
+    if report['total']['errors']:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""Stage timing, memory and counters for the data pipeline scripts
+
+Scripts wrap their phases in stages and count what they process:
+
+    from pipeline_metrics import Metrics
+
+    metrics = Metrics('repair_bible_data')
+    with metrics.stage('load'):
+        data = json.load(f)
+        metrics.count(books=len(data['books']))
+    ...
+    metrics.finish()
+
+Every stage appends one JSON line to pipeline_metrics.jsonl: wall time, the
+process's peak RSS so far, its counters and, when enabled, the tracemalloc
+peak within the stage. finish() appends a "total" line for the run. Stages
+can be nested; a stage's counters and peak include its children.
+
+Environment variables:
+
+    PIPELINE_METRICS      JSON lines file (default pipeline_metrics.jsonl, "off" to disable)
+    PIPELINE_TRACEMALLOC  "1" to trace the Python heap per stage (makes JSON loading several times slower)
+    PIPELINE_PROFILE      directory for a cProfile .prof file per top-level stage
+
+Summarise recent runs:
+
+    python3 pipeline_metrics.py [--script comprehensive_repair] [--runs 5]
+"""
+import argparse
+import cProfile
+import json
+import os
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_METRICS_FILE = 'pipeline_metrics.jsonl'
+
+
+class Metrics:
+    """One pipeline run; see the module docstring"""
+
+    def __init__(self, script, path=None, trace_memory=None, profile_dir=None):
+        self.script = script
+        self.path = path or os.environ.get('PIPELINE_METRICS', DEFAULT_METRICS_FILE)
+        if trace_memory is None:
+            trace_memory = os.environ.get('PIPELINE_TRACEMALLOC', '0') == '1'
+        self.profile_dir = profile_dir or os.environ.get('PIPELINE_PROFILE')
+
+        self.run = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{os.getpid()}"
+        self.counters = Counter()
+        self._stack = []
+        self._start = time.perf_counter()
+        self._finished = False
+
+        self.trace_memory = trace_memory and not tracemalloc.is_tracing()
+        if self.trace_memory:
+            tracemalloc.start()
+        self._peak = 0
+
+    @contextmanager
+    def stage(self, name):
+        """Time a phase of the script; counts inside it are attributed to it"""
+        frame = {"name": name, "counters": Counter(), "peak": 0}
+        self._checkpoint_peak()
+        self._stack.append(frame)
+
+        profiler = None
+        if self.profile_dir and len(self._stack) == 1:
+            profiler = cProfile.Profile()
+            profiler.enable()
+
+        start = time.perf_counter()
+        status = 'ok'
+        try:
+            yield
+        except BaseException:
+            status = 'error'
+            raise
+        finally:
+            seconds = time.perf_counter() - start
+            if profiler is not None:
+                profiler.disable()
+                os.makedirs(self.profile_dir, exist_ok=True)
+                profiler.dump_stats(os.path.join(self.profile_dir, f"{self.script}.{self.run}.{name}.prof"))
+
+            self._checkpoint_peak()
+            self._stack.pop()
+            if self._stack:
+                parent = self._stack[-1]
+                parent['peak'] = max(parent['peak'], frame['peak'])
+                parent['counters'].update(frame['counters'])
+
+            self._write({
+                "stage": '/'.join([f['name'] for f in self._stack] + [name]),
+                "seconds": round(seconds, 6),
+                "peakMemoryBytes": frame['peak'] if self.trace_memory else None,
+                "maxRssBytes": max_rss_bytes(),
+                "counters": dict(frame['counters']),
+                "status": status,
+            })
+
+    def count(self, **counts):
+        """Add to the counters of the current stage (and the run total)"""
+        self.counters.update(counts)
+        if self._stack:
+            self._stack[-1]['counters'].update(counts)
+
+    def finish(self):
+        """Write the run total and stop memory tracing"""
+        if self._finished:
+            return
+        self._finished = True
+        self._checkpoint_peak()
+        self._write({
+            "stage": 'total',
+            "seconds": round(time.perf_counter() - self._start, 6),
+            "peakMemoryBytes": self._peak if self.trace_memory else None,
+            "maxRssBytes": max_rss_bytes(),
+            "counters": dict(self.counters),
+            "status": 'ok',
+        })
+        if self.trace_memory:
+            tracemalloc.stop()
+
+    def _checkpoint_peak(self):
+        """Fold the tracemalloc peak since the last checkpoint into the open stages"""
+        if not self.trace_memory:
+            return
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        self._peak = max(self._peak, peak)
+        if self._stack:
+            self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+
+    def _write(self, record):
+        if self.path == 'off':
+            return
+        line = {"run": self.run, "script": self.script, "time": datetime.now(timezone.utc).isoformat(timespec='seconds')}
+        line.update(record)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(line, ensure_ascii=False, separators=(',', ':')) + '\n')
+
+
+def max_rss_bytes():
+    """High-water RSS of this process so far, or None where unsupported"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def read_runs(path):
+    """{run id: [records in order]} from a metrics file"""
+    runs = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                runs.setdefault(record['run'], []).append(record)
+    return runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarise pipeline stage metrics")
+    parser.add_argument('path', nargs='?', default=os.environ.get('PIPELINE_METRICS', DEFAULT_METRICS_FILE))
+    parser.add_argument('--script', help="only runs of this script")
+    parser.add_argument('--runs', type=int, default=5, help="number of most recent runs to show")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.path):
+        print(f"❌ {args.path} not found - run a pipeline script first")
+        return
+
+    runs = [records for records in read_runs(args.path).values()
+            if not args.script or records[0]['script'] == args.script]
+    for records in runs[-args.runs:]:
+        print(f"\n=== {records[0]['script']} {records[0]['run']} ===")
+        print(f"  {'stage':<28}{'seconds':>10}{'traced':>11}{'max RSS':>11}  counters")
+        for record in records:
+            memory = ''.join(f"{value / (1024 * 1024):8.1f} MB" if value is not None else ' ' * 11
+                             for value in (record['peakMemoryBytes'], record.get('maxRssBytes')))
+            counters = ', '.join(f"{k}={v:,}" for k, v in record['counters'].items())
+            marker = '' if record['status'] == 'ok' else '  ❌'
+            print(f"  {record['stage']:<28}{record['seconds']:>9.3f}s{memory}  {counters}{marker}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""Parse Bible references and resolve them to verse text in bulk
+
+    >>> resolver = ReferenceResolver()
+    >>> resolver.resolve_many(["Gen 1:1-5", "창 1:1", "John 3:16", "Gen 1:30-2:3", "Ps 23"])
+
+Books are found with one dict lookup on a normalised name (case, spaces and
+periods ignored). The names come from every English and Korean name, the
+Korean standard abbreviations (창, 삼상, 요일, ...), the common aliases in
+book_names.ALIASES, the source abbreviations, and every unambiguous prefix
+("Gen", "1 Cor", "창세"). Numbered books also accept I/II/III and
+First/Second/Third.
+
+Reference forms:
+
+    Gen 1            whole chapter            Gen 1-3        chapters 1 to 3
+    Gen 1:1          one verse                Gen 1:1-5      verses 1 to 5
+    Gen 1:30-2:3     across chapters          창세기 1장 1-5절  Korean chapter/verse markers
+
+resolve_many() parses and resolves thousands of references in one call:
+each book is loaded once (see bibledata.py), and chapters and verses are
+found by dict lookup and bisection rather than by scanning lists. A
+reference that cannot be parsed or resolved gives an {"error": ...} entry in
+place of raising.
+
+Usage:
+    python3 references.py "Gen 1:1-5" "창 1:1" [--langs english,korean] [--file refs.txt] [--json]
+"""
+import argparse
+import json
+import re
+import sys
+import time
+from bisect import bisect_left, bisect_right
+
+import book_names
+from bibledata import Library
+
+# Canonical book order: the source abbreviations, as the tables list them
+BOOK_ORDER = list(book_names.ENGLISH)
+
+NUMBERED_PREFIXES = {
+    '1': ['i', 'first', '1st'],
+    '2': ['ii', 'second', '2nd'],
+    '3': ['iii', 'third', '3rd'],
+}
+
+# The book is matched lazily up to the last chapter number, so it may contain digits (요한1서)
+REFERENCE_RE = re.compile(r'''
+    ^(?P<book>[^:]+?)\s*
+    (?P<c1>\d+)
+    (?:\s*:\s*(?P<v1>\d+))?
+    (?:\s*[-–]\s*(?:(?P<c2>\d+)\s*:\s*)?(?P<v2>\d+))?
+    $''', re.VERBOSE)
+
+# "1장 1-5절" -> "1:1-5", "23편" -> "23"
+KOREAN_CHAPTER_RE = re.compile(r'(\d)\s*[장편]\s*(?=\d)')
+KOREAN_MARKERS_RE = re.compile(r'(\d)\s*[장편절]')
+
+
+def normalize(name):
+    """Lookup key for a book name: case, whitespace and periods ignored"""
+    return re.sub(r'[\s.]+', '', name).casefold()
+
+
+def _numbered_variants(name):
+    """'1 Samuel' -> ['1 Samuel', 'I Samuel', 'First Samuel', '1st Samuel']"""
+    number, _, rest = name.partition(' ')
+    if number not in NUMBERED_PREFIXES or not rest:
+        return [name]
+    return [name] + [f"{prefix} {rest}" for prefix in NUMBERED_PREFIXES[number]]
+
+
+def build_book_index(extra_names=None, prefixes=True):
+    """{normalised name: book index} for every way of naming a book.
+
+    extra_names is an optional list of per-book name lists (for example the
+    names used in the data files). Earlier sources win on conflicts: full
+    names, then Korean abbreviations and common aliases, then the source
+    abbreviations, then (unless prefixes=False) unambiguous prefixes.
+    """
+    lookup = {}
+
+    def add(name, book_index):
+        for variant in _numbered_variants(name):
+            lookup.setdefault(normalize(variant), book_index)
+
+    full_names = []
+    for book_index, abbreviation in enumerate(BOOK_ORDER):
+        names = [book_names.ENGLISH[abbreviation], book_names.KOREAN[abbreviation]]
+        if extra_names and book_index < len(extra_names):
+            names += extra_names[book_index]
+        full_names.append(names)
+        for name in names:
+            add(name, book_index)
+
+    for book_index, abbreviation in enumerate(BOOK_ORDER):
+        add(book_names.KOREAN_SHORT[abbreviation], book_index)
+        for alias in book_names.ALIASES.get(abbreviation, []):
+            add(alias, book_index)
+
+    for book_index, abbreviation in enumerate(BOOK_ORDER):
+        add(abbreviation, book_index)
+    if not prefixes:
+        return lookup
+
+    # Prefixes that only one book's names start with
+    owners = {}
+    for book_index, names in enumerate(full_names):
+        for name in names:
+            for variant in _numbered_variants(name):
+                key = normalize(variant)
+                for end in range(2, len(key)):
+                    owners.setdefault(key[:end], set()).add(book_index)
+    for prefix, books in owners.items():
+        if len(books) == 1:
+            lookup.setdefault(prefix, next(iter(books)))
+
+    return lookup
+
+
+def parse_reference(text, book_index_lookup):
+    """Parse a reference string into a dict, or raise ValueError.
+
+    {"bookIndex", "startChapter", "startVerse", "endChapter", "endVerse"};
+    verses are None when the range starts or ends at a chapter boundary.
+    """
+    cleaned = KOREAN_MARKERS_RE.sub(r'\1', KOREAN_CHAPTER_RE.sub(r'\1:', text.strip()))
+    match = REFERENCE_RE.match(cleaned.strip())
+    if not match:
+        raise ValueError(f"Unrecognised reference: {text}")
+
+    book_index = book_index_lookup.get(normalize(match['book']))
+    if book_index is None:
+        raise ValueError(f"Unknown book in reference: {text}")
+
+    c1 = int(match['c1'])
+    v1 = int(match['v1']) if match['v1'] else None
+    if match['v2'] is None:
+        c2, v2 = c1, v1
+    elif match['c2'] is not None:
+        c2, v2 = int(match['c2']), int(match['v2'])
+    elif v1 is None:
+        # "Gen 1-3": a range of whole chapters
+        c2, v2 = int(match['v2']), None
+    else:
+        c2, v2 = c1, int(match['v2'])
+
+    if (c2, v2 or 0) < (c1, v1 or 0):
+        raise ValueError(f"Reference range ends before it starts: {text}")
+
+    return {"bookIndex": book_index, "startChapter": c1, "startVerse": v1, "endChapter": c2, "endVerse": v2}
+
+
+def format_reference(parsed, book_name):
+    """Canonical form, e.g. 'Genesis 1:30-2:3'"""
+    c1, v1, c2, v2 = parsed['startChapter'], parsed['startVerse'], parsed['endChapter'], parsed['endVerse']
+    start = f"{c1}:{v1}" if v1 is not None else f"{c1}"
+    if (c1, v1) == (c2, v2):
+        return f"{book_name} {start}"
+    if c1 == c2 and v1 is not None and v2 is not None:
+        return f"{book_name} {start}-{v2}"
+    end = f"{c2}:{v2}" if v2 is not None else f"{c2}"
+    return f"{book_name} {start}-{end}"
+
+
+class ReferenceResolver:
+    """Resolves references against the translations in a bibledata Library"""
+
+    def __init__(self, library=None):
+        self.library = library or Library()
+        self.keys = self.library.keys
+        primary = self.library[self.keys[0]]
+        data_names = [[translation.book_names[i] for translation in self.library
+                       if i < translation.book_count] for i in range(primary.book_count)]
+        self.book_lookup = build_book_index(data_names)
+        self.book_names = primary.book_names
+        self._chapters = {}
+
+    def parse(self, text):
+        return parse_reference(text, self.book_lookup)
+
+    def _chapter(self, key, book_index, chapter_number):
+        """(verse numbers, verses) of a chapter, or None; built once per chapter"""
+        cache_key = (key, book_index)
+        chapters = self._chapters.get(cache_key)
+        if chapters is None:
+            translation = self.library[key]
+            chapters = {}
+            if book_index < translation.book_count:
+                for chapter in translation.book(book_index)['chapters']:
+                    verses = sorted(chapter['verses'], key=lambda v: v['number'])
+                    chapters[chapter['number']] = ([v['number'] for v in verses], verses)
+            self._chapters[cache_key] = chapters
+        return chapters.get(chapter_number)
+
+    def verses(self, parsed, key):
+        """[{"chapter", "number", "text"}] for a parsed reference in one translation"""
+        result = []
+        book_index = parsed['bookIndex']
+        for chapter_number in range(parsed['startChapter'], parsed['endChapter'] + 1):
+            chapter = self._chapter(key, book_index, chapter_number)
+            if chapter is None:
+                continue
+            numbers, verses = chapter
+            lo, hi = 0, len(numbers)
+            if chapter_number == parsed['startChapter'] and parsed['startVerse'] is not None:
+                lo = bisect_left(numbers, parsed['startVerse'])
+            if chapter_number == parsed['endChapter'] and parsed['endVerse'] is not None:
+                hi = bisect_right(numbers, parsed['endVerse'])
+            result.extend({"chapter": chapter_number, "number": v['number'], "text": v['text']}
+                          for v in verses[lo:hi])
+        return result
+
+    def resolve(self, text, keys=None):
+        """{"reference", "canonical", "verses": {key: [...]}} for one reference string"""
+        return self.resolve_many([text], keys)[0]
+
+    def resolve_many(self, references, keys=None):
+        """Resolve a batch of reference strings, in order.
+
+        Entries that fail get {"reference", "error"} instead of verses.
+        """
+        keys = keys or self.keys
+        results = []
+        for text in references:
+            try:
+                parsed = self.parse(text)
+            except ValueError as e:
+                results.append({"reference": text, "error": str(e)})
+                continue
+
+            verses = {key: self.verses(parsed, key) for key in keys}
+            if not any(verses.values()):
+                results.append({"reference": text, "error": f"No verses found for {text}"})
+                continue
+            results.append({
+                "reference": text,
+                "canonical": format_reference(parsed, self.book_names[parsed['bookIndex']]),
+                **parsed,
+                "verses": verses
+            })
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resolve Bible references to verse text")
+    parser.add_argument('references', nargs='*', help='e.g. "Gen 1:1-5" "창 1:1" "John 3:16"')
+    parser.add_argument('--file', help="read references from a file, one per line")
+    parser.add_argument('--langs', help="comma-separated translation keys (default: all)")
+    parser.add_argument('--json', action='store_true', help="print the results as JSON")
+    args = parser.parse_args()
+
+    references = list(args.references)
+    if args.file:
+        with open(args.file, 'r', encoding='utf-8') as f:
+            references += [line.strip() for line in f if line.strip()]
+    if not references:
+        parser.error("give references as arguments or with --file")
+
+    resolver = ReferenceResolver()
+    keys = args.langs.split(',') if args.langs else None
+    unknown = set(keys or []) - set(resolver.keys)
+    if unknown:
+        parser.error(f"Unknown translation(s): {', '.join(sorted(unknown))}")
+
+    start = time.perf_counter()
+    results = resolver.resolve_many(references, keys)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    if args.json:
+        json.dump(results, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        for result in results:
+            if 'error' in result:
+                print(f"❌ {result['error']}")
+                continue
+            print(f"\n=== {result['canonical']} ===")
+            for key, verses in result['verses'].items():
+                print(f"[{key}]")
+                for verse in verses:
+                    print(f"  {verse['chapter']}:{verse['number']} {verse['text']}")
+
+    errors = sum('error' in result for result in results)
+    print(f"\n✓ Resolved {len(results) - errors} of {len(results)} reference(s) in {elapsed_ms:.1f} ms",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,110 +1,137 @@
 #!/usr/bin/env python3
 """Repair Bible data by fetching correct data from source"""
-import json
+import os
+import sys
 
-print("Loading source files...")
+from chapter_patch import apply_patch, diff_books, print_summary, save_patch
+from pipeline_metrics import Metrics
+from stream_convert import convert_source_book, iter_json_array, write_books_json
+from translations import get_translation
+from verse_counts import CountMatrix
 
-# Load source files (thiagobodruk format)
+# Source files (thiagobodruk format), downloaded by fetch_sources.py
 # Use utf-8-sig to handle BOM (Byte Order Mark)
-with open('/tmp/ko_ko_source.json', 'r', encoding='utf-8-sig') as f:
-    korean_source = json.load(f)
-
-with open('/tmp/en_bbe_source.json', 'r', encoding='utf-8-sig') as f:
-    english_source = json.load(f)
-
-# Load current files
-with open('data/korean.json', 'r', encoding='utf-8') as f:
-    korean_current = json.load(f)
-
-with open('data/english.json', 'r', encoding='utf-8') as f:
-    english_current = json.load(f)
-
-print(f"Source Korean: {len(korean_source)} books")
-print(f"Source English: {len(english_source)} books")
-print(f"Current Korean: {len(korean_current['books'])} books")
-print(f"Current English: {len(english_current['books'])} books")
-
-# Examine structure difference
-print("\n--- Structure Analysis ---")
-print("Source format (thiagobodruk):")
-print(f"  Book: {korean_source[0].keys()}")
-print(f"  Chapters: array of verse arrays")
-print(f"  Example: {korean_source[0]['chapters'][0][:2]}")
-
-print("\nCurrent format:")
-print(f"  Book: {korean_current['books'][0].keys()}")
-print(f"  Chapter: {korean_current['books'][0]['chapters'][0].keys()}")
-print(f"  Verse: {korean_current['books'][0]['chapters'][0]['verses'][0].keys()}")
+KOREAN_SOURCE = get_translation('korean')['source']
+ENGLISH_SOURCE = get_translation('english')['source']
 
 
 def convert_source_to_current_format(source_books, is_english=False):
     """Convert thiagobodruk format to current format"""
-    books = []
-
-    for source_book in source_books:
-        # Create book structure
-        book = {
-            "name": source_book['name'],
-            "abbreviation": source_book['abbrev'].upper(),
-            "chapters": []
-        }
-
-        # Convert chapters
-        for chapter_idx, chapter_verses in enumerate(source_book['chapters']):
-            chapter = {
-                "number": chapter_idx + 1,
-                "verses": []
-            }
-
-            # Convert verses
-            for verse_idx, verse_text in enumerate(chapter_verses):
-                verse = {
-                    "number": verse_idx + 1,
-                    "text": verse_text
-                }
-                chapter["verses"].append(verse)
-
-            book["chapters"].append(chapter)
-
-        books.append(book)
-
-    return {"books": books}
-
-
-print("\n--- Converting source data to current format ---")
-english_converted = convert_source_to_current_format(english_source, is_english=True)
-korean_converted = convert_source_to_current_format(korean_source, is_english=False)
-
-print(f"Converted English: {len(english_converted['books'])} books")
-print(f"Converted Korean: {len(korean_converted['books'])} books")
-
-# Compare verse counts
-print("\n--- Checking for mismatches in converted data ---")
-mismatches_found = 0
-
-for book_idx in range(min(len(english_converted['books']), len(korean_converted['books']))):
-    eng_book = english_converted['books'][book_idx]
-    kor_book = korean_converted['books'][book_idx]
-
-    for ch_idx in range(min(len(eng_book['chapters']), len(kor_book['chapters']))):
-        eng_ch = eng_book['chapters'][ch_idx]
-        kor_ch = kor_book['chapters'][ch_idx]
-
-        eng_count = len(eng_ch['verses'])
-        kor_count = len(kor_ch['verses'])
-
-        if eng_count != kor_count:
-            print(f"{eng_book['name']} Ch{eng_ch['number']}: Eng={eng_count} Kor={kor_count}")
-            mismatches_found += 1
-
-print(f"\nTotal mismatches in converted data: {mismatches_found}")
-
-# Save the converted, corrected data
-print("\n--- Saving repaired data ---")
-with open('data/english.json', 'w', encoding='utf-8') as f:
-    json.dump(english_converted, f, ensure_ascii=False, indent=2)
-
-with open('data/korean.json', 'w', encoding='utf-8') as f:
-    json.dump(korean_converted, f, ensure_ascii=False, indent=2)
-
-print("✓ Repaired data saved to data/english.json and data/korean.json")
+    return {"books": [convert_source_book(source_book) for source_book in source_books]}
+
+
+def stream_source_to_file(source_path, output_path, compact=False):
+    """Convert a source file book by book, writing each book as it is converted.
+
+    Returns [(book name, [verse count per chapter]), ...] for the mismatch check.
+    """
+    verse_counts = []
+
+    def converted_books():
+        for source_book in iter_json_array(source_path, encoding='utf-8-sig'):
+            book = convert_source_book(source_book)
+            verse_counts.append((book['name'], [len(c['verses']) for c in book['chapters']]))
+            yield book
+
+    write_books_json(output_path, converted_books(), indent=None if compact else 2)
+    return verse_counts
+
+
+def stream_source_to_patch(key, source_path, output_path):
+    """Convert a source file and diff it against output_path chapter by chapter.
+
+    Returns (verse counts as from stream_source_to_file, patch of the chapters
+    that differ). Both files are streamed, one book at a time.
+    """
+    verse_counts = []
+
+    def converted_books():
+        for source_book in iter_json_array(source_path, encoding='utf-8-sig'):
+            book = convert_source_book(source_book)
+            verse_counts.append((book['name'], [len(c['verses']) for c in book['chapters']]))
+            yield book
+
+    patch = diff_books(key, iter_json_array(output_path), converted_books())
+    return verse_counts, patch
+
+
+def convert_with_metrics(metrics, key, source_path, output_path, compact):
+    if os.path.exists(output_path):
+        counts, patch = stream_source_to_patch(key, source_path, output_path)
+        if patch['chapters']:
+            patch_file = save_patch(patch)
+            print(f"  {key}: patch saved to {patch_file}")
+            try:
+                # Streams output_path a second time, rewriting it with the patched chapters
+                summary = apply_patch(patch, output_path, indent=None if compact else 2)
+            except ValueError as e:
+                print(f"❌ {e}")
+                print(f"   The patch is kept: python3 chapter_patch.py apply {patch_file}")
+                sys.exit(1)
+            print_summary(patch, summary)
+            metrics.count(chaptersPatched=len(patch['chapters']), bytesWritten=summary['bytesWritten'])
+        else:
+            print(f"  ✓ {key}: already matches the source")
+    else:
+        counts = stream_source_to_file(source_path, output_path, compact)
+        metrics.count(bytesWritten=os.path.getsize(output_path))
+
+    metrics.count(books=len(counts),
+                  chapters=sum(len(chapters) for _, chapters in counts),
+                  verses=sum(sum(chapters) for _, chapters in counts))
+    return counts
+
+
+def main():
+    compact = '--compact' in sys.argv
+    for source in (KOREAN_SOURCE, ENGLISH_SOURCE):
+        if not os.path.exists(source):
+            print(f"❌ {source} not found; download the sources with: python3 fetch_sources.py")
+            sys.exit(1)
+    metrics = Metrics('repair_bible_data')
+
+    # Examine structure difference using only the first book of each file
+    print("--- Structure Analysis ---")
+    with metrics.stage('inspect'):
+        source_book = next(iter_json_array(KOREAN_SOURCE, encoding='utf-8-sig'))
+        current_book = next(iter_json_array('data/korean.json'))
+    print("Source format (thiagobodruk):")
+    print(f"  Book: {source_book.keys()}")
+    print(f"  Chapters: array of verse arrays")
+    print(f"  Example: {source_book['chapters'][0][:2]}")
+
+    print("\nCurrent format:")
+    print(f"  Book: {current_book.keys()}")
+    print(f"  Chapter: {current_book['chapters'][0].keys()}")
+    print(f"  Verse: {current_book['chapters'][0]['verses'][0].keys()}")
+    del source_book, current_book
+
+    # Convert one book at a time; existing files only get the chapters that changed
+    print("\n--- Converting source data to current format ---")
+    with metrics.stage('convert'):
+        with metrics.stage('english'):
+            english_counts = convert_with_metrics(metrics, 'english', ENGLISH_SOURCE, 'data/english.json', compact)
+        with metrics.stage('korean'):
+            korean_counts = convert_with_metrics(metrics, 'korean', KOREAN_SOURCE, 'data/korean.json', compact)
+
+    print(f"Converted English: {len(english_counts)} books")
+    print(f"Converted Korean: {len(korean_counts)} books")
+
+    # Compare verse counts
+    print("\n--- Checking for mismatches in converted data ---")
+    with metrics.stage('compare'):
+        matrix = CountMatrix.from_counts({'english': english_counts, 'korean': korean_counts})
+        mismatches = matrix.mismatches('english', 'korean', require_both=True)
+        metrics.count(mismatches=len(mismatches))
+
+    for book_idx, ch_idx, eng_count, kor_count in mismatches:
+        print(f"{english_counts[book_idx][0]} Ch{ch_idx + 1}: Eng={eng_count} Kor={kor_count}")
+    mismatches_found = len(mismatches)
+
+    print(f"\nTotal mismatches in converted data: {mismatches_found}")
+    print("✓ Repaired data saved to data/english.json and data/korean.json")
+    metrics.finish()
+
+
+if __name__ == "__main__":
+    main()
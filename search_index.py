@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+"""Full-text search index for every translation, built after conversion
+
+Each translation gets a positional inverted index, split into shards so a
+client only fetches the shards its query terms hash to:
+
+    data/search/<translation>/meta.json         counts, book names, shard count
+    data/search/<translation>/docs.json         verse reference and length per document
+    data/search/<translation>/shards/<n>.json   {term: postings}
+
+Documents are verses, numbered in Bible order. English (and any non-Hangul
+text) is indexed as lowercase words; Hangul runs are indexed as character
+bigrams, since 개역 spacing is no use for search ("하나님의" -> 하나, 나님, 님의).
+Each syllable of a longer Hangul word is indexed as well, at the position of
+the bigram it starts (or, for the last syllable, ends), so a one-syllable
+query such as 빛 finds 빛이, 빛을 and 햇빛.
+
+Postings for a term are three delta-encoded integer lists, so document ids
+can be decoded without touching positions:
+
+    [[doc gap, ...], [term frequency, ...], [position gap, ...]]
+
+Position gaps restart at every document; a document's positions are the
+next <term frequency> gaps.
+
+Queries match verses containing every term and are ranked with BM25. The
+bigrams of each Hangul word in a query must be adjacent, as must the words
+of a quoted English query ("the light").
+
+Usage:
+    python3 search_index.py build [--out data/search] [--shards 64]
+    python3 search_index.py query <translation> "search words" [--limit 10]
+    python3 search_index.py benchmark [--translations 6] [--queries 200]
+"""
+import argparse
+import heapq
+import json
+import math
+import os
+import random
+import re
+import statistics
+import tempfile
+import time
+import zlib
+from collections import defaultdict
+from itertools import accumulate
+
+from translations import load_translations, translation_files
+
+DEFAULT_INDEX_DIR = 'data/search'
+DEFAULT_SHARD_COUNT = 64
+INDEX_VERSION = 2
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN_RE = re.compile(r"[가-힣]+|[^\W_가-힣]+(?:'[^\W_가-힣]+)*")
+
+
+def _is_hangul(token):
+    return '가' <= token[0] <= '힣'
+
+
+def _token_terms(token):
+    if not _is_hangul(token) or len(token) == 1:
+        return [token]
+    return [token[i:i + 2] for i in range(len(token) - 1)]
+
+
+def words(text):
+    """Casefolded words of a text, in order (a Hangul word keeps its particles)"""
+    return _TOKEN_RE.findall(text.casefold())
+
+
+def tokenize(text):
+    """Index terms of a text, in order (a term's position is its list index)"""
+    terms = []
+    for token in words(text):
+        terms.extend(_token_terms(token))
+    return terms
+
+
+def syllable_terms(text):
+    """(position, syllable) for each syllable of the Hangul words tokenize() splits into bigrams"""
+    position = 0
+    for token in words(text):
+        if _is_hangul(token) and len(token) > 1:
+            last = len(token) - 2
+            for i, syllable in enumerate(token):
+                yield position + min(i, last), syllable
+            position += len(token) - 1
+        else:
+            position += 1
+
+
+def query_phrases(query):
+    """Groups of query terms that must appear at consecutive positions"""
+    quoted = len(query) > 1 and query[0] == query[-1] == '"'
+    phrases = []
+    words = []
+    for token in _TOKEN_RE.findall(query.casefold()):
+        if _is_hangul(token):
+            phrases.append(_token_terms(token))
+        elif quoted:
+            words.append(token)
+        else:
+            phrases.append([token])
+    if words:
+        phrases.append(words)
+    return phrases
+
+
+def shard_of(term, shard_count):
+    return zlib.crc32(term.encode('utf-8')) % shard_count
+
+
+def iter_verses(translation):
+    """(book index, chapter number, verse number, text) in Bible order"""
+    for book_index, book in enumerate(translation['books']):
+        for chapter in book['chapters']:
+            for verse in chapter['verses']:
+                yield book_index, chapter['number'], verse['number'], verse['text']
+
+
+def encode_postings(postings):
+    """[(doc id, [positions])] in doc order -> [doc gaps, frequencies, position gaps]"""
+    doc_gaps = []
+    frequencies = []
+    position_gaps = []
+    last_doc = 0
+    for doc_id, positions in postings:
+        doc_gaps.append(doc_id - last_doc)
+        frequencies.append(len(positions))
+        last_position = 0
+        for position in positions:
+            position_gaps.append(position - last_position)
+            last_position = position
+        last_doc = doc_id
+    return [doc_gaps, frequencies, position_gaps]
+
+
+class Postings:
+    """Decoded postings of one term; positions are decoded per document on demand"""
+
+    def __init__(self, encoded):
+        doc_gaps, self.frequencies, self._position_gaps = encoded
+        self.doc_ids = list(accumulate(doc_gaps))
+        self._slot = dict(zip(self.doc_ids, range(len(self.doc_ids))))
+        self._position_start = [0, *accumulate(self.frequencies)]
+        self._position_keys = None
+
+    def __len__(self):
+        return len(self.doc_ids)
+
+    def frequency(self, doc_id):
+        return self.frequencies[self._slot[doc_id]]
+
+    def positions(self, doc_id):
+        slot = self._slot[doc_id]
+        gaps = self._position_gaps[self._position_start[slot]:self._position_start[slot + 1]]
+        return list(accumulate(gaps))
+
+    def position_keys(self):
+        """Every occurrence as doc_id << POSITION_BITS | position (decoded once)"""
+        if self._position_keys is None:
+            keys = []
+            starts = self._position_start
+            for slot, doc_id in enumerate(self.doc_ids):
+                base = doc_id << POSITION_BITS
+                keys.extend(base + position for position in
+                            accumulate(self._position_gaps[starts[slot]:starts[slot + 1]]))
+            self._position_keys = keys
+        return self._position_keys
+
+
+EMPTY_POSTINGS = Postings([[], [], []])
+
+# Verses are far shorter than 2**16 terms
+POSITION_BITS = 16
+
+
+def build_index(translation, output_dir, shard_count=DEFAULT_SHARD_COUNT):
+    """Write the index for one translation; returns (documents, terms)"""
+    postings = defaultdict(list)
+    refs = []
+    lengths = []
+
+    for doc_id, (book_index, chapter, verse, text) in enumerate(iter_verses(translation)):
+        terms = tokenize(text)
+        positions = defaultdict(list)
+        for position, term in enumerate(terms):
+            positions[term].append(position)
+        syllables = set()
+        for position, syllable in syllable_terms(text):
+            positions[syllable].append(position)
+            syllables.add(syllable)
+        # A syllable that is also a one-syllable word gets positions from both
+        for syllable in syllables:
+            positions[syllable].sort()
+        for term, term_positions in positions.items():
+            postings[term].append((doc_id, term_positions))
+        refs.extend((book_index, chapter, verse))
+        lengths.append(len(terms))
+
+    shards = [{} for _ in range(shard_count)]
+    for term, term_postings in postings.items():
+        shards[shard_of(term, shard_count)][term] = encode_postings(term_postings)
+
+    shard_dir = os.path.join(output_dir, 'shards')
+    os.makedirs(shard_dir, exist_ok=True)
+    for n, shard in enumerate(shards):
+        with open(os.path.join(shard_dir, f'{n}.json'), 'w', encoding='utf-8') as f:
+            json.dump(shard, f, ensure_ascii=False, separators=(',', ':'))
+
+    with open(os.path.join(output_dir, 'docs.json'), 'w', encoding='utf-8') as f:
+        json.dump({"refs": refs, "lengths": lengths}, f, separators=(',', ':'))
+
+    meta = {
+        "version": INDEX_VERSION,
+        "shardCount": shard_count,
+        "docCount": len(lengths),
+        "termCount": len(postings),
+        "averageLength": sum(lengths) / len(lengths) if lengths else 0,
+        "books": [book['name'] for book in translation['books']],
+    }
+    with open(os.path.join(output_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+
+    return len(lengths), len(postings)
+
+
+class SearchIndex:
+    """Query API over one translation's index; shards are loaded on first use"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, 'meta.json'), 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        if self.meta['version'] != INDEX_VERSION:
+            raise ValueError(f"{directory} is not a version {INDEX_VERSION} search index")
+        self._shards = {}
+        self._postings = {}
+        self._refs = None
+        self._length_norm = None
+
+    def _load_docs(self):
+        with open(os.path.join(self.directory, 'docs.json'), 'r', encoding='utf-8') as f:
+            docs = json.load(f)
+        self._refs = docs['refs']
+        # BM25 length normalisation per document, computed once
+        average_length = self.meta['averageLength'] or 1
+        self._length_norm = [BM25_K1 * (1 - BM25_B + BM25_B * length / average_length)
+                             for length in docs['lengths']]
+
+    def _shard(self, n):
+        if n not in self._shards:
+            with open(os.path.join(self.directory, 'shards', f'{n}.json'), 'r', encoding='utf-8') as f:
+                self._shards[n] = json.load(f)
+        return self._shards[n]
+
+    def postings(self, term):
+        """Postings of one term (decoded once, then cached)"""
+        if term not in self._postings:
+            encoded = self._shard(shard_of(term, self.meta['shardCount'])).get(term)
+            self._postings[term] = Postings(encoded) if encoded else EMPTY_POSTINGS
+        return self._postings[term]
+
+    def reference(self, doc_id):
+        """(book index, chapter, verse) of a document"""
+        if self._refs is None:
+            self._load_docs()
+        return tuple(self._refs[3 * doc_id:3 * doc_id + 3])
+
+    def search(self, query, limit=10):
+        """Ranked hits: [{"bookIndex", "book", "chapter", "verse", "score"}]"""
+        phrases = query_phrases(query)
+        terms = [term for phrase in phrases for term in phrase]
+        if not terms:
+            return []
+
+        # Smallest posting lists first, so the intersection shrinks quickly
+        term_postings = {term: self.postings(term) for term in set(terms)}
+        ordered = sorted(term_postings.values(), key=len)
+        candidates = set(ordered[0].doc_ids)
+        for postings in ordered[1:]:
+            candidates.intersection_update(postings.doc_ids)
+            if not candidates:
+                return []
+
+        for phrase in phrases:
+            if len(phrase) > 1:
+                candidates &= self._phrase_docs(phrase, term_postings)
+
+        if self._length_norm is None:
+            self._load_docs()
+        length_norm = self._length_norm
+        doc_count = self.meta['docCount']
+
+        # BM25, accumulated one posting list at a time
+        scores = dict.fromkeys(candidates, 0.0)
+        for postings in term_postings.values():
+            idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            weight = idf * (BM25_K1 + 1)
+            if len(scores) < len(postings):
+                for doc_id in scores:
+                    frequency = postings.frequency(doc_id)
+                    scores[doc_id] += weight * frequency / (frequency + length_norm[doc_id])
+            else:
+                for doc_id, frequency in zip(postings.doc_ids, postings.frequencies):
+                    if doc_id in scores:
+                        scores[doc_id] += weight * frequency / (frequency + length_norm[doc_id])
+
+        hits = []
+        best = heapq.nsmallest(limit, scores.items(), key=lambda hit: (-hit[1], hit[0]))
+        for doc_id, score in best:
+            book_index, chapter, verse = self.reference(doc_id)
+            hits.append({
+                "bookIndex": book_index,
+                "book": self.meta['books'][book_index],
+                "chapter": chapter,
+                "verse": verse,
+                "score": round(score, 4)
+            })
+        return hits
+
+    @staticmethod
+    def _phrase_docs(phrase, term_postings):
+        """Documents where the phrase's terms occur at consecutive positions"""
+        starts = set(term_postings[phrase[0]].position_keys())
+        for offset, term in enumerate(phrase[1:], 1):
+            starts.intersection_update(key - offset for key in term_postings[term].position_keys())
+            if not starts:
+                break
+        return {key >> POSITION_BITS for key in starts}
+
+
+def build_all(output_dir, shard_count, files=None):
+    files = files or translation_files()
+    data = load_translations(files)
+    results = {}
+    for key, _ in files:
+        start = time.perf_counter()
+        docs, terms = build_index(data[key], os.path.join(output_dir, key), shard_count)
+        results[key] = (docs, terms, time.perf_counter() - start)
+    return results
+
+
+def _sample_queries(translation, count, rng):
+    """Queries of 1-3 consecutive words taken from random verses"""
+    verses = [text for _, _, _, text in iter_verses(translation)]
+    queries = []
+    while len(queries) < count:
+        words = rng.choice(verses).rstrip('.').split()
+        length = min(len(words), rng.randint(1, 3))
+        start = rng.randrange(len(words) - length + 1)
+        queries.append(' '.join(words[start:start + length]))
+    return queries
+
+
+def run_benchmark(translation_count, query_count, shard_count):
+    """Build indexes for a synthetic corpus and time queries against them"""
+    from synthetic_corpus import make_corpus
+
+    print(f"Generating {translation_count} synthetic translation(s)...")
+    corpus = make_corpus(translation_count)
+    rng = random.Random(0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        for key, translation in corpus.items():
+            build_index(translation, os.path.join(tmp, key), shard_count)
+        build_seconds = time.perf_counter() - start
+        verse_count = sum(1 for t in corpus.values() for _ in iter_verses(t))
+        print(f"✓ Indexed {verse_count} verses in {build_seconds:.2f}s")
+
+        print(f"\n{'Translation':<12} {'Cold p50':>9} {'Warm p50':>9} {'Warm p95':>9} {'Max':>9}  (ms)")
+        all_warm = []
+        for key, translation in corpus.items():
+            queries = _sample_queries(translation, query_count, rng)
+            index = SearchIndex(os.path.join(tmp, key))
+            cold = []
+            for query in queries:
+                start = time.perf_counter()
+                index.search(query)
+                cold.append((time.perf_counter() - start) * 1000)
+            warm = []
+            for query in queries:
+                start = time.perf_counter()
+                index.search(query)
+                warm.append((time.perf_counter() - start) * 1000)
+            all_warm.extend(warm)
+            p95 = statistics.quantiles(warm, n=20)[-1]
+            print(f"{key:<12} {statistics.median(cold):>9.2f} {statistics.median(warm):>9.2f} "
+                  f"{p95:>9.2f} {max(warm):>9.2f}")
+
+    print(f"\nAll translations: warm p50 {statistics.median(all_warm):.2f} ms, "
+          f"p95 {statistics.quantiles(all_warm, n=20)[-1]:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query the full-text search index")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help="index every registered translation")
+    build.add_argument('--out', default=DEFAULT_INDEX_DIR)
+    build.add_argument('--shards', type=int, default=DEFAULT_SHARD_COUNT)
+
+    query = commands.add_parser('query', help="search one translation")
+    query.add_argument('translation')
+    query.add_argument('text')
+    query.add_argument('--limit', type=int, default=10)
+    query.add_argument('--index', default=DEFAULT_INDEX_DIR)
+
+    benchmark = commands.add_parser('benchmark', help="time indexing and queries on a synthetic corpus")
+    benchmark.add_argument('--translations', type=int, default=6)
+    benchmark.add_argument('--queries', type=int, default=200)
+    benchmark.add_argument('--shards', type=int, default=DEFAULT_SHARD_COUNT)
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        for key, (docs, terms, seconds) in build_all(args.out, args.shards).items():
+            print(f"✓ {key}: {docs} verses, {terms} terms in {seconds:.2f}s")
+        print(f"✓ Search index written to {args.out}")
+    elif args.command == 'query':
+        index = SearchIndex(os.path.join(args.index, args.translation))
+        start = time.perf_counter()
+        hits = index.search(args.text, args.limit)
+        elapsed = (time.perf_counter() - start) * 1000
+        for hit in hits:
+            print(f"{hit['book']} {hit['chapter']}:{hit['verse']}  ({hit['score']})")
+        print(f"\n{len(hits)} result(s) in {elapsed:.1f} ms")
+    else:
+        run_benchmark(args.translations, args.queries, args.shards)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""Static file server for the Bible website
+
+A drop-in replacement for `python3 -m http.server` that is fit for serving
+the multi-megabyte data files:
+
+- one thread per connection, with HTTP/1.1 keep-alive
+- ETag and Last-Modified validators, answering conditional requests with 304
+- precompressed `<file>.gz` served with Content-Encoding: gzip when the client
+  accepts it (nothing is compressed on the fly)
+- single byte ranges (206 / 416)
+- `Cache-Control: immutable` for content-hashed names such as app.3f2a9c1d.js,
+  and `no-cache` (always revalidate) for everything else
+
+With --api it also serves the aligned chapter API from chapter_api.py
+(/api/chapter/<book>/<chapter>?langs=en,ko and /api/stats).
+
+Usage:
+    python3 serve.py [--port 8000] [--bind 0.0.0.0] [--directory .] [--api]
+"""
+import argparse
+import email.utils
+import os
+import re
+from functools import partial
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+# name.<hash>.ext, as written by a content-hashing build
+HASHED_NAME_RE = re.compile(r'\.[0-9a-f]{8,}\.[A-Za-z0-9]+$')
+
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE = 'no-cache'
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class BibleRequestHandler(SimpleHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'BibleServer/1.0'
+    # Headers and body go out in separate writes; don't let Nagle hold the body back
+    disable_nagle_algorithm = True
+
+    extensions_map = {
+        **SimpleHTTPRequestHandler.extensions_map,
+        '.json': 'application/json; charset=utf-8',
+        '.js': 'text/javascript; charset=utf-8',
+        '.css': 'text/css; charset=utf-8',
+        '.html': 'text/html; charset=utf-8',
+    }
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def _resolve(self):
+        """Filesystem path for the request, following directory index rules"""
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            if not self.path.split('?', 1)[0].endswith('/'):
+                return path, 'redirect'
+            path = os.path.join(path, 'index.html')
+        return path, None
+
+    def _serve(self, send_body):
+        if self.path.startswith('/api/') and self.server.chapter_api is not None:
+            self._serve_api(send_body)
+            return
+
+        path, action = self._resolve()
+        if action == 'redirect':
+            location = self.path.split('?', 1)
+            location[0] += '/'
+            self.send_response(HTTPStatus.MOVED_PERMANENTLY)
+            self.send_header('Location', '?'.join(location))
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        if not os.path.isfile(path):
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return
+
+        content_type = self.guess_type(path)
+        range_header = self.headers.get('Range')
+
+        # Use the precompressed file when allowed (ranges always address the identity bytes)
+        encoding = None
+        gz_path = path + '.gz'
+        # Responses for a file with a .gz beside it depend on Accept-Encoding, 304s included
+        vary = os.path.isfile(gz_path)
+        if (range_header is None and vary
+                and self._accepts_gzip(self.headers.get('Accept-Encoding', ''))
+                and os.stat(gz_path).st_mtime_ns >= os.stat(path).st_mtime_ns):
+            path, encoding = gz_path, 'gzip'
+
+        try:
+            f = open(path, 'rb')
+        except OSError:
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return
+
+        with f:
+            stat = os.fstat(f.fileno())
+            etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}{"-gz" if encoding else ""}"'
+            last_modified = email.utils.formatdate(stat.st_mtime, usegmt=True)
+
+            if self._not_modified(etag, stat.st_mtime):
+                self.send_response(HTTPStatus.NOT_MODIFIED)
+                if vary:
+                    self.send_header('Vary', 'Accept-Encoding')
+                self._send_cache_headers(path, etag, last_modified)
+                self.end_headers()
+                return
+
+            start, end = 0, stat.st_size - 1
+            status = HTTPStatus.OK
+            if range_header is not None and self._range_applies(etag, stat.st_mtime):
+                byte_range = self._parse_range(range_header, stat.st_size)
+                if byte_range is None:
+                    self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                    self.send_header('Content-Range', f'bytes */{stat.st_size}')
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                if byte_range is not False:
+                    start, end = byte_range
+                    status = HTTPStatus.PARTIAL_CONTENT
+
+            length = max(0, end - start + 1)
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(length))
+            self.send_header('Accept-Ranges', 'bytes')
+            if status == HTTPStatus.PARTIAL_CONTENT:
+                self.send_header('Content-Range', f'bytes {start}-{end}/{stat.st_size}')
+            if encoding:
+                self.send_header('Content-Encoding', encoding)
+            if vary:
+                self.send_header('Vary', 'Accept-Encoding')
+            self._send_cache_headers(path, etag, last_modified)
+            self.end_headers()
+
+            if send_body and length:
+                self._send_file(f, start, length)
+
+    def _serve_api(self, send_body):
+        path, _, query = self.path.partition('?')
+        status, body, etag = self.server.chapter_api.handle(path, query)
+
+        if etag is not None and etag in [t.strip() for t in self.headers.get('If-None-Match', '').split(',')]:
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', REVALIDATE_CACHE)
+        if etag is not None:
+            self.send_header('ETag', etag)
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def _send_cache_headers(self, path, etag, last_modified):
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', last_modified)
+        name = os.path.basename(path[:-3] if path.endswith('.gz') else path)
+        self.send_header('Cache-Control', IMMUTABLE_CACHE if HASHED_NAME_RE.search(name) else REVALIDATE_CACHE)
+
+    def _not_modified(self, etag, mtime):
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            tags = [tag.strip() for tag in if_none_match.split(',')]
+            return '*' in tags or etag in tags or f'W/{etag}' in tags
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since:
+            try:
+                since = email.utils.parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError, IndexError, OverflowError):
+                return False
+            return int(mtime) <= since
+        return False
+
+    def _range_applies(self, etag, mtime):
+        """If-Range: only honour the range if the representation is unchanged"""
+        if_range = self.headers.get('If-Range')
+        if if_range is None:
+            return True
+        if if_range.startswith('"') or if_range.startswith('W/'):
+            return if_range == etag
+        try:
+            return int(mtime) <= email.utils.parsedate_to_datetime(if_range).timestamp()
+        except (TypeError, ValueError, IndexError, OverflowError):
+            return False
+
+    @staticmethod
+    def _accepts_gzip(header):
+        """Whether an Accept-Encoding header allows gzip: listed (or matched by *)
+        with a q-value above 0, so "gzip;q=0" refuses it"""
+        qualities = {}
+        for item in header.split(','):
+            coding, *params = [part.strip() for part in item.split(';')]
+            quality = 1.0
+            for param in params:
+                name, _, value = param.partition('=')
+                if name.strip().lower() == 'q':
+                    try:
+                        quality = float(value)
+                    except ValueError:
+                        quality = 0.0
+            if coding:
+                qualities[coding.lower()] = quality
+        for coding in ('gzip', 'x-gzip', '*'):
+            if coding in qualities:
+                return qualities[coding] > 0
+        return False
+
+    @staticmethod
+    def _parse_range(header, size):
+        """(start, end) for a single satisfiable range, None if unsatisfiable,
+        False if the header is not a single byte range (serve the whole file)"""
+        match = RANGE_RE.match(header.strip())
+        if not match or match.groups() == ('', ''):
+            return False
+        first, last = match.groups()
+        if first == '':
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length == 0:
+                return None
+            return max(0, size - length), size - 1
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if start >= size or end < start:
+            return None
+        return start, end
+
+    def _send_file(self, f, start, length):
+        self.wfile.flush()
+        try:
+            # Zero-copy where the platform supports it
+            self.connection.sendfile(f, start, length)
+        except (AttributeError, OSError):
+            f.seek(start)
+            remaining = length
+            while remaining:
+                chunk = f.read(min(remaining, 1 << 16))
+                if not chunk:
+                    break
+                self.wfile.write(chunk)
+                remaining -= len(chunk)
+
+
+class BibleServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+    chapter_api = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the Bible website")
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--bind', default='', help="address to bind (default: all interfaces)")
+    parser.add_argument('--directory', default=os.getcwd(), help="directory to serve")
+    parser.add_argument('--api', action='store_true', help="serve the aligned chapter API under /api/")
+    parser.add_argument('--api-cache-size', type=int, default=256, help="chapter responses kept in memory")
+    args = parser.parse_args()
+
+    directory = os.path.abspath(args.directory)
+    handler = partial(BibleRequestHandler, directory=directory)
+    with BibleServer((args.bind, args.port), handler) as httpd:
+        if args.api:
+            from chapter_api import ChapterAPI
+
+            print("Loading translations for the chapter API...")
+            httpd.chapter_api = ChapterAPI(cache_size=args.api_cache_size, root=directory)
+
+        host = args.bind or 'localhost'
+        print(f"Serving {directory} on http://{host}:{args.port}")
+        try:
+            httpd.serve_forever()
+        except KeyboardInterrupt:
+            print("\nServer stopped")
+
+
+if __name__ == "__main__":
+    main()
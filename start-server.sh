@@ -6,9 +6,9 @@ echo "Open your browser to: http://localhost:8000"
 echo "Press Ctrl+C to stop the server"
 echo ""
 
-# Try Python 3 first, then Python 2
+# Try Python 3 first (with the bundled server), then Python 2
 if command -v python3 &> /dev/null; then
-    python3 -m http.server 8000
+    python3 "$(dirname "$0")/serve.py" --port 8000 --directory "$(dirname "$0")"
 elif command -v python &> /dev/null; then
     python -m SimpleHTTPServer 8000
 else
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""Streaming conversion of thiagobodruk-format sources to the app's JSON format
+
+The source files (en_bbe.json, ko_ko.json, ...) are one big JSON array of
+books. Instead of json.load-ing the whole array and building a second full
+copy, the source is decoded one book at a time and each converted book is
+written out before the next is read, so peak memory is about one book.
+
+Usage:
+    python3 stream_convert.py source.json output.json [--compact]
+"""
+import argparse
+import json
+import os
+import textwrap
+
+CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = ' \t\r\n'
+
+
+def iter_json_array(path, encoding='utf-8', chunk_size=CHUNK_SIZE):
+    """Yield the items of the first JSON array in a file, one at a time.
+
+    Works for both a top-level array (thiagobodruk sources) and the
+    {"books": [...]} files, as long as "books" is the first key.
+    """
+    decoder = json.JSONDecoder()
+
+    with open(path, 'r', encoding=encoding) as f:
+        buffer = ''
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                raise ValueError(f"No JSON array found in {path}")
+            buffer += chunk
+            start = buffer.find('[')
+            if start >= 0:
+                break
+
+        pos = start + 1
+        read_size = chunk_size
+        while True:
+            # Skip separators between items
+            while pos < len(buffer) and (buffer[pos] in _WHITESPACE or buffer[pos] == ','):
+                pos += 1
+
+            if pos < len(buffer) and buffer[pos] == ']':
+                return
+
+            # An item is only complete once something follows it (',' or ']')
+            item = None
+            if pos < len(buffer):
+                try:
+                    item, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    item = None
+                else:
+                    if end >= len(buffer):
+                        item = None
+
+            if item is None:
+                chunk = f.read(read_size)
+                if not chunk:
+                    raise ValueError(f"Unexpected end of JSON array in {path}")
+                buffer = buffer[pos:] + chunk
+                pos = 0
+                # Grow reads geometrically so a large book is not re-parsed many times
+                read_size = max(read_size, len(buffer))
+                continue
+
+            yield item
+            pos = end
+            read_size = chunk_size
+            if pos > chunk_size:
+                buffer = buffer[pos:]
+                pos = 0
+
+
+def convert_source_book(source_book, book_names=None):
+    """Convert one thiagobodruk book to the app's book format.
+
+    book_names maps the source abbreviation to a display name; without it
+    the source book's own name is used.
+    """
+    abbr = source_book['abbrev']
+    if book_names is not None:
+        name = book_names.get(abbr, abbr.upper())
+    else:
+        name = source_book['name']
+
+    chapters = []
+    for i, chapter_verses in enumerate(source_book['chapters'], 1):
+        verses = [{"number": j, "text": text} for j, text in enumerate(chapter_verses, 1)]
+        chapters.append({"number": i, "verses": verses})
+
+    return {"name": name, "abbreviation": abbr.upper(), "chapters": chapters}
+
+
+def write_books_json(path, books, indent=None):
+    """Write {"books": [...]} incrementally from an iterable of books.
+
+    With indent the output is byte-for-byte what json.dump(..., indent=indent)
+    produces; with indent=None it is compact. The file is written to a
+    temporary name and renamed into place, so the existing file is untouched
+    if `books` raises. Returns the number of books.
+    """
+    tmp_path = path + '.tmp'
+    count = 0
+
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            if indent is None:
+                f.write('{"books":[')
+                for book in books:
+                    if count:
+                        f.write(',')
+                    f.write(json.dumps(book, ensure_ascii=False, separators=(',', ':')))
+                    count += 1
+                f.write(']}')
+            else:
+                pad = ' ' * indent
+                f.write('{\n' + pad + '"books": [')
+                for book in books:
+                    f.write(',\n' if count else '\n')
+                    f.write(textwrap.indent(json.dumps(book, ensure_ascii=False, indent=indent), pad * 2))
+                    count += 1
+                f.write(('\n' + pad + ']' if count else ']') + '\n}')
+    except BaseException:
+        # The books iterable failed part way; leave the existing file alone
+        os.remove(tmp_path)
+        raise
+
+    os.replace(tmp_path, path)
+    return count
+
+
+def convert_file(source_path, output_path, book_names=None, compact=False, encoding='utf-8-sig'):
+    """Stream-convert one source file; returns the number of books written"""
+    books = (convert_source_book(b, book_names) for b in iter_json_array(source_path, encoding))
+    return write_books_json(output_path, books, indent=None if compact else 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert a thiagobodruk-format source to the app's JSON format")
+    parser.add_argument('source')
+    parser.add_argument('output')
+    parser.add_argument('--compact', action='store_true', help="write without indentation")
+    parser.add_argument('--encoding', default='utf-8-sig', help="source file encoding")
+    args = parser.parse_args()
+
+    count = convert_file(args.source, args.output, compact=args.compact, encoding=args.encoding)
+    print(f"Converted {count} books from {args.source} to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Synthetic translations in the app's {"books": [...]} format, for benchmarks
+
+The corpora have real-Bible proportions (66 books, ~1,190 chapters, ~31,000
+verses) and Zipf-distributed vocabularies, so indexing and lookup costs are
+representative without needing the real data files. Everything is seeded
+and reproducible.
+"""
+import random
+from itertools import accumulate
+
+import book_names
+
+# Chapter counts of the 66 books, in order
+CHAPTER_COUNTS = [
+    50, 40, 27, 36, 34, 24, 21, 4, 31, 24, 22, 25, 29, 36, 10, 13, 10, 42, 150, 31, 12, 8,
+    66, 52, 5, 48, 12, 14, 3, 9, 1, 4, 7, 3, 3, 3, 2, 14, 4,
+    28, 16, 24, 21, 28, 16, 16, 13, 6, 6, 4, 4, 5, 3, 6, 4, 3, 1, 13, 5, 5, 3, 5, 1, 1, 1, 22,
+]
+
+ENGLISH_COMMON = (
+    "the and of to that in he shall unto for i his a lord they be is him not them it with "
+    "all thou thy was god which my me said but ye their have will thee from as are when this "
+    "out were upon man by you israel king up there hath then people came had house into on "
+    "her come one we children s before your also day land men let go say made"
+).split()
+
+HANGUL_FIRST = 0xAC00
+HANGUL_COUNT = 11172
+
+
+def _zipf_sampler(rng, vocabulary, exponent=1.1):
+    cum_weights = list(accumulate(1 / (rank ** exponent) for rank in range(1, len(vocabulary) + 1)))
+    return lambda k: rng.choices(vocabulary, cum_weights=cum_weights, k=k)
+
+
+def _english_vocabulary(rng, size):
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    words = list(ENGLISH_COMMON)
+    seen = set(words)
+    while len(words) < size:
+        word = ''.join(rng.choice(letters) for _ in range(rng.randint(3, 10)))
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    return words
+
+
+def _korean_vocabulary(rng, size):
+    words = []
+    seen = set()
+    while len(words) < size:
+        word = ''.join(chr(HANGUL_FIRST + rng.randrange(HANGUL_COUNT)) for _ in range(rng.randint(1, 4)))
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    return words
+
+
+def make_translation(seed=0, language='english', verses_per_chapter=(10, 40), vocabulary_size=8000):
+    """One synthetic translation; language is 'english' or 'korean'"""
+    rng = random.Random(seed)
+    if language == 'korean':
+        sample = _zipf_sampler(rng, _korean_vocabulary(rng, vocabulary_size))
+        names = list(book_names.KOREAN.values())
+        words_per_verse = (6, 18)
+    else:
+        sample = _zipf_sampler(rng, _english_vocabulary(rng, vocabulary_size))
+        names = list(book_names.ENGLISH.values())
+        words_per_verse = (10, 35)
+
+    abbreviations = [abbr.upper() for abbr in book_names.ENGLISH]
+    books = []
+    for name, abbr, chapter_count in zip(names, abbreviations, CHAPTER_COUNTS):
+        chapters = []
+        for chapter_number in range(1, chapter_count + 1):
+            verses = []
+            for verse_number in range(1, rng.randint(*verses_per_chapter) + 1):
+                text = ' '.join(sample(rng.randint(*words_per_verse)))
+                verses.append({"number": verse_number, "text": text[0].upper() + text[1:] + '.'})
+            chapters.append({"number": chapter_number, "verses": verses})
+        books.append({"name": name, "abbreviation": abbr, "chapters": chapters})
+
+    return {"books": books}
+
+
+def make_corpus(translation_count, seed=0):
+    """{key: translation} alternating English- and Korean-like translations"""
+    corpus = {}
+    for i in range(translation_count):
+        language = 'korean' if i % 2 else 'english'
+        corpus[f'{language}{i // 2 + 1}'] = make_translation(seed + i, language)
+    return corpus
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Check that references.py recognises the common SBL book abbreviations
+and parses references whose book names contain digits (요한1서)
+
+Usage:
+    python3 -m unittest test_references
+"""
+import unittest
+
+from references import BOOK_ORDER, build_book_index, normalize, parse_reference
+
+# SBL Handbook of Style abbreviations, in canonical book order
+SBL_ABBREVIATIONS = [
+    "Gen", "Exod", "Lev", "Num", "Deut", "Josh", "Judg", "Ruth", "1 Sam", "2 Sam",
+    "1 Kgs", "2 Kgs", "1 Chr", "2 Chr", "Ezra", "Neh", "Esth", "Job", "Ps", "Prov",
+    "Eccl", "Song", "Isa", "Jer", "Lam", "Ezek", "Dan", "Hos", "Joel", "Amos",
+    "Obad", "Jonah", "Mic", "Nah", "Hab", "Zeph", "Hag", "Zech", "Mal",
+    "Matt", "Mark", "Luke", "John", "Acts", "Rom", "1 Cor", "2 Cor", "Gal", "Eph",
+    "Phil", "Col", "1 Thess", "2 Thess", "1 Tim", "2 Tim", "Titus", "Phlm", "Heb",
+    "Jas", "1 Pet", "2 Pet", "1 John", "2 John", "3 John", "Jude", "Rev",
+]
+
+
+class BookAbbreviationTest(unittest.TestCase):
+    def setUp(self):
+        self.lookup = build_book_index()
+
+    def book(self, name):
+        book_index = self.lookup.get(normalize(name))
+        return None if book_index is None else BOOK_ORDER[book_index]
+
+    def test_sbl_abbreviations(self):
+        self.assertEqual(len(SBL_ABBREVIATIONS), len(BOOK_ORDER))
+        for abbreviation, expected in zip(SBL_ABBREVIATIONS, BOOK_ORDER):
+            with self.subTest(abbreviation=abbreviation):
+                self.assertEqual(self.book(abbreviation), expected)
+                self.assertEqual(self.book(abbreviation + "."), expected)
+
+    def test_philippians_and_philemon(self):
+        for name in ["Phil", "Phi", "Php", "Philippians"]:
+            self.assertEqual(self.book(name), "ph", name)
+        for name in ["Phlm", "Phm", "Philemon"]:
+            self.assertEqual(self.book(name), "phm", name)
+
+
+class ParseReferenceTest(unittest.TestCase):
+    def setUp(self):
+        self.lookup = build_book_index()
+
+    def parse(self, text):
+        parsed = parse_reference(text, self.lookup)
+        return (BOOK_ORDER[parsed['bookIndex']], parsed['startChapter'], parsed['startVerse'],
+                parsed['endChapter'], parsed['endVerse'])
+
+    def test_korean_names_with_digits(self):
+        self.assertEqual(self.parse("요한1서 1:1"), ("1jo", 1, 1, 1, 1))
+        self.assertEqual(self.parse("요한2서 1:4-6"), ("2jo", 1, 4, 1, 6))
+        self.assertEqual(self.parse("요한3서 1장"), ("3jo", 1, None, 1, None))
+        self.assertEqual(self.parse("요한1서 1:1"), self.parse("요한일서 1:1"))
+        self.assertEqual(self.parse("요한1서 1:1"), self.parse("1 John 1:1"))
+
+    def test_chapter_numbers_stay_out_of_the_name(self):
+        self.assertEqual(self.parse("Gen 12"), ("gn", 12, None, 12, None))
+        self.assertEqual(self.parse("Gen 1-3"), ("gn", 1, None, 3, None))
+        self.assertEqual(self.parse("Gen 1:30-2:3"), ("gn", 1, 30, 2, 3))
+        self.assertEqual(self.parse("2 Sam 3"), ("2sm", 3, None, 3, None))
+        self.assertEqual(self.parse("시편 23편"), ("ps", 23, None, 23, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""Import whole plain-text Bibles into the app's {"books": [...]} format
+
+The input is read line by line in one pass and each book is written out as
+soon as the next one starts (see stream_convert.write_books_json), so a
+complete translation imports in seconds with about one book in memory.
+
+Recognised lines:
+
+    Genesis / # Genesis / 창세기           book heading (any name references.py knows)
+    Genesis 3 / Psalm 23 / 창세기 3장       book and chapter heading
+    Chapter 3 / CHAPTER 3 / 제 3 장 / 3장    chapter heading
+    1 In the beginning ...                 verse (number at the start of the line)
+    3:16 For God so loved ...              chapter and verse
+    Gen 1:1 In the beginning ...           book, chapter and verse on every line
+    1 First verse. 2 Second verse. ...     several verses on one line
+
+A number inside a line only starts a new verse when it is the next verse
+number, so "the 12 tribes" stays in the text. Lines that match none of
+these continue the previous verse; lines before the first book are skipped.
+If verse numbering restarts at 1 without a chapter heading, a new chapter
+is started.
+
+Usage:
+    python3 text_import.py bible.txt -o data/new.json [--names korean] [--compact]
+    python3 text_import.py kjv.txt web.txt --out-dir data [--jobs N]
+"""
+import argparse
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import book_names
+from pipeline_metrics import Metrics
+from references import BOOK_ORDER, build_book_index, normalize
+from stream_convert import write_books_json
+
+# A number at the start of a line may skip a few verses (omitted verses)
+MAX_VERSE_GAP = 5
+MAX_HEADING_LENGTH = 60
+
+VERSE_RE = re.compile(r'(?:(\d+)\s*:\s*)?(\d+)[.)]?\s+(.*)')
+REFERENCE_LINE_RE = re.compile(r'([1-3]?\s?[^\d:]+?)\s*(\d+)\s*:\s*(\d+)\s+(.*)')
+BOOK_HEADING_RE = re.compile(r'(?:#+\s*)?(.+?)\s*(?:(\d+)\s*[장편]?)?')
+CHAPTER_HEADING_RE = re.compile(r'(?:#+\s*)?(?:(?:chapter|ch\.?|제)\s*(\d+)\s*[장편]?|(\d+)\s*[장편])',
+                                re.IGNORECASE)
+# "1 Samuel", "2Kgs": may be a heading rather than a verse
+NUMBERED_BOOK_RE = re.compile(r'[1-3]\s?[^\W\d]')
+INLINE_NUMBER_RE = re.compile(r'(?<!\S)(\d+)(?=\s)')
+SENTENCE_END = set('.!?;:,"\')]”’')
+
+_BOOK_LOOKUP = None
+
+
+def book_lookup():
+    """Names that may head a book: full names, aliases and abbreviations, no prefixes"""
+    global _BOOK_LOOKUP
+    if _BOOK_LOOKUP is None:
+        _BOOK_LOOKUP = build_book_index(prefixes=False)
+    return _BOOK_LOOKUP
+
+
+def _after_sentence(text, position):
+    """True when the last non-space character before `position` ends a sentence"""
+    position -= 1
+    while position >= 0 and text[position].isspace():
+        position -= 1
+    return position >= 0 and text[position] in SENTENCE_END
+
+
+def split_inline_verses(text, number, last=None, strict=False):
+    """Split "text 2 more 3 more" into [(number, text), (number + 1, ...), ...].
+
+    `text` belongs to verse `number`; a later number only starts a verse when
+    it is exactly the next one, and never beyond verse `last`, so other
+    digits stay in the text. A number after sentence punctuation
+    ("... men. 10 And") is preferred; with strict and no `last`, only those
+    count.
+    """
+    positions = {}
+    for match in INLINE_NUMBER_RE.finditer(text):
+        positions.setdefault(int(match.group(1)), []).append(match)
+
+    verses = []
+    start = 0
+    while number != last and number + 1 in positions:
+        candidates = [m for m in positions[number + 1] if m.start() > start]
+        if not candidates:
+            break
+        marker = next((m for m in candidates if _after_sentence(text, m.start())), None)
+        if marker is None:
+            if strict and last is None:
+                break
+            marker = candidates[0]
+        verses.append((number, text[start:marker.start()].strip()))
+        number += 1
+        start = marker.end()
+    verses.append((number, text[start:].strip()))
+    return verses
+
+
+class TextImporter:
+    """Turns lines of a plain-text Bible into book dicts, one book at a time"""
+
+    def __init__(self, names=None, source=''):
+        self.names = names or book_names.ENGLISH
+        self.source = source
+        self.lookup = book_lookup()
+        self.book = None
+        self.book_index = None
+        self.chapter = None
+        # [number, text, single] of the latest verse line, split once the next verse number is known
+        self.pending = None
+        self.seen_books = set()
+        self.warnings = []
+        self.stats = {"books": 0, "chapters": 0, "verses": 0, "lines": 0}
+        self.punctuated = 0
+
+    def books(self, lines):
+        """Yield each completed book; the last one once the lines run out"""
+        for line_number, line in enumerate(lines, 1):
+            self.stats['lines'] += 1
+            line = line.strip()
+            if line:
+                yield from self._line(line, line_number)
+        if self.book is not None:
+            yield self._finish_book()
+
+    def _line(self, line, line_number):
+        numbered = line[0].isdigit()
+        if not numbered or NUMBERED_BOOK_RE.match(line):
+            events = self._book_line(line, line_number)
+            if events is not None:
+                yield from events
+                return
+
+        if self.book is not None:
+            if numbered:
+                match = VERSE_RE.fullmatch(line)
+                if match and self._verse_line(match):
+                    return
+            if len(line) <= MAX_HEADING_LENGTH:
+                match = CHAPTER_HEADING_RE.fullmatch(line)
+                if match:
+                    self._start_chapter(int(match.group(1) or match.group(2)))
+                    return
+
+        if self.pending is not None:
+            self.pending[1] = f"{self.pending[1]} {line}" if self.pending[1] else line
+        elif self.book is not None:
+            self.warnings.append(f"{self.source}:{line_number}: text before the first verse skipped")
+
+    def _book_line(self, line, line_number):
+        """Books completed by a book heading or "Gen 1:1 ..." line, or None if it is neither"""
+        match = REFERENCE_LINE_RE.fullmatch(line)
+        book_index = self.lookup.get(normalize(match.group(1))) if match else None
+        if book_index is not None:
+            events = list(self._start_book(book_index, line_number))
+            self._start_chapter(int(match.group(2)))
+            self._add_verses(int(match.group(3)), match.group(4), single=True)
+            return events
+
+        if len(line) > MAX_HEADING_LENGTH:
+            return None
+        match = BOOK_HEADING_RE.fullmatch(line)
+        book_index = self.lookup.get(normalize(match.group(1))) if match else None
+        if book_index is None:
+            return None
+        events = list(self._start_book(book_index, line_number))
+        if match.group(2):
+            self._start_chapter(int(match.group(2)))
+        return events
+
+    def _verse_line(self, match):
+        """Add a line that starts with a verse number; False if the number does not fit"""
+        chapter, number, text = match.groups()
+        if chapter is not None:
+            chapter = int(chapter)
+            if self.chapter is None or chapter != self.chapter['number']:
+                self._start_chapter(chapter)
+            self._add_verses(int(number), text, single=True)
+            return True
+
+        number = int(number)
+        if self.pending is not None:
+            first = self.pending[0]
+            last = first if self.pending[2] else split_inline_verses(self.pending[1], first)[-1][0]
+        else:
+            first = last = self.chapter['verses'][-1]['number'] if self.chapter and self.chapter['verses'] else 0
+        if self.chapter is None or (number == 1 and last > 1):
+            # Verse 1 again without a heading: the next chapter
+            self._start_chapter(self.chapter['number'] + 1 if self.chapter else 1)
+        elif not first < number <= last + MAX_VERSE_GAP:
+            return False
+        self._add_verses(number, text)
+        return True
+
+    def _add_verses(self, number, text, single=False):
+        """Start a verse line; single when the line names its own verse ("3:16 ...")"""
+        self._flush(number - 1)
+        self.pending = [number, text, single]
+
+    def _flush(self, last=None):
+        """Split the pending verse line, up to verse `last` when it is known"""
+        if self.pending is None:
+            return
+        number, text, single = self.pending
+        self.pending = None
+        # At a chapter end the last verse is unknown; if this text ends its
+        # verses with punctuation, a number without it there is verse text
+        strict = self.punctuated * 2 > self.stats['verses']
+        for number, verse_text in split_inline_verses(text, number, number if single else last, strict):
+            self.chapter['verses'].append({"number": number, "text": verse_text})
+            self.stats['verses'] += 1
+            if verse_text[-1:] in SENTENCE_END:
+                self.punctuated += 1
+
+    def _start_book(self, book_index, line_number):
+        if book_index == self.book_index:
+            return
+        if book_index in self.seen_books:
+            raise ValueError(f"{self.source}:{line_number}: {self.names[BOOK_ORDER[book_index]]} "
+                             f"appears twice - books must be contiguous")
+        if self.book is not None:
+            yield self._finish_book()
+        abbreviation = BOOK_ORDER[book_index]
+        self.book = {"name": self.names.get(abbreviation, abbreviation.upper()),
+                     "abbreviation": abbreviation.upper(), "chapters": []}
+        self.book_index = book_index
+        self.seen_books.add(book_index)
+        self.chapter = None
+
+    def _start_chapter(self, number):
+        if self.chapter is not None and self.chapter['number'] == number:
+            return
+        if self.book is None:
+            return
+        self._flush()
+        if self.chapter is not None and not self.chapter['verses']:
+            self.book['chapters'].pop()
+        self.chapter = {"number": number, "verses": []}
+        self.book['chapters'].append(self.chapter)
+
+    def _finish_book(self):
+        self._flush()
+        book = self.book
+        book['chapters'] = [c for c in book['chapters'] if c['verses']]
+        numbers = [c['number'] for c in book['chapters']]
+        if numbers != list(range(1, len(numbers) + 1)):
+            self.warnings.append(f"{self.source}: {book['name']} chapters are not numbered 1..{len(numbers)}")
+        self.stats['books'] += 1
+        self.stats['chapters'] += len(book['chapters'])
+        self.book = None
+        return book
+
+
+def import_file(source, output, names='english', compact=False, encoding='utf-8-sig'):
+    """Import one text file; returns its stats (books, chapters, verses, warnings, seconds)"""
+    start = time.perf_counter()
+    importer = TextImporter(book_names.TABLES[names], source)
+    with open(source, 'r', encoding=encoding) as f:
+        write_books_json(output, importer.books(f), indent=None if compact else 2)
+
+    return {
+        "source": source,
+        "output": output,
+        **importer.stats,
+        "warnings": importer.warnings,
+        "bytesWritten": os.path.getsize(output),
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+def import_all(jobs_list, jobs=None, names='english', compact=False, encoding='utf-8-sig'):
+    """Import (source, output) pairs across a process pool; results in input order"""
+    results = {}
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(import_file, source, output, names, compact, encoding): source
+                   for source, output in jobs_list}
+        for future in as_completed(futures):
+            source = futures[future]
+            try:
+                result = future.result()
+            except (OSError, ValueError) as e:
+                print(f"❌ {source}: {e}")
+                continue
+            results[source] = result
+            print(f"✓ {source} -> {result['output']}: {result['books']} books, {result['chapters']} chapters, "
+                  f"{result['verses']} verses in {result['seconds']:.2f}s")
+            for warning in result['warnings'][:10]:
+                print(f"⚠️  {warning}")
+            if len(result['warnings']) > 10:
+                print(f"⚠️  ... and {len(result['warnings']) - 10} more warning(s)")
+    return [results[source] for source, _ in jobs_list if source in results]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import plain-text Bibles into the app's JSON format")
+    parser.add_argument('inputs', nargs='+', help="plain-text Bible files")
+    parser.add_argument('-o', '--output', help="output file (one input only)")
+    parser.add_argument('--out-dir', default='data', help="output directory, one <name>.json per input")
+    parser.add_argument('--names', default='english', choices=sorted(book_names.TABLES),
+                        help="book name table for the output")
+    parser.add_argument('--encoding', default='utf-8-sig', help="input file encoding")
+    parser.add_argument('--jobs', type=int, help="worker processes (defaults to CPU count)")
+    parser.add_argument('--compact', action='store_true', help="write without indentation")
+    args = parser.parse_args()
+
+    if args.output and len(args.inputs) > 1:
+        parser.error("--output takes a single input; use --out-dir for several")
+    if args.output:
+        jobs_list = [(args.inputs[0], args.output)]
+    else:
+        os.makedirs(args.out_dir, exist_ok=True)
+        jobs_list = [(source, os.path.join(args.out_dir, os.path.splitext(os.path.basename(source))[0] + '.json'))
+                     for source in args.inputs]
+
+    jobs = args.jobs or min(len(jobs_list), os.cpu_count() or 1)
+    print(f"Importing {len(jobs_list)} file(s) with {jobs} worker(s)...")
+
+    metrics = Metrics('text_import')
+    start = time.perf_counter()
+    with metrics.stage('import'):
+        results = import_all(jobs_list, jobs, args.names, args.compact, args.encoding)
+        metrics.count(files=len(results),
+                      books=sum(r['books'] for r in results),
+                      chapters=sum(r['chapters'] for r in results),
+                      verses=sum(r['verses'] for r in results),
+                      bytesWritten=sum(r['bytesWritten'] for r in results))
+    print(f"\nWall time: {time.perf_counter() - start:.2f}s")
+    metrics.finish()
+
+    if len(results) < len(jobs_list):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
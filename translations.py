@@ -0,0 +1,85 @@
+"""Registry of the translations the site carries
+
+Each entry describes one translation:
+
+    key         short name used for output files and in the app ("english")
+    lang        language code used by the chapter API ("en")
+    source      thiagobodruk-format source file
+    format      optional; "text" for a plain-text Bible (see text_import.py)
+    encoding    source file encoding (the upstream files start with a BOM)
+    book_names  name of a table in book_names.py, or an inline {abbrev: name} map
+    output      converted {"books": [...]} file
+
+and, for fetch_sources.py, optionally:
+
+    url         where the source is downloaded from, relative to --base-url
+                (default: the source's file name)
+    book_url    per-book URL template ({number}, {abbrev}); the books are
+                downloaded separately and joined into the source file
+    sha256      expected checksum of the source file
+
+A JSON file with a list of entries in the same shape can be passed to
+convert_translations.py with --registry to convert other translations.
+Entries are listed in display order.
+"""
+import json
+
+import book_names
+
+TRANSLATIONS = [
+    {
+        "key": "english",
+        "lang": "en",
+        "source": "data/en_bbe.json",
+        "encoding": "utf-8-sig",
+        "book_names": "english",
+        "output": "data/english.json",
+    },
+    {
+        "key": "korean",
+        "lang": "ko",
+        "source": "data/ko_ko.json",
+        "encoding": "utf-8-sig",
+        "book_names": "korean",
+        "output": "data/korean.json",
+    },
+]
+
+
+def load_registry(path=None):
+    """Return the registry entries from a JSON file, or the built-in list"""
+    if path is None:
+        return TRANSLATIONS
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def get_translation(key, registry=None):
+    for entry in registry or TRANSLATIONS:
+        if entry['key'] == key:
+            return entry
+    raise KeyError(f"Unknown translation: {key}")
+
+
+def resolve_book_names(entry):
+    """The {abbrev: name} table for an entry"""
+    names = entry.get('book_names')
+    if isinstance(names, str):
+        return book_names.TABLES[names]
+    return names
+
+
+def translation_files(registry=None):
+    """(key, converted file) pairs, for tools that read the converted data"""
+    return [(entry['key'], entry['output']) for entry in registry or TRANSLATIONS]
+
+
+def load_translations(files):
+    """Load each (key, path) translation file, keyed by translation name.
+
+    Files are read through the bibledata parse cache, so only the first load
+    after a file changes parses JSON.
+    """
+    from bibledata import Library
+
+    return Library(files).load_all()
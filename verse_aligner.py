@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""Align verses automatically in chapters whose verse numbering differs
+
+Where translations split or merge verses differently (English 12-13 are
+Korean 12, an English verse has no Korean counterpart, ...), this finds the
+split and merge points from verse lengths alone, with the dynamic-programming
+alignment of Gale & Church (1993). Each step of the alignment pairs one,
+two or no verses of one translation with one, two or no verses of the
+other; the cost of a step is how unlikely its length ratio is, given the
+ratio and variance measured on the chapters that already match verse for
+verse. English and Korean differ a lot in characters per verse, so the
+ratio is estimated per translation pair, not assumed to be 1.
+
+Every other translation is aligned to the first one in the registry, and
+the pairwise results are combined into rows of the same shape as
+alignment_overrides.json (see build_alignment.py):
+
+    [{"book": "Mark", "chapter": 9, "rows": [[[1], [1]], ..., [[49, 50], [48]]],
+      "bookIndex": 40, "cost": 1.9, "changes": ["english 49-50 = korean 48"], "review": false}]
+
+The extra keys are ignored by build_alignment.py, so the output file can be
+used as an overrides file directly, or merged into alignment_overrides.json
+with --merge (hand-made entries there are kept). Chapters with a high
+average cost per row are marked "review" and listed.
+
+Chapters are aligned across a process pool; only verse lengths are sent to
+the workers.
+
+Usage:
+    python3 verse_aligner.py [--report mismatch_report.json] [--out auto_alignment.json]
+                             [--merge] [--jobs N] [--review-cost 4.0]
+"""
+import argparse
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from bibledata import Library
+from build_alignment import OVERRIDES_FILE, validate_rows
+from pipeline_metrics import Metrics
+
+DEFAULT_OUTPUT_FILE = 'auto_alignment.json'
+
+# Prior probability of each step (verses of the first, of the second translation),
+# from Gale & Church's hand-aligned corpus
+STEP_PRIORS = {
+    (1, 1): 0.89,
+    (1, 0): 0.0099 / 2,
+    (0, 1): 0.0099 / 2,
+    (2, 1): 0.089 / 2,
+    (1, 2): 0.089 / 2,
+    (2, 2): 0.011,
+}
+STEP_COSTS = {step: -math.log(p) for step, p in STEP_PRIORS.items()}
+
+# Cost of a step whose lengths are so far apart the normal tail underflows
+MAX_LENGTH_COST = 50.0
+# Only cells this close to the diagonal are searched, plus the count difference
+BAND = 12
+DEFAULT_REVIEW_COST = 4.0
+# Lower bound for the estimated variance: matching chapters understate it,
+# and a too-narrow distribution turns every short verse into a merge
+MIN_VARIANCE = 0.5
+
+
+def verse_length(text):
+    """Characters of a verse, not counting spaces"""
+    return len(text) - text.count(' ')
+
+
+def estimate_parameters(pairs):
+    """(ratio, variance) of second/first lengths from verse pairs known to match.
+
+    The ratio is characters of the second translation per character of the
+    first; the variance is of the length difference per character, as in
+    Gale & Church.
+    """
+    total_first = sum(first for first, _ in pairs)
+    total_second = sum(second for _, second in pairs)
+    if not pairs or not total_first or not total_second:
+        return 1.0, 6.8
+    ratio = total_second / total_first
+    deviations = [(second - first * ratio) ** 2 / first for first, second in pairs if first]
+    variance = sum(deviations) / len(deviations) if deviations else 6.8
+    return ratio, max(variance, MIN_VARIANCE)
+
+
+def length_cost(first, second, ratio, variance):
+    """-log P(lengths | aligned): a two-tailed normal on the scaled difference"""
+    if first == 0 and second == 0:
+        return 0.0
+    mean = (first + second / ratio) / 2
+    delta = (second - first * ratio) / math.sqrt(max(mean, 1.0) * variance)
+    probability = math.erfc(abs(delta) / math.sqrt(2))
+    if probability <= 0:
+        return MAX_LENGTH_COST
+    return min(-math.log(probability), MAX_LENGTH_COST)
+
+
+def align_lengths(first, second, ratio, variance, band=BAND):
+    """Best sequence of steps aligning two lists of verse lengths.
+
+    Returns ([(first verse indexes, second verse indexes), ...], total cost).
+    """
+    n, m = len(first), len(second)
+    if n == 0 or m == 0:
+        # One side is empty (a missing chapter): every verse is unmatched
+        return [([i], []) for i in range(n)] + [([], [j]) for j in range(m)], 0.0
+
+    width = band + abs(n - m)
+    infinity = float('inf')
+    cost = [[infinity] * (m + 1) for _ in range(n + 1)]
+    back = [[None] * (m + 1) for _ in range(n + 1)]
+    cost[0][0] = 0.0
+
+    for i in range(n + 1):
+        centre = i * m / n
+        low, high = max(0, int(centre) - width), min(m, int(centre) + width + 1)
+        for j in range(low, high + 1):
+            if i == 0 and j == 0:
+                continue
+            best, best_step = infinity, None
+            for (di, dj), step_cost in STEP_COSTS.items():
+                if di > i or dj > j:
+                    continue
+                previous = cost[i - di][j - dj]
+                if previous == infinity:
+                    continue
+                total = previous + step_cost + length_cost(
+                    sum(first[i - di:i]), sum(second[j - dj:j]), ratio, variance)
+                if total < best:
+                    best, best_step = total, (di, dj)
+            cost[i][j], back[i][j] = best, best_step
+
+    steps = []
+    i, j = n, m
+    while i or j:
+        di, dj = back[i][j]
+        steps.append((list(range(i - di, i)), list(range(j - dj, j))))
+        i, j = i - di, j - dj
+    steps.reverse()
+    return steps, cost[n][m]
+
+
+def align_chapter(task):
+    """Worker: align every other translation of one chapter to the first.
+
+    task is (chapter id, [verse numbers per translation], [verse lengths per
+    translation], [(ratio, variance) per other translation]).
+    """
+    chapter_id, numbers, lengths, parameters = task
+    pairwise = []
+    total_cost = 0.0
+    for t in range(1, len(numbers)):
+        ratio, variance = parameters[t - 1]
+        steps, cost = align_lengths(lengths[0], lengths[t], ratio, variance)
+        pairwise.append([([numbers[0][i] for i in a], [numbers[t][j] for j in b]) for a, b in steps])
+        total_cost += cost
+    return chapter_id, combine_pairwise(pairwise), total_cost
+
+
+def combine_pairwise(pairwise):
+    """N-column rows from alignments of each other translation to the first.
+
+    Rows are cut only where every pairwise alignment has a row boundary, so a
+    row may group verses when translations split them differently.
+    """
+    if len(pairwise) == 1:
+        return [[list(a), list(b)] for a, b in pairwise[0]]
+
+    # Boundaries: how many verses of the first translation precede each row
+    def starts(steps):
+        position, result = 0, []
+        for a, _ in steps:
+            result.append(position)
+            position += len(a)
+        return result
+
+    cuts = set(starts(pairwise[0]))
+    for steps in pairwise[1:]:
+        cuts &= set(starts(steps))
+
+    rows = {}
+    for t, steps in enumerate(pairwise, 1):
+        segment = 0
+        for start, (a, b) in zip(starts(steps), steps):
+            if start in cuts and a:
+                segment = start
+            row = rows.setdefault(segment, [[] for _ in range(len(pairwise) + 1)])
+            if t == 1:
+                row[0].extend(a)
+            row[t].extend(b)
+    return [rows[segment] for segment in sorted(rows)]
+
+
+def describe_changes(rows, keys):
+    """Human-readable list of the rows that are not one verse each"""
+    changes = []
+    for row in rows:
+        if all(len(cell) == 1 for cell in row):
+            continue
+        parts = []
+        for key, cell in zip(keys, row):
+            if not cell:
+                parts.append(f"{key} -")
+            elif len(cell) == 1:
+                parts.append(f"{key} {cell[0]}")
+            else:
+                parts.append(f"{key} {cell[0]}-{cell[-1]}")
+        changes.append(' = '.join(parts))
+    return changes
+
+
+def mismatched_chapters(library, keys, report_path=None):
+    """[(book index, chapter number)] to align: those in a mismatch report, or
+    every chapter whose verse count differs in some translation"""
+    primary = library[keys[0]]
+    if report_path:
+        with open(report_path, 'r', encoding='utf-8') as f:
+            report = json.load(f)
+        chapters = [(primary.find_book(entry['book']), entry['chapter']) for entry in report]
+        return sorted({chapter for chapter in chapters if chapter[0] is not None})
+
+    # Verse counts come from the cached indexes: no verse text is loaded here
+    counts = []
+    for key in keys:
+        translation = library[key]
+        counts.append([dict(zip(translation.chapter_numbers(i), verse_counts))
+                       for i, (_, verse_counts) in enumerate(translation.verse_counts())])
+
+    chapters = []
+    for book_index, primary_counts in enumerate(counts[0]):
+        for number, count in primary_counts.items():
+            for other in counts[1:]:
+                if book_index >= len(other) or other[book_index].get(number, 0) != count:
+                    chapters.append((book_index, number))
+                    break
+    return chapters
+
+
+def chapter_verses(translation, book_index, number):
+    chapter = translation.chapter(book_index, number) if book_index < translation.book_count else None
+    return chapter['verses'] if chapter else []
+
+
+def collect_tasks(library, keys, chapters):
+    """Alignment tasks for the chapters, and (ratio, variance) per other translation.
+
+    Parameters are estimated from the verse-for-verse chapters of the books
+    that are being aligned, which are loaded anyway.
+    """
+    translations = [library[key] for key in keys]
+    pairs = [[] for _ in keys[1:]]
+    tasks = []
+    wanted = set(chapters)
+
+    for book_index in sorted({book_index for book_index, _ in chapters}):
+        for number in translations[0].chapter_numbers(book_index):
+            verses = [chapter_verses(translation, book_index, number) for translation in translations]
+            lengths = [[verse_length(v['text']) for v in chapter] for chapter in verses]
+            if (book_index, number) in wanted:
+                tasks.append(((book_index, number), [[v['number'] for v in chapter] for chapter in verses], lengths))
+                continue
+            for t in range(1, len(keys)):
+                if len(lengths[t]) == len(lengths[0]):
+                    pairs[t - 1].extend(zip(lengths[0], lengths[t]))
+
+    parameters = [estimate_parameters(pair) for pair in pairs]
+    return [task + (parameters,) for task in tasks], parameters
+
+
+def align_all(library, keys, chapters, jobs=None):
+    """Alignment entries for the chapters, in book order, and the parameters used"""
+    tasks, parameters = collect_tasks(library, keys, chapters)
+    primary = library[keys[0]]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        results = list(pool.map(align_chapter, tasks, chunksize=max(1, len(tasks) // (4 * (jobs or 1)))))
+
+    entries = []
+    for task, ((book_index, number), rows, cost) in zip(tasks, results):
+        if not validate_rows(rows, task[1]):
+            raise ValueError(f"alignment of {primary.book_names[book_index]} {number} does not cover its verses")
+        average = cost / max(len(rows), 1)
+        entries.append({
+            "book": primary.book_names[book_index],
+            "chapter": number,
+            "rows": rows,
+            "bookIndex": book_index,
+            "cost": round(average, 3),
+            "changes": describe_changes(rows, keys),
+            "review": False,
+        })
+    return entries, parameters
+
+
+def merge_overrides(entries, path=OVERRIDES_FILE):
+    """Add entries for chapters alignment_overrides.json does not cover; returns how many"""
+    existing = []
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            existing = json.load(f)
+    covered = {(e['book'], e['chapter']) for e in existing}
+    added = [{"book": e['book'], "chapter": e['chapter'], "rows": e['rows']}
+             for e in entries if (e['book'], e['chapter']) not in covered]
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(existing + added, f, ensure_ascii=False, indent=2)
+    return len(added)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Align verses in chapters whose numbering differs")
+    parser.add_argument('--report', help="align only the chapters in this mismatch report")
+    parser.add_argument('--out', default=DEFAULT_OUTPUT_FILE, help="alignment file to write")
+    parser.add_argument('--merge', action='store_true',
+                        help=f"also add the alignments to {OVERRIDES_FILE} (hand-made entries are kept)")
+    parser.add_argument('--jobs', type=int, help="worker processes (defaults to CPU count)")
+    parser.add_argument('--review-cost', type=float, default=DEFAULT_REVIEW_COST,
+                        help="average cost per row above which a chapter is marked for review")
+    args = parser.parse_args()
+
+    library = Library()
+    keys = library.keys
+    metrics = Metrics('verse_aligner')
+
+    with metrics.stage('select'):
+        chapters = mismatched_chapters(library, keys, args.report)
+        metrics.count(chapters=len(chapters))
+    if not chapters:
+        print("✓ Every chapter has the same verses in every translation - nothing to align")
+        metrics.finish()
+        return
+
+    jobs = args.jobs or min(len(chapters), os.cpu_count() or 1)
+    print(f"Aligning {len(chapters)} chapter(s) with {jobs} worker(s)...")
+    with metrics.stage('align'):
+        entries, parameters = align_all(library, keys, chapters, jobs)
+        metrics.count(rows=sum(len(e['rows']) for e in entries))
+    for key, (ratio, variance) in zip(keys[1:], parameters):
+        print(f"  {key}/{keys[0]}: {ratio:.3f} characters per character, variance {variance:.2f}")
+
+    for entry in entries:
+        entry['review'] = entry['cost'] > args.review_cost
+
+    with metrics.stage('write'):
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(entries, f, ensure_ascii=False, indent=2)
+        metrics.count(bytesWritten=os.path.getsize(args.out))
+
+    review = [e for e in entries if e['review']]
+    print(f"✓ {len(entries)} chapter(s) aligned, "
+          f"{sum(len(e['changes']) for e in entries)} split/merge point(s) saved to {args.out}")
+    for entry in review:
+        print(f"⚠️  Review {entry['book']} {entry['chapter']} (cost {entry['cost']:.1f}): "
+              f"{'; '.join(entry['changes'][:3])}")
+
+    if args.merge:
+        added = merge_overrides(entries)
+        print(f"✓ {added} alignment(s) added to {OVERRIDES_FILE} - run build_alignment.py and build_shards.py")
+    else:
+        print(f"  Review {args.out}, then use --merge to add it to {OVERRIDES_FILE}")
+    metrics.finish()
+
+
+if __name__ == "__main__":
+    main()
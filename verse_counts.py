@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""Verse counts of every translation as one NumPy array, for N-way comparisons
+
+CountMatrix holds a books x chapters x translations array of verse counts
+(plus a mask of which chapters exist), built once from the JSON files or
+from the verse store. The checks the diagnostic scripts used to do with
+nested loops are array operations on it:
+
+    mismatches(a, b)       chapters whose verse counts differ
+    mismatch_counts()      number of mismatched chapters for every pair
+    adjacent_shifts(a, b)  verses apparently moved into the next chapter
+    empty_chapters()       chapters that exist but have no verses (Korean Job 42)
+
+Requires NumPy (pip install numpy).
+
+Usage:
+    python3 verse_counts.py [--store data/store]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from bibledata import Library
+from translations import translation_files
+from verse_store import MISSING, VerseStore
+
+
+class CountMatrix:
+    """Verse counts indexed [book index, chapter index, translation]"""
+
+    def __init__(self, keys, book_names, counts, present):
+        self.keys = list(keys)
+        self.book_names = book_names        # {key: [name per book]}
+        self.counts = counts                # int32, 0 where a chapter is absent
+        self.present = present              # bool, chapter exists in that translation
+        self._key_index = {key: i for i, key in enumerate(self.keys)}
+        self._book_index = {name: i for i, name in enumerate(book_names[self.keys[0]])}
+
+    @classmethod
+    def from_counts(cls, per_translation):
+        """Build from {key: [(book name, [verse count per chapter]), ...]}"""
+        keys = list(per_translation)
+        book_count = max(len(books) for books in per_translation.values())
+        chapter_count = max((len(chapters) for books in per_translation.values() for _, chapters in books),
+                            default=0)
+
+        counts = np.zeros((book_count, chapter_count, len(keys)), dtype=np.int32)
+        present = np.zeros(counts.shape, dtype=bool)
+        book_names = {}
+        for t, key in enumerate(keys):
+            book_names[key] = [name for name, _ in per_translation[key]]
+            for b, (_, chapters) in enumerate(per_translation[key]):
+                counts[b, :len(chapters), t] = chapters
+                present[b, :len(chapters), t] = True
+
+        return cls(keys, book_names, counts, present)
+
+    @classmethod
+    def from_data(cls, data):
+        """Build from already loaded {key: {"books": [...]}} translations"""
+        return cls.from_counts({
+            key: [(book['name'], [len(c['verses']) for c in book['chapters']]) for book in translation['books']]
+            for key, translation in data.items()
+        })
+
+    @classmethod
+    def from_json(cls, files=None):
+        """Build from (key, path) translation files (defaults to the registry).
+
+        Only the bibledata index is read, never the verse text.
+        """
+        library = Library(files)
+        return cls.from_counts({translation.key: translation.verse_counts() for translation in library})
+
+    @classmethod
+    def from_store(cls, store, keys):
+        """Build from a verse_store.VerseStore without touching any verse text"""
+        book_chapter_start = np.frombuffer(store.book_chapter_start, dtype=np.uint32).astype(np.int64)
+        chapter_slot_start = np.frombuffer(store.chapter_slot_start, dtype=np.uint32).astype(np.int64)
+        chapters_per_book = np.diff(book_chapter_start)
+        book_count = len(chapters_per_book)
+        chapter_count = int(chapters_per_book.max(initial=0))
+
+        # Position of every global chapter in the books x chapters grid
+        chapter_book = np.repeat(np.arange(book_count), chapters_per_book)
+        chapter_pos = np.arange(len(chapter_book)) - book_chapter_start[chapter_book]
+
+        counts = np.zeros((book_count, chapter_count, len(keys)), dtype=np.int32)
+        present = np.zeros(counts.shape, dtype=bool)
+        book_names = {}
+        for t, key in enumerate(keys):
+            translation = store[key]
+            offsets = np.frombuffer(translation.offsets_view(), dtype='<u4').reshape(-1, 2)
+            filled = np.concatenate(([0], np.cumsum(offsets[:, 1] != MISSING)))
+            counts[chapter_book, chapter_pos, t] = filled[chapter_slot_start[1:]] - filled[chapter_slot_start[:-1]]
+            # The skeleton has every chapter any translation has; presence is per translation
+            for b, book in enumerate(translation.books):
+                present[b, np.asarray(book['chapters'], dtype=np.int64) - 1, t] = True
+            book_names[key] = [book['name'] for book in translation.books]
+
+        return cls(keys, book_names, counts, present)
+
+    def index(self, key):
+        return self._key_index[key]
+
+    def book_index(self, name):
+        """Index of a book by its name in the first translation, or None"""
+        return self._book_index.get(name)
+
+    def chapter_counts(self):
+        """Number of chapters per book, shape (books, translations)"""
+        return self.present.sum(axis=1)
+
+    def pairwise_differences(self):
+        """counts[..., a] - counts[..., b] for every pair, shape (books, chapters, T, T)"""
+        return self.counts[..., :, None] - self.counts[..., None, :]
+
+    def mismatches(self, a, b, require_both=False):
+        """[(book index, chapter index, count in a, count in b)] where the counts differ.
+
+        With require_both, chapters missing from either translation are skipped.
+        """
+        ia, ib = self.index(a), self.index(b)
+        if require_both:
+            compared = self.present[..., ia] & self.present[..., ib]
+        else:
+            compared = self.present[..., ia] | self.present[..., ib]
+        books, chapters = np.nonzero(compared & (self.counts[..., ia] != self.counts[..., ib]))
+        return [(int(bi), int(ci), int(self.counts[bi, ci, ia]), int(self.counts[bi, ci, ib]))
+                for bi, ci in zip(books, chapters)]
+
+    def mismatch_counts(self):
+        """T x T matrix of the number of mismatched chapters for every pair"""
+        either = self.present[..., :, None] | self.present[..., None, :]
+        differs = self.pairwise_differences() != 0
+        return (either & differs).sum(axis=(0, 1))
+
+    def adjacent_shifts(self, a, b):
+        """[(book index, chapter index)] where chapter and chapter + 1 differ by
+        opposite amounts - verses one translation puts at the end of a chapter
+        and the other at the start of the next (or vice versa)."""
+        diff = self.counts[..., self.index(a)] - self.counts[..., self.index(b)]
+        shifted = (diff[:, :-1] != 0) & (diff[:, :-1] + diff[:, 1:] == 0)
+        books, chapters = np.nonzero(shifted)
+        return [(int(bi), int(ci)) for bi, ci in zip(books, chapters)]
+
+    def empty_chapters(self):
+        """[(book index, chapter index, key)] for chapters that exist with no verses"""
+        books, chapters, translations = np.nonzero(self.present & (self.counts == 0))
+        return [(int(bi), int(ci), self.keys[t]) for bi, ci, t in zip(books, chapters, translations)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare verse counts across all translations")
+    parser.add_argument('--store', help="read counts from a verse store directory instead of the JSON files")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.store:
+        keys = [key for key, _ in translation_files()]
+        matrix = CountMatrix.from_store(VerseStore(args.store), keys)
+    else:
+        matrix = CountMatrix.from_json()
+    load_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    pair_counts = matrix.mismatch_counts()
+    empty = matrix.empty_chapters()
+    shifts = {(a, b): matrix.adjacent_shifts(a, b)
+              for i, a in enumerate(matrix.keys) for b in matrix.keys[i + 1:]}
+    compare_ms = (time.perf_counter() - start) * 1000
+
+    names = matrix.book_names[matrix.keys[0]]
+    print('\n=== MISMATCHED CHAPTERS PER TRANSLATION PAIR ===\n')
+    print(' ' * 12 + ''.join(f'{key:>12}' for key in matrix.keys))
+    for i, key in enumerate(matrix.keys):
+        print(f'{key:<12}' + ''.join(f'{n:>12}' for n in pair_counts[i]))
+
+    print('\n=== EMPTY CHAPTERS ===\n')
+    for bi, ci, key in empty:
+        print(f"{names[bi]} {ci + 1}: no verses in {key}")
+    if not empty:
+        print('✓ None')
+
+    print('\n=== POSSIBLE SHIFTS INTO THE NEXT CHAPTER ===\n')
+    for (a, b), found in shifts.items():
+        for bi, ci in found:
+            print(f"{names[bi]} {ci + 1}-{ci + 2}: {a} vs {b}")
+    if not any(shifts.values()):
+        print('✓ None')
+
+    print(f"\nLoaded counts in {load_ms:.1f} ms, compared {len(matrix.keys)} translation(s) in {compare_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
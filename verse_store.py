@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""Compact memory-mapped verse store built from the translation JSON files
+
+Layout of the store directory (all integers little-endian):
+
+    skeleton.bin        versification shared by every translation
+        magic b'BVSK', version u32, book_count u32, chapter_count u32, slot_count u32
+        book_chapter_start  u32[book_count + 1]
+        chapter_slot_start  u32[chapter_count + 1]
+
+    <translation>.bvt   one file per translation
+        magic b'BVTX', version u32, slot_count u32, header_len u32
+        header              UTF-8 JSON: [{"name", "abbreviation", "chapters"}, ...] per book,
+                            "chapters" listing the chapter numbers this translation has
+        (padding to a multiple of 4 bytes)
+        offsets             (start u32, length u32)[slot_count]
+        text                UTF-8 verse text blob
+
+Chapter slots are indexed by chapter number and verse slots by verse number,
+so (book index, chapter, verse) maps to a slot with two array lookups. A slot
+a translation does not have is stored with length MISSING.
+
+Usage:
+    python3 verse_store.py [--store data/store] build
+    python3 verse_store.py [--store data/store] show <translation> <book> <chapter> [verse]
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from translations import load_translations, translation_files
+
+DEFAULT_STORE_DIR = 'data/store'
+
+SKELETON_MAGIC = b'BVSK'
+TRANSLATION_MAGIC = b'BVTX'
+FORMAT_VERSION = 2
+
+SKELETON_HEADER = struct.Struct('<4sIIII')
+TRANSLATION_HEADER = struct.Struct('<4sIII')
+OFFSET_ENTRY = struct.Struct('<II')
+
+MISSING = 0xFFFFFFFF
+
+
+def _pack_u32(values):
+    return struct.pack(f'<{len(values)}I', *values)
+
+
+def _write_atomic(path, chunks):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        for chunk in chunks:
+            f.write(chunk)
+    os.replace(tmp_path, path)
+
+
+def build_skeleton(translations_data):
+    """Compute the shared versification from every translation.
+
+    Returns (book_chapter_start, chapter_slot_start) prefix-sum lists. Each
+    chapter gets as many verse slots as the highest verse number any
+    translation has for it.
+    """
+    book_count = max(len(data['books']) for data in translations_data)
+    book_chapter_start = [0]
+    chapter_slot_start = [0]
+
+    for book_index in range(book_count):
+        # Highest verse number per chapter number, across translations
+        max_verses = {}
+        for data in translations_data:
+            if book_index >= len(data['books']):
+                continue
+            for chapter in data['books'][book_index]['chapters']:
+                highest = max((v['number'] for v in chapter['verses']), default=0)
+                max_verses[chapter['number']] = max(max_verses.get(chapter['number'], 0), highest)
+
+        chapter_count = max(max_verses, default=0)
+        for chapter_number in range(1, chapter_count + 1):
+            chapter_slot_start.append(chapter_slot_start[-1] + max_verses.get(chapter_number, 0))
+        book_chapter_start.append(book_chapter_start[-1] + chapter_count)
+
+    return book_chapter_start, chapter_slot_start
+
+
+def write_skeleton(path, book_chapter_start, chapter_slot_start):
+    header = SKELETON_HEADER.pack(
+        SKELETON_MAGIC, FORMAT_VERSION,
+        len(book_chapter_start) - 1, len(chapter_slot_start) - 1, chapter_slot_start[-1]
+    )
+    _write_atomic(path, [header, _pack_u32(book_chapter_start), _pack_u32(chapter_slot_start)])
+
+
+def write_translation(path, data, book_chapter_start, chapter_slot_start):
+    """Write one translation's offset table and text blob.
+
+    Returns the number of verses stored. Raises ValueError for a chapter or
+    verse number outside the skeleton (below 1, in practice), which would
+    otherwise land in a neighbouring chapter's slots.
+    """
+    slot_count = chapter_slot_start[-1]
+    offsets = [0, MISSING] * slot_count
+    blob = bytearray()
+    verse_count = 0
+
+    for book_index, book in enumerate(data['books']):
+        first_chapter = book_chapter_start[book_index]
+        chapter_count = book_chapter_start[book_index + 1] - first_chapter
+        for chapter in book['chapters']:
+            if not 1 <= chapter['number'] <= chapter_count:
+                raise ValueError(f"{book['name']} chapter {chapter['number']} is outside 1..{chapter_count}")
+            chapter_index = first_chapter + chapter['number'] - 1
+            chapter_slot = chapter_slot_start[chapter_index]
+            verse_slots = chapter_slot_start[chapter_index + 1] - chapter_slot
+            for verse in chapter['verses']:
+                if not 1 <= verse['number'] <= verse_slots:
+                    raise ValueError(f"{book['name']} {chapter['number']}:{verse['number']} "
+                                     f"is outside verses 1..{verse_slots}")
+                encoded = verse['text'].encode('utf-8')
+                slot = chapter_slot + verse['number'] - 1
+                offsets[2 * slot] = len(blob)
+                offsets[2 * slot + 1] = len(encoded)
+                blob += encoded
+                verse_count += 1
+
+    header_json = json.dumps(
+        [{"name": b['name'], "abbreviation": b['abbreviation'], "chapters": [c['number'] for c in b['chapters']]}
+         for b in data['books']],
+        ensure_ascii=False, separators=(',', ':')
+    ).encode('utf-8')
+    header_json += b' ' * (-(TRANSLATION_HEADER.size + len(header_json)) % 4)
+
+    header = TRANSLATION_HEADER.pack(TRANSLATION_MAGIC, FORMAT_VERSION, slot_count, len(header_json))
+    _write_atomic(path, [header, header_json, _pack_u32(offsets), bytes(blob)])
+    return verse_count
+
+
+def build_store(translations, output_dir=DEFAULT_STORE_DIR):
+    """Build the skeleton and one .bvt file per (key, path) translation"""
+    os.makedirs(output_dir, exist_ok=True)
+    keys = [key for key, _ in translations]
+    data = load_translations(translations)
+
+    book_chapter_start, chapter_slot_start = build_skeleton([data[key] for key in keys])
+    write_skeleton(os.path.join(output_dir, 'skeleton.bin'), book_chapter_start, chapter_slot_start)
+
+    verse_counts = {}
+    for key in keys:
+        path = os.path.join(output_dir, f'{key}.bvt')
+        verse_counts[key] = write_translation(path, data[key], book_chapter_start, chapter_slot_start)
+    return verse_counts
+
+
+class Translation:
+    """One memory-mapped translation; verse lookups return zero-copy memoryviews
+
+    The memoryviews are slices of the mapping, so release them (or drop every
+    reference) before close(); the mapping cannot be unmapped while one is alive.
+    """
+
+    def __init__(self, path, store):
+        self.store = store
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+        magic, version, slot_count, header_len = TRANSLATION_HEADER.unpack_from(self._mmap, 0)
+        if magic != TRANSLATION_MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} translation file")
+        if slot_count != store.slot_count:
+            raise ValueError(f"{path} does not match the store skeleton; rebuild the store")
+
+        header_start = TRANSLATION_HEADER.size
+        self._header = self._view[header_start:header_start + header_len]
+        self._books = None
+        self._offsets_start = header_start + header_len
+        self._text_start = self._offsets_start + OFFSET_ENTRY.size * slot_count
+
+    @property
+    def books(self):
+        """Book names, abbreviations and chapter numbers, parsed on first use"""
+        if self._books is None:
+            self._books = json.loads(bytes(self._header))
+        return self._books
+
+    def verse(self, book_index, chapter, verse):
+        """Raw UTF-8 bytes of one verse as a memoryview, or None if absent"""
+        slot = self.store.slot(book_index, chapter, verse)
+        if slot is None:
+            return None
+        start, length = OFFSET_ENTRY.unpack_from(self._mmap, self._offsets_start + OFFSET_ENTRY.size * slot)
+        if length == MISSING:
+            return None
+        start += self._text_start
+        return self._view[start:start + length]
+
+    def verse_text(self, book_index, chapter, verse):
+        """Decoded text of one verse, or None if absent"""
+        raw = self.verse(book_index, chapter, verse)
+        return str(raw, 'utf-8') if raw is not None else None
+
+    def chapter(self, book_index, chapter):
+        """List of (verse number, memoryview) for the verses this translation has"""
+        slots = self.store.chapter_slots(book_index, chapter)
+        if slots is None:
+            return []
+        verses = []
+        first, end = slots
+        for slot in range(first, end):
+            start, length = OFFSET_ENTRY.unpack_from(self._mmap, self._offsets_start + OFFSET_ENTRY.size * slot)
+            if length != MISSING:
+                start += self._text_start
+                verses.append((slot - first + 1, self._view[start:start + length]))
+        return verses
+
+    def offsets_view(self):
+        """The raw (start, length) u32 offset table, one entry per slot"""
+        return self._view[self._offsets_start:self._text_start]
+
+    def verse_count(self, book_index, chapter):
+        return len(self.chapter(book_index, chapter))
+
+    def close(self):
+        """Release the mapping. Verse memoryviews still alive keep it mapped
+        until they are gone; the Translation itself is unusable either way."""
+        self._header.release()
+        self._view.release()
+        try:
+            self._mmap.close()
+        except BufferError:
+            # The slices hold the mmap; it is unmapped when the last one goes
+            pass
+        self._mmap = None
+
+
+class VerseStore:
+    """Shared versification skeleton plus lazily opened translations"""
+
+    def __init__(self, directory=DEFAULT_STORE_DIR):
+        self.directory = directory
+        with open(os.path.join(directory, 'skeleton.bin'), 'rb') as f:
+            raw = f.read()
+
+        magic, version, book_count, chapter_count, slot_count = SKELETON_HEADER.unpack_from(raw, 0)
+        if magic != SKELETON_MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{directory} does not contain a version {FORMAT_VERSION} verse store")
+
+        offset = SKELETON_HEADER.size
+        self.book_chapter_start = array('I', struct.unpack_from(f'<{book_count + 1}I', raw, offset))
+        offset += 4 * (book_count + 1)
+        self.chapter_slot_start = array('I', struct.unpack_from(f'<{chapter_count + 1}I', raw, offset))
+
+        self.book_count = book_count
+        self.slot_count = slot_count
+        self._translations = {}
+
+    def __getitem__(self, key):
+        if key not in self._translations:
+            path = os.path.join(self.directory, f'{key}.bvt')
+            self._translations[key] = Translation(path, self)
+        return self._translations[key]
+
+    def chapter_count(self, book_index):
+        return self.book_chapter_start[book_index + 1] - self.book_chapter_start[book_index]
+
+    def chapter_slots(self, book_index, chapter):
+        """(first slot, end slot) of a chapter, or None if it does not exist"""
+        if not 0 <= book_index < self.book_count:
+            return None
+        if not 1 <= chapter <= self.chapter_count(book_index):
+            return None
+        index = self.book_chapter_start[book_index] + chapter - 1
+        return self.chapter_slot_start[index], self.chapter_slot_start[index + 1]
+
+    def slot(self, book_index, chapter, verse):
+        slots = self.chapter_slots(book_index, chapter)
+        if slots is None or not 1 <= verse <= slots[1] - slots[0]:
+            return None
+        return slots[0] + verse - 1
+
+    def close(self):
+        for translation in self._translations.values():
+            translation.close()
+        self._translations.clear()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query the memory-mapped verse store")
+    parser.add_argument('--store', default=DEFAULT_STORE_DIR, help="store directory")
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('build', help="build the store from the translation JSON files")
+    show = commands.add_parser('show', help="print a chapter or a single verse")
+    show.add_argument('translation')
+    show.add_argument('book', help="book name, abbreviation or 1-based number")
+    show.add_argument('chapter', type=int)
+    show.add_argument('verse', type=int, nargs='?')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        try:
+            verse_counts = build_store(translation_files(), args.store)
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        for key, count in verse_counts.items():
+            size = os.path.getsize(os.path.join(args.store, f'{key}.bvt'))
+            print(f"✓ {key}: {count} verses, {size / 1024:.0f} KB")
+        print(f"✓ Store written to {args.store}")
+        return
+
+    store = VerseStore(args.store)
+    translation = store[args.translation]
+    if args.book.isdigit():
+        book_index = int(args.book) - 1
+    else:
+        wanted = args.book.lower()
+        book_index = next((i for i, b in enumerate(translation.books)
+                           if wanted in (b['name'].lower(), b['abbreviation'].lower())), None)
+        if book_index is None:
+            parser.error(f"Book {args.book} not found")
+
+    if args.verse is not None:
+        text = translation.verse_text(book_index, args.chapter, args.verse)
+        print(text if text is not None else "❌ MISSING")
+    else:
+        for number, raw in translation.chapter(book_index, args.chapter):
+            print(f"{number} {str(raw, 'utf-8')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""Watch the sources and data files and rebuild only what an edit invalidates
+
+The pipeline is a small dependency graph, rebuilt in this order:
+
+    data/en_bbe.json ──> data/english.json ─┬─> data/alignment.json <── alignment_overrides.json
+    data/ko_ko.json  ──> data/korean.json  ─┤         │
+                                            ├─> data/chapters/ (changed shards + manifest)
+                                            ├─> read/ + sitemap.xml (if build_pages.py was run)
+                                            ├─> mismatch_report.json
+                                            ├─> data/search/<translation>/
+                                            ├─> data/concordance/ (if concordance.py was run)
+                                            └─> data/bible.sqlite (if export_sqlite.py was run)
+
+A target is rebuilt when one of its inputs is newer than its output (as
+make does), so editing data/korean.json skips the conversion, and editing
+a source reconverts just that translation before everything downstream.
+Translations are loaded once per rebuild, through the bibledata parse
+cache; chapter shards whose hash did not change are not rewritten.
+
+Files are polled every --interval seconds. A rebuild starts once nothing
+has changed for --debounce seconds, so saving several files (or an editor
+writing in steps) causes one rebuild. A target that fails (say, a JSON
+file saved half-way) is reported and retried on the next change; targets
+that depend on it wait.
+
+serve.py serves the rebuilt files as they are written, and the --api
+chapter index reloads itself when the translation or alignment files change,
+so the running server never needs a restart.
+
+Usage:
+    python3 watch.py [--interval 0.1] [--debounce 0.2] [--no-search] [--once]
+"""
+import argparse
+import os
+import time
+
+from build_alignment import ALIGNMENT_FILE, OVERRIDES_FILE, build_alignment, load_alignment, load_overrides, save_alignment
+from build_pages import DEFAULT_OUTPUT_DIR as PAGES_DIR, SITEMAP_FILE, TEMPLATE_FILE, build_pages
+from build_shards import DEFAULT_OUTPUT_DIR, build_manifest, read_manifest, set_version, write_manifest, write_shards
+from check_mismatches import REPORT_FILE, find_mismatches, save_report
+from concordance import DEFAULT_CONCORDANCE_DIR, build_concordance
+from convert_translations import convert_translation
+from export_sqlite import DEFAULT_DATABASE, build_database, built_with_fts
+from pipeline_metrics import Metrics
+from search_index import DEFAULT_INDEX_DIR, build_index
+from translations import TRANSLATIONS, load_translations
+
+DEFAULT_INTERVAL = 0.1
+DEFAULT_DEBOUNCE = 0.2
+
+
+class Rebuild:
+    """What one rebuild shares between targets: the translations, loaded on first use"""
+
+    def __init__(self, registry):
+        self.registry = registry
+        self.keys = [entry['key'] for entry in registry]
+        self._data = None
+
+    @property
+    def data(self):
+        if self._data is None:
+            self._data = load_translations([(entry['key'], entry['output']) for entry in self.registry])
+        return self._data
+
+
+def build_graph(registry=None, shard_dir=DEFAULT_OUTPUT_DIR, search_dir=DEFAULT_INDEX_DIR, search=True, pages=None,
+                concordance_dir=DEFAULT_CONCORDANCE_DIR, concordance=None, database=None):
+    """Targets in build order: {"name", "inputs", "output", "build"}"""
+    registry = registry or TRANSLATIONS
+    outputs = [entry['output'] for entry in registry]
+    if pages is None:
+        pages = os.path.isdir(PAGES_DIR)
+    if concordance is None:
+        concordance = os.path.isdir(concordance_dir)
+    if database is None:
+        database = os.path.exists(DEFAULT_DATABASE)
+    targets = []
+
+    for entry in registry:
+        def convert(rebuild, entry=entry):
+            result = convert_translation(entry)
+            return f"{result['books']} books, {result['verses']} verses"
+        targets.append({"name": f"convert/{entry['key']}", "inputs": [entry['source']],
+                        "output": entry['output'], "build": convert})
+
+    def mismatches(rebuild):
+        found, checked, _ = find_mismatches(incremental=True)
+        save_report(found)
+        return f"{len(found)} mismatched chapter(s) in {checked} compared"
+
+    def alignment(rebuild):
+        table = build_alignment(rebuild.data, rebuild.keys, load_overrides())
+        save_alignment(table)
+        return f"{len(table['chapters'])} aligned chapter(s)"
+
+    def shards(rebuild):
+        manifest = build_manifest(rebuild.data, rebuild.keys, load_alignment())
+        previous = read_manifest(shard_dir)
+        files_written, _ = write_shards(rebuild.data, manifest, shard_dir, previous)
+        set_version(manifest, previous)
+        write_manifest(manifest, shard_dir)
+        return f"{files_written} shard(s) written, manifest version {manifest['version']}"
+
+    def chapter_pages(rebuild):
+        count, written, _ = build_pages(rebuild.data, rebuild.keys, load_alignment())
+        return f"{written} of {count} page(s) rewritten"
+
+    # What the reader shows comes first; the report and the search index after
+    targets.append({"name": "alignment", "inputs": outputs + [OVERRIDES_FILE],
+                    "output": ALIGNMENT_FILE, "build": alignment})
+    targets.append({"name": "shards", "inputs": outputs + [ALIGNMENT_FILE],
+                    "output": os.path.join(shard_dir, 'manifest.json'), "build": shards})
+    if pages:
+        targets.append({"name": "pages", "inputs": outputs + [ALIGNMENT_FILE, TEMPLATE_FILE],
+                        "output": SITEMAP_FILE, "build": chapter_pages})
+    targets.append({"name": "mismatches", "inputs": outputs, "output": REPORT_FILE, "build": mismatches})
+
+    if search:
+        for entry in registry:
+            def index(rebuild, key=entry['key']):
+                docs, terms = build_index(rebuild.data[key], os.path.join(search_dir, key))
+                return f"{docs} verses, {terms} terms"
+            targets.append({"name": f"search/{entry['key']}", "inputs": [entry['output']],
+                            "output": os.path.join(search_dir, entry['key'], 'meta.json'), "build": index})
+
+    if concordance:
+        for entry in registry:
+            path = os.path.join(concordance_dir, f"{entry['key']}.bcc")
+
+            def count(rebuild, key=entry['key'], path=path):
+                word_count, term_count = build_concordance(rebuild.data[key], path)
+                return f"{word_count} words, {term_count} distinct"
+            targets.append({"name": f"concordance/{entry['key']}", "inputs": [entry['output']],
+                            "output": path, "build": count})
+
+    if database:
+        def export(rebuild):
+            summary = build_database(DEFAULT_DATABASE, registry, fts=built_with_fts(DEFAULT_DATABASE))
+            verses = sum(result['verses'] for result in summary['translations'].values())
+            return f"{verses} verses imported in {summary['seconds']:.2f}s"
+        targets.append({"name": "sqlite", "inputs": outputs, "output": DEFAULT_DATABASE, "build": export})
+
+    return targets
+
+
+def mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def is_stale(target):
+    """Missing output, or an input newer than it (missing inputs are ignored)"""
+    output_time = mtime(target['output'])
+    if output_time is None:
+        return True
+    return any((input_time or 0) > output_time for input_time in map(mtime, target['inputs']))
+
+
+def rebuild_stale(targets, registry):
+    """Rebuild every stale target in order; returns the names of those that failed"""
+    rebuild = Rebuild(registry)
+    metrics = Metrics('watch')
+    failed = set()
+    failed_outputs = set()
+    built = 0
+    start = time.perf_counter()
+
+    for target in targets:
+        if failed_outputs.intersection(target['inputs']):
+            print(f"  ⚠️  {target['name']}: waiting for a failed input")
+            failed.add(target['name'])
+            failed_outputs.add(target['output'])
+            continue
+        if not is_stale(target):
+            continue
+
+        target_start = time.perf_counter()
+        try:
+            with metrics.stage(target['name']):
+                summary = target['build'](rebuild)
+        except Exception as e:
+            print(f"  ❌ {target['name']}: {e}")
+            failed.add(target['name'])
+            failed_outputs.add(target['output'])
+            continue
+        built += 1
+        print(f"  ✓ {target['name']}: {summary} ({time.perf_counter() - target_start:.2f}s)")
+
+    metrics.finish()
+    if failed:
+        print(f"❌ {len(failed)} target(s) failed, {built} rebuilt - fix the input and save again")
+    elif built:
+        print(f"✓ Rebuilt {built} target(s) in {time.perf_counter() - start:.2f}s")
+    else:
+        print("✓ Everything is up to date")
+    return failed
+
+
+def watched_files(targets):
+    """Every input and output of the graph (outputs are also edited by hand and by repairs)"""
+    files = []
+    for target in targets:
+        for path in target['inputs'] + [target['output']]:
+            if path not in files:
+                files.append(path)
+    return files
+
+
+def snapshot(paths):
+    return {path: mtime(path) for path in paths}
+
+
+def watch(targets, registry, interval=DEFAULT_INTERVAL, debounce=DEFAULT_DEBOUNCE):
+    """Poll until interrupted, rebuilding after each burst of changes"""
+    paths = watched_files(targets)
+    last = snapshot(paths)
+    changed_at = None
+
+    print(f"Watching {len(paths)} file(s) - Ctrl+C to stop")
+    while True:
+        time.sleep(interval)
+        current = snapshot(paths)
+        if current != last:
+            changed = [path for path in paths if current[path] != last[path]]
+            if changed_at is None:
+                print(f"\nChanged: {', '.join(changed)}")
+            last = current
+            changed_at = time.monotonic()
+            continue
+
+        if changed_at is not None and time.monotonic() - changed_at >= debounce:
+            changed_at = None
+            rebuild_stale(targets, registry)
+            # The rebuild's own outputs are not edits
+            last = snapshot(paths)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild derived data whenever sources or data files change")
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL, help="seconds between polls")
+    parser.add_argument('--debounce', type=float, default=DEFAULT_DEBOUNCE,
+                        help="seconds without changes before rebuilding")
+    parser.add_argument('--no-search', action='store_true', help="do not rebuild the search index")
+    parser.add_argument('--once', action='store_true', help="rebuild what is stale and exit")
+    args = parser.parse_args()
+
+    targets = build_graph(search=not args.no_search)
+    print("Checking for stale outputs...")
+    failed = rebuild_stale(targets, TRANSLATIONS)
+    if args.once:
+        raise SystemExit(1 if failed else 0)
+
+    try:
+        watch(targets, TRANSLATIONS, args.interval, args.debounce)
+    except KeyboardInterrupt:
+        print("\nStopped watching")
+
+
+if __name__ == "__main__":
+    main()